@@ -1,9 +1,18 @@
 import streamlit as st
+import sys
+import os
 from dotenv import load_dotenv
 
 # 환경 변수 로드
 load_dotenv()
 
+# utils 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
+
+# 서버 시작 시 지식베이스/검색 클라이언트를 백그라운드에서 미리 준비 (이미 시작했으면 무시)
+import warmup
+warmup.start_warmup()
+
 # 페이지 설정
 st.set_page_config(
     page_title="신한은행 부동산 인텔리전스",
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+가격 시계열 조회 벤치마크
+임시 검색 이력 DB의 price_history 테이블에 합성 관측값을 채운 뒤,
+단지 하나의 기간 집계(price_series) 조회 시간을 측정
+
+실행: python benchmarks/bench_price_history.py [관측값 수] [반복 횟수]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from search_history import SearchHistoryStore
+
+# 합성 데이터 구성 (단지 수 x 면적 x 거래 유형, 1년치 관측)
+COMPLEX_COUNT = 200
+AREAS = ["59", "84", "114"]
+TRANSACTION_TYPES = ["매매", "전세", "월세"]
+SPAN_SECONDS = 365 * 86400
+
+# 조회 조건 (최근 180일을 60개 구간으로 집계)
+QUERY_DAYS = 180
+QUERY_POINTS = 60
+
+INSERT_BATCH_SIZE = 50000
+
+
+def seed(store: SearchHistoryStore, rows: int, end_ts: int):
+    """관측값 rows개를 단지/면적/거래 유형에 고르게 나눠 추가"""
+    rng = random.Random(0)
+    series = [(f"단지{c:03d}", area, tx) for c in range(COMPLEX_COUNT) for area in AREAS for tx in TRANSACTION_TYPES]
+    conn = store._connect()
+    start = time.perf_counter()
+    for offset in range(0, rows, INSERT_BATCH_SIZE):
+        batch = []
+        for i in range(offset, min(offset + INSERT_BATCH_SIZE, rows)):
+            complex_name, area, tx = series[i % len(series)]
+            ts = end_ts - rng.randrange(SPAN_SECONDS)
+            batch.append((complex_name, area, tx, ts, rng.randrange(50000, 300000), 0))
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT OR IGNORE INTO price_history (complex, area, transaction_type, ts, price, rent) "
+            "VALUES (?, ?, ?, ?, ?, ?)", batch
+        )
+        conn.execute("COMMIT")
+    total = conn.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+    print(f"📥 관측값 {total:,}건 생성 ({time.perf_counter() - start:.1f}초, 시계열 {len(series)}개)")
+    return series
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_200_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SearchHistoryStore(os.path.join(tmp_dir, "bench_history.db"))
+        end_ts = int(time.time())
+        series = seed(store, rows, end_ts)
+        start_ts = end_ts - QUERY_DAYS * 86400
+
+        rng = random.Random(1)
+        timings = []
+        points = 0
+        for _ in range(rounds):
+            complex_name, area, tx = rng.choice(series)
+            started = time.perf_counter()
+            result = store.price_series(complex_name, area, tx, start_ts, end_ts, max_points=QUERY_POINTS)
+            timings.append(time.perf_counter() - started)
+            points += len(result)
+
+        timings.sort()
+        median = timings[len(timings) // 2] * 1000
+        p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+        per_series = rows // len(series)
+        print(f"📈 price_series {QUERY_DAYS}일/{QUERY_POINTS}구간 (시계열당 약 {per_series:,}건): "
+              f"중앙값 {median:.3f}ms, p95 {p95:.3f}ms, 평균 {points / rounds:.1f}구간 ({rounds}회)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+가격 파서 벤치마크
+실제 MOLI 답변/Tavily 검색 결과 코퍼스로 정확도를 확인하고,
+기존 정규식 문자열 추출 방식과 처리 속도를 비교
+
+실행: python benchmarks/bench_price_parser.py [반복 횟수]
+"""
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from price_parser import parse_prices, summarize_prices
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "price_corpus.jsonl")
+
+# 이전 record_realty_search의 가격 추출 방식 (비교용)
+LEGACY_PRICE_PATTERNS = [
+    r'매매\s*(\d+억(?:\s*\d+[,\d]*)?)',
+    r'전세\s*(\d+억(?:\s*\d+[,\d]*)?)',
+    r'월세\s*(\d+억(?:\s*\d+[,\d]*)?)',
+]
+
+
+def legacy_extract(answer: str):
+    found_prices = []
+    for pattern in LEGACY_PRICE_PATTERNS:
+        matches = re.findall(pattern, answer)
+        if matches:
+            found_prices.extend(matches[:2])
+    return found_prices
+
+
+def load_corpus():
+    with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_accuracy(corpus):
+    """기대값과 일치하는 문서 수 및 가격 단위 정밀도/재현율"""
+    exact = 0
+    true_positive = 0
+    predicted_total = 0
+    expected_total = 0
+    for item in corpus:
+        predicted = [[m.transaction_type, m.amount, m.amount_max, m.rent] for m in parse_prices(item["text"])]
+        expected = item["expected"]
+        if predicted == expected:
+            exact += 1
+        else:
+            print(f"❌ 불일치: {item['text'][:40]}...\n   기대: {expected}\n   결과: {predicted}")
+        true_positive += sum(1 for p in predicted if p in expected)
+        predicted_total += len(predicted)
+        expected_total += len(expected)
+
+    print(f"정확히 일치: {exact}/{len(corpus)}")
+    print(f"정밀도: {true_positive / max(predicted_total, 1):.3f}, 재현율: {true_positive / max(expected_total, 1):.3f}")
+
+
+def bench(name, func, texts, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    per_doc_us = elapsed / (rounds * len(texts)) * 1e6
+    print(f"{name:<28} {per_doc_us:8.1f} µs/문서  ({rounds * len(texts)}건, {elapsed:.3f}초)")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = load_corpus()
+    texts = [item["text"] for item in corpus]
+
+    print(f"📚 코퍼스: {len(corpus)}건 ({CORPUS_FILE})\n")
+    check_accuracy(corpus)
+    print()
+    bench("기존 정규식 (문자열)", legacy_extract, texts, rounds)
+    bench("parse_prices (숫자)", parse_prices, texts, rounds)
+    bench("parse_prices + 요약", lambda t: summarize_prices(parse_prices(t)), texts, rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+SOL 지식베이스 라우팅 임계값 평가
+라벨이 붙은 질문(kb: 지식베이스로 답해야 함, web: 웹 검색이 필요함)으로 KB 거리 임계값을 바꿔가며
+라우팅 정밀도/재현율과 질문당 예상 LLM 호출 수, 웹 검색 호출 수를 계산하고 가장 좋은 임계값을 추천
+
+기본값은 로컬 스텁 임베딩/LLM을 사용하므로 API 키나 네트워크 없이 실행 가능 (웹 검색은 항상 스텁)
+스텁 임베딩의 거리는 OpenAI 임베딩 거리와 척도가 다르므로, --write-config는 --embeddings openai일 때만 저장
+(스텁 결과를 시험용 파일에 저장하려면 --force)
+
+실행: python benchmarks/bench_routing.py [--embeddings stub|openai] [--llm stub|openai] [--write-config utils/kb_routing.json [--force]]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import replace
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import SimpleChatModel
+
+import dictionary
+from routing_config import load_routing_config, save_routing_config
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(__file__), "routing_questions.jsonl")
+
+# 스텁 임베딩 차원 (글자 2-gram 해시)
+STUB_EMBEDDING_SIZE = 256
+
+# 스텁 LLM이 컨텍스트로 답할 수 있다고 보는 질문 2-gram 겹침 비율
+STUB_ANSWER_OVERLAP = 0.3
+
+# 기본 임계값 탐색 범위 (시작:끝:간격, FAISS L2 거리)
+DEFAULT_THRESHOLD_GRID = "0.1:2.0:0.05"
+
+
+def _bigrams(text: str) -> set:
+    """공백을 뺀 소문자 글자 2-gram 집합"""
+    text = re.sub(r"\s+", "", text.lower())
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class StubEmbeddings(Embeddings):
+    """글자 2-gram 해시 임베딩 (결정적, 네트워크 없음)"""
+    model = f"stub-bigram-{STUB_EMBEDDING_SIZE}"
+
+    def __init__(self):
+        self.calls = 0
+
+    def _embed(self, text: str):
+        vector = np.zeros(STUB_EMBEDDING_SIZE, dtype=np.float32)
+        for gram in _bigrams(text):
+            vector[zlib.crc32(gram.encode("utf-8")) % STUB_EMBEDDING_SIZE] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self._embed(text)
+
+
+class StubChatModel(SimpleChatModel):
+    """컨텍스트와 질문의 2-gram 겹침으로 답하는 스텁 LLM
+
+    KB 프롬프트: 질문과 충분히 겹치는 컨텍스트 문장이 있으면 그 문장으로 답하고, 없으면 정보 부족 답변
+    웹 검색 프롬프트: 항상 검색 결과 기반 답변
+    """
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs) -> str:
+        text = messages[-1].content
+        match = re.search(r"질문: (.+)", text)
+        question = match.group(1).strip() if match else text
+        if "인터넷 검색 결과:" in text:
+            return f"인터넷 검색 결과에 따르면 '{question}'에 대한 최신 정보는 다음과 같습니다. 검색된 출처를 함께 확인해주세요."
+
+        context = text.split("컨텍스트:\n", 1)[-1]
+        question_grams = _bigrams(question)
+        best_line, best_overlap = "", 0.0
+        for line in context.splitlines():
+            if len(line.strip()) < 10:
+                continue
+            overlap = len(question_grams & _bigrams(line)) / max(len(question_grams), 1)
+            if overlap > best_overlap:
+                best_line, best_overlap = line.strip(), overlap
+        if best_overlap < STUB_ANSWER_OVERLAP:
+            return "제공된 정보에는 해당 질문에 대한 내용이 포함되어 있지 않습니다."
+        return f"백과사전 정보에 따르면 {best_line} 자세한 내용은 관련 제도 안내를 참고해주세요."
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """채팅 모델 호출 수 (스텁/OpenAI 공통)"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        with self._lock:
+            self.calls += 1
+
+
+class WebSearchCounter:
+    """웹 검색 스텁 (실제 검색 없이 호출 수만 셈)"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query, deadline=None):
+        with self._lock:
+            self.calls += 1
+        return f"'{query}' 웹 검색 결과 (스텁)", True
+
+
+def load_questions(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def parse_grid(grid: str):
+    start, stop, step = (float(v) for v in grid.split(":"))
+    return [round(t, 4) for t in np.arange(start, stop + step / 2, step)]
+
+
+def build_dictionary(args, routing):
+    """평가용 사전 인스턴스 (스텁 임베딩이면 임시 인덱스 폴더 사용, 웹 검색은 항상 스텁)"""
+    embeddings = StubEmbeddings() if args.embeddings == "stub" else None
+    llm = StubChatModel() if args.llm == "stub" else None
+    index_dir = tempfile.mkdtemp(prefix="bench-routing-") if args.embeddings == "stub" else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        d = dictionary.StablecoinDictionary(embeddings=embeddings, llm=llm, routing=routing, index_dir=index_dir)
+    llm_counter, web_counter = LLMCallCounter(), WebSearchCounter()
+    d.llm.callbacks = [llm_counter]
+    d._search_internet = web_counter
+    return d, llm_counter, web_counter
+
+
+def measure(d, questions):
+    """질문별 최소 KB 거리와, KB로 답했을 때 답변이 충분한지(임계값과 무관하므로 한 번만 생성)"""
+    texts = [q["question"] for q in questions]
+    vectors = d.embeddings.embed_documents(texts)
+    distances = d._best_kb_distance_batch(vectors)
+    covered = np.zeros(len(texts), dtype=bool)
+    borderline_margin = d.routing.speculative_search_margin
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, (text, vector) in enumerate(zip(texts, vectors)):
+            docs = d._retrieve_with_scores(text, vector, k=dictionary.QA_CONTEXT_K)
+            answer = d._generate_answer(d._kb_answer_prompt(text), docs, name="bench-routing")
+            covered[i] = d._check_knowledge_coverage(text, answer)
+    return distances, covered, borderline_margin
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+def evaluate(threshold, distances, covered, is_kb, margin):
+    """임계값 하나에 대한 라우팅/최종 답변 지표와 질문당 예상 호출 수"""
+    routed = distances < threshold
+    kb_answer = routed & covered
+    fallback = routed & ~covered
+    borderline = routed & (distances >= threshold - margin)
+
+    routed_tp = int((routed & is_kb).sum())
+    final_tp = int((kb_answer & is_kb).sum())
+    n = len(distances)
+    return {
+        "threshold": threshold,
+        "routing_precision": _ratio(routed_tp, int(routed.sum())),
+        "routing_recall": _ratio(routed_tp, int(is_kb.sum())),
+        "final_precision": _ratio(final_tp, int(kb_answer.sum())),
+        "final_recall": _ratio(final_tp, int(is_kb.sum())),
+        "accuracy": float((kb_answer == is_kb).mean()),
+        # KB에 없으면 웹 답변 1회, KB 답변이 부족하면 KB 답변 + 웹 답변 2회
+        "llm_calls": (n + int(fallback.sum())) / n,
+        # KB 밖이거나 KB 답변이 부족하면 검색, 경계선이면 답변이 충분해도 미리 검색
+        "web_calls": int((~routed | fallback | borderline).sum()) / n,
+    }
+
+
+def print_sweep(rows, current):
+    print(f"{'임계값':>6} {'라우팅P':>7} {'라우팅R':>7} {'최종P':>6} {'최종R':>6} {'정확도':>6} {'LLM/질문':>8} {'웹/질문':>7}")
+    for row in rows:
+        mark = " ← 현재 설정" if abs(row["threshold"] - current) < 1e-9 else ""
+        print(f"{row['threshold']:>6.2f} {row['routing_precision']:>7.3f} {row['routing_recall']:>7.3f} "
+              f"{row['final_precision']:>6.3f} {row['final_recall']:>6.3f} {row['accuracy']:>6.3f} "
+              f"{row['llm_calls']:>8.2f} {row['web_calls']:>7.2f}{mark}")
+
+
+def validate(d, llm_counter, web_counter, questions, threshold):
+    """추천 임계값으로 실제 답변 파이프라인을 실행해 호출 수 확인 (경계선 검색은 취소되면 덜 셀 수 있음)"""
+    d.routing = replace(d.routing, kb_distance_threshold=threshold)
+    llm_counter.calls = web_counter.calls = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for q in questions:
+            d.answer_cache.clear()  # 비슷한 질문의 캐시 답변이 호출 수를 줄이지 않도록
+            d.get_answer_result(q["question"])
+    dictionary._web_search_executor.shutdown(wait=True)
+    n = len(questions)
+    return llm_counter.calls / n, web_counter.calls / n, (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SOL 지식베이스 라우팅 임계값 평가")
+    parser.add_argument("--questions", default=QUESTIONS_FILE, help="라벨 질문 JSONL ({\"question\", \"label\": kb|web})")
+    parser.add_argument("--embeddings", choices=("stub", "openai"), default="stub")
+    parser.add_argument("--llm", choices=("stub", "openai"), default="stub")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLD_GRID, help="탐색 범위 (시작:끝:간격)")
+    parser.add_argument("--config", default=None, help="기준 라우팅 설정 파일 (기본: utils/kb_routing.json)")
+    parser.add_argument("--write-config", default=None, help="추천 임계값을 저장할 라우팅 설정 파일 (--embeddings openai 필요)")
+    parser.add_argument("--force", action="store_true", help="스텁 임베딩으로 보정한 임계값도 저장")
+    args = parser.parse_args()
+
+    # 스텁 임베딩 거리로 정한 임계값은 OpenAI 임베딩에 의미가 없으므로 측정 전에 거부
+    if args.write_config and args.embeddings != "openai" and not args.force:
+        print("❌ 스텁 임베딩으로 보정한 임계값은 운영 설정에 쓸 수 없습니다. "
+              "--embeddings openai로 다시 실행하세요 (시험용 파일이면 --force).")
+        return 2
+
+    questions = load_questions(args.questions)
+    is_kb = np.array([q["label"] == "kb" for q in questions])
+    routing = load_routing_config(args.config)
+    print(f"📚 라벨 질문: {len(questions)}개 (kb {int(is_kb.sum())}, web {int((~is_kb).sum())}), "
+          f"임베딩 {args.embeddings}, LLM {args.llm}\n")
+
+    d, llm_counter, web_counter = build_dictionary(args, routing)
+    start = time.perf_counter()
+    distances, covered, margin = measure(d, questions)
+    print(f"⏱️ 거리/KB 답변 측정 {time.perf_counter() - start:.2f}초 (LLM {llm_counter.calls}회)")
+    finite = distances[np.isfinite(distances)]
+    if len(finite):
+        print(f"📏 KB 거리: kb 질문 중앙값 {np.median(distances[is_kb]):.3f}, "
+              f"web 질문 중앙값 {np.median(distances[~is_kb]):.3f}\n")
+
+    rows = [evaluate(t, distances, covered, is_kb, margin) for t in parse_grid(args.thresholds)]
+    print_sweep(rows, routing.kb_distance_threshold)
+
+    # 최종 정확도 우선, 같으면 호출 수가 적은 임계값
+    best = max(rows, key=lambda r: (round(r["accuracy"], 6), -(r["llm_calls"] + r["web_calls"])))
+    current = evaluate(routing.kb_distance_threshold, distances, covered, is_kb, margin)
+    print(f"\n✅ 추천 임계값 {best['threshold']:.2f}: 정확도 {best['accuracy']:.3f}, "
+          f"LLM {best['llm_calls']:.2f}회/질문, 웹 검색 {best['web_calls']:.2f}회/질문")
+    print(f"   현재 임계값 {routing.kb_distance_threshold:.2f}: 정확도 {current['accuracy']:.3f}, "
+          f"LLM {current['llm_calls']:.2f}회/질문, 웹 검색 {current['web_calls']:.2f}회/질문")
+
+    llm_calls, web_calls, per_question = validate(d, llm_counter, web_counter, questions, best["threshold"])
+    print(f"🔎 실제 파이프라인 확인: LLM {llm_calls:.2f}회/질문, 웹 검색 {web_calls:.2f}회/질문 "
+          f"(예상 {best['llm_calls']:.2f}/{best['web_calls']:.2f}, {per_question * 1000:.1f}ms/질문)")
+
+    if args.write_config:
+        if args.embeddings != "openai":
+            print("⚠️ --force: 스텁 임베딩으로 보정한 임계값을 저장합니다. 운영 설정에는 사용하지 마세요.")
+        elif args.llm != "openai":
+            print("⚠️ 스텁 LLM으로 판단한 답변 충분성 기준입니다. 가능하면 --llm openai로 다시 확인하세요.")
+        save_routing_config(replace(routing, kb_distance_threshold=best["threshold"]), args.write_config)
+        print(f"💾 라우팅 설정 저장: {args.write_config}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
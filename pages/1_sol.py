@@ -11,6 +11,10 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
 # dictionary 모듈 import
 import dictionary
+import warmup
+
+# 페이지로 바로 접속한 경우에도 백그라운드 워밍업 시작 (이미 시작했으면 무시)
+warmup.start_warmup()
 
 # 페이지 설정
 st.set_page_config(
@@ -78,33 +82,55 @@ def branch_employee_main():
         st.markdown("## 부동산 Q&A")
         st.markdown("부동산 관련 다양한 질문 검색 가능합니다.")
         
+        # 워밍업이 끝나지 않았으면 안내 (검색은 가능, 준비가 끝날 때까지 기다렸다가 답변)
+        if not warmup.is_ready():
+            st.caption("⏳ 지식베이스를 준비하고 있습니다. 첫 답변은 조금 늦을 수 있습니다.")
+        
         # 검색 입력
         search_query = st.text_input("", placeholder="15억 이상 주택 대출 얼마 나오나요?")
         
         if st.button("검색", type="secondary", use_container_width=True):
             if search_query:
-                with st.spinner("답변을 생성하고 있습니다..."):
-                    try:
-                        # KB 포함 여부를 먼저 확인
-                        in_kb = dictionary.is_question_in_kb(search_query)
-                        
-                        # 답변 생성
-                        answer, used_web_search = dictionary.get_dictionary_answer_with_info(search_query)
-                        
-                        # 메시지 표시 로직
-                        if used_web_search:
-                            # 웹 검색이 사용된 경우 (경고 색상 - 분홍/붉은색 계열)
-                            if in_kb:
-                                st.warning("내부 지식 데이터가 부족합니다. 인터넷 검색으로 보완했습니다.")
-                            else:
-                                st.warning("내부 지식 데이터가 없습니다. 인터넷 검색을 시작하겠습니다.")
+                # 안내 메시지는 답변 위에 표시 (답변이 끝난 뒤 확정)
+                status_placeholder = st.empty()
+                answer_placeholder = st.empty()
+                try:
+                    # 답변을 토큰 단위로 받아 바로 표시
+                    stream = dictionary.stream_dictionary_answer(search_query)
+                    answer_text = ""
+                    with st.spinner("답변을 생성하고 있습니다..."):
+                        for token in stream:
+                            if token is dictionary.STREAM_RESET:
+                                # KB 답변이 부족해 웹 검색 답변으로 교체
+                                answer_text = ""
+                                status_placeholder.warning("내부 지식 데이터가 부족합니다. 인터넷 검색으로 보완합니다.")
+                                continue
+                            if token is dictionary.STREAM_ERROR:
+                                # 오류 안내로 교체 (웹 검색 보완 안내는 표시하지 않음)
+                                answer_text = ""
+                                status_placeholder.empty()
+                                continue
+                            answer_text += token
+                            answer_placeholder.markdown(answer_text + "▌")
+                    answer_placeholder.markdown(answer_text)
+                    
+                    # 답변 결과 (KB 포함 여부와 웹 검색 사용 여부 포함)
+                    result = stream.result
+                    
+                    # 메시지 표시 로직
+                    if result.error:
+                        status_placeholder.error("답변을 생성하지 못했습니다.")
+                    elif result.used_web_search:
+                        # 웹 검색이 사용된 경우 (경고 색상 - 분홍/붉은색 계열)
+                        if result.in_kb:
+                            status_placeholder.warning("내부 지식 데이터가 부족합니다. 인터넷 검색으로 보완했습니다.")
                         else:
-                            # 내부 데이터만 사용된 경우
-                            st.success("내부 지식 데이터를 찾았습니다.")
-                        
-                        st.write(answer)
-                    except Exception as e:
-                        st.error(f"오류가 발생했습니다: {str(e)}")
+                            status_placeholder.warning("내부 지식 데이터가 없습니다. 인터넷 검색을 시작하겠습니다.")
+                    else:
+                        # 내부 데이터만 사용된 경우
+                        status_placeholder.success("내부 지식 데이터를 찾았습니다.")
+                except Exception as e:
+                    st.error(f"오류가 발생했습니다: {str(e)}")
             else:
                 st.warning("질문을 입력해주세요.")
 
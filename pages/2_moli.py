@@ -2,6 +2,8 @@
 import streamlit as st
 import sys
 import os
+import pandas as pd
+from datetime import datetime
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -12,6 +14,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
 # realty_search 모듈 import
 import realty_search
+import question_index
+import warmup
+
+# 페이지로 바로 접속한 경우에도 백그라운드 워밍업 시작 (이미 시작했으면 무시)
+warmup.start_warmup()
 
 # 페이지 설정
 st.set_page_config(
@@ -71,6 +78,9 @@ def headquarters_employee_main():
     col1, col2, col3 = st.columns([2, 1, 7])
     
     with col1:
+        # 입력한 질문과 비슷한 이전 질문 표시 자리 (검색창 입력 후 채움)
+        suggestion_placeholder = st.empty()
+        
         # 자주 검색하는 질문 표시 (예전 스테이블코인 방식)
         try:
             if hasattr(realty_search, 'get_top_questions'):
@@ -166,6 +176,10 @@ def headquarters_employee_main():
         st.markdown("## 부동산 매물 검색")
         st.markdown("부동산 매물 관련 다양한 질문 검색 가능합니다.")
         
+        # 워밍업이 끝나지 않았으면 안내 (검색은 가능, 준비가 끝날 때까지 기다렸다가 답변)
+        if not warmup.is_ready():
+            st.caption("⏳ 검색 서비스를 준비하고 있습니다. 첫 검색은 조금 늦을 수 있습니다.")
+        
         # 검색 입력 (자동 입력 지원)
         auto_query = st.session_state.get("auto_search_query", "")
         if auto_query:
@@ -181,23 +195,76 @@ def headquarters_employee_main():
         elif st.button("검색", type="secondary", use_container_width=True, key="main_search_btn"):
             should_search = True
         
+        # 입력한 질문과 비슷한 이전 질문을 사이드바에 표시 (클릭하면 새로 검색하지 않고 저장된 답변 표시)
+        if search_query and not should_search:
+            suggestions = question_index.suggest_similar_questions(search_query)
+            if suggestions:
+                with suggestion_placeholder.container():
+                    st.caption("💡 비슷한 이전 질문 (클릭하면 저장된 답변을 바로 보여줍니다)")
+                    for i, suggestion in enumerate(suggestions):
+                        display_question = suggestion.question[:25] + "..." if len(suggestion.question) > 25 else suggestion.question
+                        if st.button(
+                            f"💡 {display_question}",
+                            key=f"similar_q_btn_{i}",
+                            help=f"유사도 {suggestion.similarity:.2f} · 총 {suggestion.count}회 검색됨",
+                            use_container_width=True
+                        ):
+                            st.session_state.cached_answer = suggestion
+                            st.rerun()
+        
+        # 비슷한 이전 질문을 선택한 경우 저장된 답변 표시
+        cached_answer = st.session_state.pop("cached_answer", None)
+        if cached_answer is not None and not should_search:
+            st.info(f"이전 질문 '{cached_answer.question}'의 저장된 답변입니다 ({cached_answer.last_date} 검색). 최신 매물은 검색 버튼을 눌러 확인하세요.")
+            st.markdown(cached_answer.answer)
+        
         if should_search:
             if search_query:
-                with st.spinner("네이버 부동산에서 매물 정보를 검색하고 있습니다..."):
-                    try:
-                        # 부동산 매물 검색
-                        answer, used_web_search = realty_search.get_realty_search_answer(search_query)
-                        
-                        # 메시지 표시 (항상 웹 검색 사용)
-                        st.warning("네이버 부동산에서 매물 정보를 검색했습니다.")
-                        
-                        st.write(answer)
-                        
-                        # 자동 검색 상태 초기화
-                        if "auto_search_query" in st.session_state:
-                            del st.session_state.auto_search_query
-                    except Exception as e:
-                        st.error(f"오류가 발생했습니다: {str(e)}")
+                # 안내 메시지는 답변 위에 표시 (검색이 끝난 뒤 확정)
+                status_placeholder = st.empty()
+                answer_placeholder = st.empty()
+                try:
+                    # 부동산 매물 검색 (답변을 토큰 단위로 받아 바로 표시)
+                    stream = realty_search.stream_realty_search_answer(search_query)
+                    answer_text = ""
+                    with st.spinner("네이버 부동산에서 매물 정보를 검색하고 있습니다..."):
+                        for token in stream:
+                            if token is realty_search.STREAM_RESET or token is realty_search.STREAM_ERROR:
+                                answer_text = ""
+                                continue
+                            answer_text += token
+                            answer_placeholder.markdown(answer_text + "▌")
+                    answer_placeholder.markdown(answer_text)
+                    
+                    # 메시지 표시 (항상 웹 검색 사용)
+                    if realty_search.realty_answer_error(stream.result):
+                        status_placeholder.error("매물 정보를 검색하지 못했습니다.")
+                    else:
+                        status_placeholder.warning("네이버 부동산에서 매물 정보를 검색했습니다.")
+                    
+                    # 캐시된 검색 결과를 사용한 경우 검색 시점 표시
+                    cache_info = stream.result.metadata.get("tavily_cache", {})
+                    if cache_info.get("cache_hit"):
+                        st.caption(f"최근 검색 결과를 재사용했습니다 ({int(cache_info.get('age_seconds', 0) // 60)}분 전 검색)")
+
+                    # 같은 단지의 이전 검색 가격이 쌓여 있으면 날짜별 추이 차트 표시 (단위: 억)
+                    trend = realty_search.get_price_trend(search_query)
+                    chart_data = {}
+                    for transaction_type, points in trend.get("series", {}).items():
+                        if len(points) >= 2:
+                            for point in points:
+                                day = datetime.fromtimestamp(point["ts"]).strftime("%Y.%m.%d")
+                                chart_data.setdefault(day, {})[transaction_type] = point["avg"] / 10000
+                    if chart_data:
+                        area_text = f" 전용 {trend['area']}" if trend.get("area") else ""
+                        st.caption(f"📈 {trend['complex']}{area_text} 검색 가격 추이 (억원)")
+                        st.line_chart(pd.DataFrame.from_dict(chart_data, orient="index").sort_index())
+
+                    # 자동 검색 상태 초기화
+                    if "auto_search_query" in st.session_state:
+                        del st.session_state.auto_search_query
+                except Exception as e:
+                    st.error(f"오류가 발생했습니다: {str(e)}")
             else:
                 st.warning("질문을 입력해주세요.")
 
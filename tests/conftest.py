@@ -0,0 +1,5 @@
+import os
+import sys
+
+# utils 모듈은 페이지와 같은 방식으로 utils 폴더를 경로에 넣어 import
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
@@ -0,0 +1,41 @@
+import pytest
+
+from complex_gazetteer import ComplexGazetteer, match_complex
+
+
+@pytest.mark.parametrize("question", [
+    "강남은 마포보다 비싸요?",
+    "전세대출은 마이너스통장이랑 달라요?",
+    "DSR 규제 변경은 마감 언제",
+    "한진 해운 근처 아파트",
+])
+def test_alias_across_word_boundary_is_not_matched(question):
+    assert match_complex(question) is None
+
+
+@pytest.mark.parametrize("question, name", [
+    ("답십리 래미안 위브 84 매매", "답십리래미안위브"),
+    ("답십리 래미안위브 전용84 매매가격 알려줘", "답십리래미안위브"),
+    ("래미안위브84 매매", "답십리래미안위브"),
+    ("은마아파트 시세", "은마아파트"),
+    ("은마 매매 시세", "은마아파트"),
+    ("은마는 재건축 언제", "은마아파트"),
+    ("잠실 엘스 전세", "잠실엘스"),
+    ("헬리오시티에서 전세", "헬리오시티"),
+    ("행당동 한진타운 매매", "행당한진타운"),
+])
+def test_alias_on_token_boundary_is_matched(question, name):
+    match = match_complex(question)
+    assert match is not None and match.name == name
+
+
+def test_short_alias_requires_listing_context():
+    gazetteer = ComplexGazetteer([{"name": "한진타운", "aliases": ["한진"], "region": "서울 성동구"}])
+    assert gazetteer.match("한진 해운 주가") is None
+    assert gazetteer.match("한진 전세 시세").name == "한진타운"
+
+
+def test_match_positions_refer_to_original_text():
+    question = "답십리 래미안 위브 84 매매"
+    match = match_complex(question)
+    assert question[match.start:match.end] == "답십리 래미안 위브"
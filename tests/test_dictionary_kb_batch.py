@@ -0,0 +1,65 @@
+import contextlib
+import io
+import json
+import os
+import sys
+from dataclasses import replace
+
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import dictionary
+from bench_routing import QUESTIONS_FILE, StubEmbeddings
+
+THRESHOLDS = [0.5, 0.9, 1.2, 1.5]
+
+
+@pytest.fixture(scope="module")
+def kb(tmp_path_factory):
+    """스텁 임베딩으로 임시 폴더에 만든 지식베이스"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dictionary.StablecoinDictionary(embeddings=StubEmbeddings(), llm=object(),
+                                               index_dir=str(tmp_path_factory.mktemp("kb_index")))
+
+
+@pytest.fixture(scope="module")
+def questions():
+    with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
+        return [json.loads(line)["question"] for line in f if line.strip()]
+
+
+def _assert_batch_matches_single(d, questions):
+    vectors = d.embeddings.embed_documents(questions)
+    verdicts = set()
+    for threshold in THRESHOLDS:
+        d.routing = replace(d.routing, kb_distance_threshold=threshold)
+        batch = d._is_in_knowledge_base_batch(questions, vectors)
+        single = [d._is_in_knowledge_base(q, v) for q, v in zip(questions, vectors)]
+        assert batch.tolist() == single
+        verdicts.update(single)
+    # 임계값 범위에서 두 판정이 모두 나와야 비교가 의미 있음
+    assert verdicts == {True, False}
+
+
+def test_batch_matches_single_question_check(kb, questions):
+    _assert_batch_matches_single(kb, questions)
+
+
+def test_batch_matches_single_when_index_is_smaller_than_k(kb, questions):
+    long_text = "주택담보대출 LTV와 DSR 규제는 지역과 주택 수에 따라 달라지며 스트레스 DSR 금리가 가산됩니다. " * 2
+    docs = [
+        Document(page_content=long_text, metadata={"source": "realty_2025.md"}),
+        Document(page_content="청약 가점 계산 방법과 무주택 기간 산정 기준을 설명합니다. " * 3,
+                 metadata={"source": "realty_2025.md"}),
+        Document(page_content=long_text, metadata={"source": "sample"}),
+    ]
+    assert len(docs) < dictionary.KB_CHECK_K
+    original = kb.vector_store
+    kb.vector_store = FAISS.from_documents(docs, kb.embeddings)
+    try:
+        _assert_batch_matches_single(kb, questions)
+    finally:
+        kb.vector_store = original
@@ -0,0 +1,42 @@
+from answer_cache import normalize_question_text
+from query_normalizer import canonical_key
+
+
+def test_same_listing_question_shares_key():
+    assert canonical_key("답십리 래미안 위브 84 매매") == canonical_key("답십리 래미안위브 전용84 매매가격 알려줘")
+
+
+def test_residual_tokens_keep_word_order():
+    assert canonical_key("강남 대출 규제") != canonical_key("규제 대출 강남")
+
+
+def test_residual_tokens_keep_repeats():
+    assert canonical_key("금리 인상 금리") != canonical_key("금리 인상")
+
+
+def test_negation_changes_key():
+    assert canonical_key("대출 가능 여부") != canonical_key("대출 불가능 여부")
+
+
+def test_particles_are_stripped_from_latin_and_hangul_stems():
+    assert canonical_key("DSR이 뭐야") == canonical_key("DSR 뭐야")
+    assert canonical_key("LTV는 얼마") == canonical_key("LTV")
+    assert canonical_key("스트레스 DSR에서 금리") == canonical_key("스트레스 DSR 금리")
+    assert canonical_key("강남은 어때") == canonical_key("강남 어때")
+
+
+def test_price_suffix_on_transaction_word_merges():
+    assert canonical_key("반포자이 84 매매가") == canonical_key("반포자이 84 매매 가격")
+    assert canonical_key("반포자이 84 전세가는") == canonical_key("반포자이 84 전세 시세")
+    assert canonical_key("반포자이 84 매매가").endswith("|")
+
+
+def test_hangul_word_endings_are_kept():
+    assert canonical_key("분양가 상한제") != canonical_key("분양 상한제")
+    assert "대출한도" in canonical_key("대출한도 조회")
+    assert "분양가" in canonical_key("분양가 상한제")
+
+
+def test_answer_cache_key_only_normalizes_whitespace_and_case():
+    assert normalize_question_text("  DSR이   뭐야? ") == "dsr이 뭐야"
+    assert normalize_question_text("DSR이 뭐야") != normalize_question_text("DSR 뭐야")
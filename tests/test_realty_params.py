@@ -0,0 +1,30 @@
+import pytest
+
+from realty_params import extract_search_params_fast, FAST_EXTRACT_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("question", [
+    "송파구 아파트 매매 15억 이하",
+    "강남 아파트 전세",
+    "잠실동 아파트 전세 시세 알려줘",
+    "답십리 래미안 위브 84 매매",
+])
+def test_structured_question_uses_fast_path(question):
+    _, confidence = extract_search_params_fast(question)
+    assert confidence >= FAST_EXTRACT_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("question", [
+    "집값 언제 떨어져요 서울 매매",
+    "아무말 서울 매매",
+    "서울 매매",
+])
+def test_unexplained_tokens_fall_back_to_llm(question):
+    _, confidence = extract_search_params_fast(question)
+    assert confidence < FAST_EXTRACT_MIN_CONFIDENCE
+
+
+def test_unexplained_tokens_stay_in_keywords():
+    params, _ = extract_search_params_fast("아무말 서울 매매")
+    assert params["keywords"] == "아무말"
+    assert params["region"] == "서울"
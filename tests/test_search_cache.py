@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from search_cache import CoalescingTTLCache
+
+WAITERS = 4
+
+
+def test_concurrent_same_key_callers_share_one_compute():
+    cache = CoalescingTTLCache()
+    release = threading.Event()
+    computes = []
+
+    def compute():
+        computes.append(1)
+        release.wait(5)
+        return "결과"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda q=q: results.append(cache.get_or_compute(q, compute)))
+        for q in ["반포자이 매매"] + ["반포자이  매매"] * WAITERS
+    ]
+    threads[0].start()
+    while not computes:
+        time.sleep(0.001)
+    for t in threads[1:]:
+        t.start()
+    while cache.coalesced < WAITERS:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(computes) == 1
+    assert [value for value, _ in results] == ["결과"] * (WAITERS + 1)
+    assert sum(info["coalesced"] for _, info in results) == WAITERS
+    assert cache.get_or_compute("반포자이 매매", compute)[1]["cache_hit"]
+    assert len(computes) == 1
+
+
+def test_async_callers_share_one_compute():
+    cache = CoalescingTTLCache()
+    computes = []
+
+    async def compute():
+        computes.append(1)
+        await asyncio.sleep(0.01)
+        return "결과"
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute("헬리오시티 전세", compute) for _ in range(WAITERS)))
+
+    results = asyncio.run(run())
+    assert len(computes) == 1
+    assert [value for value, _ in results] == ["결과"] * WAITERS
+
+
+def test_uncacheable_result_is_returned_but_not_stored():
+    cache = CoalescingTTLCache()
+    computes = []
+
+    def compute():
+        computes.append(1)
+        return ""
+
+    for _ in range(2):
+        value, info = cache.get_or_compute("q", compute, should_cache=bool)
+        assert value == ""
+        assert not info["cache_hit"]
+    assert len(computes) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_failure_reaches_waiters_and_is_not_cached():
+    cache = CoalescingTTLCache()
+
+    def compute():
+        raise RuntimeError("검색 실패")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("q", compute)
+    assert cache.get_or_compute("q", lambda: "결과") == ("결과", {"cache_hit": False, "coalesced": False, "age_seconds": 0.0})
+
+
+def test_expired_entry_is_recomputed():
+    cache = CoalescingTTLCache(ttl_seconds=0)
+    cache.get_or_compute("q", lambda: "이전")
+    time.sleep(0.01)
+    assert cache.get_or_compute("q", lambda: "새 결과")[0] == "새 결과"
@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+import search_client
+from search_client import CircuitBreaker, CircuitOpenError, SearchClientError, TavilySearchClient
+
+
+class FakeClock:
+    """time 모듈 대신 쓰는 가짜 시계 (sleep하면 시간만 흐름)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(search_client, "time", fake)
+    return fake
+
+
+def _client(responses, **kwargs):
+    """응답 코드 목록을 차례로 돌려주는 가짜 전송 계층의 클라이언트 (마지막 코드는 계속 반복)"""
+    calls = []
+
+    def handler(request):
+        status = responses[min(len(calls), len(responses) - 1)]
+        calls.append(request)
+        return httpx.Response(status, json={"results": []}, headers={"Retry-After": "2"})
+
+    return TavilySearchClient(url="https://search.test/search", transport=httpx.MockTransport(handler), **kwargs), calls
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    client, calls = _client([503, 503, 200], max_retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(SearchClientError):
+            client.search("q")
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client.search("q")
+    assert len(calls) == 2
+
+    clock.now += 31
+    assert client.search("q") == {"results": []}
+    assert breaker.state == "closed"
+    assert len(calls) == 3
+
+
+def test_half_open_breaker_allows_one_trial_and_reopens_on_failure(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 31
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_exhausted_deadline_fails_without_calling(clock):
+    client, calls = _client([200])
+    with pytest.raises(SearchClientError):
+        client.search("q", deadline=clock.now + search_client.SEARCH_MIN_CALL_SECONDS / 2)
+    assert calls == []
+
+
+def test_retries_stop_when_backoff_would_exceed_deadline(clock):
+    breaker = CircuitBreaker(failure_threshold=10)
+    client, calls = _client([503], max_retries=5, breaker=breaker)
+
+    # Retry-After 2초: 첫 재시도 후 남은 1초로는 다음 대기(2초)를 할 수 없음
+    with pytest.raises(SearchClientError):
+        client.search("q", deadline=clock.now + 3)
+    assert len(calls) == 2
+    assert client.stats()["retries"] == 1
+    assert client.stats()["failures"] == 1
+
+
+def test_client_error_is_not_retried_or_counted_by_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1)
+    client, calls = _client([401], max_retries=3, breaker=breaker)
+    with pytest.raises(SearchClientError):
+        client.search("q")
+    assert len(calls) == 1
+    assert breaker.state == "closed"
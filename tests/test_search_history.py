@@ -0,0 +1,68 @@
+import sqlite3
+
+from search_history import SearchHistoryStore
+
+
+def _spaceless(question):
+    return question.replace(" ", "")
+
+
+def test_key_migration_keeps_latest_answer_and_price_summary(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    store = SearchHistoryStore(db_path, key_fn=lambda q: q)
+    store.record("은마 아파트 매매", "2025-01-01", price_summary="매매 20억", answer="이전 답변")
+    store.record("은마아파트 매매", "2025-03-01", price_summary="매매 22억", answer="최신 답변")
+    store.record("은마아파트 매매", "2025-03-02")  # 새 답변/가격 요약 없이 검색만 한 경우
+    store.record("반포자이 전세", "2025-02-01", price_summary="전세 15억", answer="반포자이 답변")
+
+    # 표준 질문 키 규칙 버전이 바뀐 것처럼 만들고 다시 열면 키를 다시 계산하여 합침
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE history_meta SET value = '0' WHERE key = 'key_version'")
+    conn.commit()
+    conn.close()
+
+    migrated = SearchHistoryStore(db_path, key_fn=_spaceless)
+    entries = {e["key"]: e for e in migrated.answered_questions()}
+    assert set(entries) == {"은마아파트매매", "반포자이전세"}
+    assert entries["은마아파트매매"]["count"] == 3
+    assert entries["은마아파트매매"]["answer"] == "최신 답변"
+    assert entries["은마아파트매매"]["price_summary"] == "매매 22억"
+    assert entries["반포자이전세"]["answer"] == "반포자이 답변"
+
+
+def test_legacy_schema_without_answer_columns_is_migrated(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE question_counts (
+            question TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_date TEXT NOT NULL DEFAULT '',
+            price_summary TEXT NOT NULL DEFAULT '',
+            updated_at REAL NOT NULL DEFAULT 0
+        )
+    """)
+    conn.executemany("INSERT INTO question_counts VALUES (?, ?, ?, ?, ?)", [
+        ("은마 아파트 매매", 2, "2025-01-01", "매매 20억", 1.0),
+        ("은마아파트 매매", 1, "2025-03-01", "", 2.0),
+    ])
+    conn.commit()
+    conn.close()
+
+    store = SearchHistoryStore(db_path, key_fn=_spaceless)
+    top = store.top_questions(5)
+    assert len(top) == 1
+    assert top[0]["count"] == 3
+    assert top[0]["price_summary"] == "매매 20억"
+
+
+def test_price_series_buckets_start_at_start_ts(tmp_path):
+    store = SearchHistoryStore(str(tmp_path / "history.db"), key_fn=lambda q: q)
+    start_ts, end_ts = 1_000_003, 1_000_003 + 180 * 86400
+    for day in range(181):
+        store.record_prices("은마", "84", [("매매", 200000 + day, 0)], ts=start_ts + day * 86400)
+
+    series = store.price_series("은마", "84", "매매", start_ts, end_ts, max_points=60)
+    assert len(series) <= 60
+    assert series[0]["ts"] == start_ts
+    assert sum(point["count"] for point in series) == 181
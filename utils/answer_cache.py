@@ -0,0 +1,143 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+
+def normalize_question_text(question: str) -> str:
+    """캐시 키용 질문 정규화 (공백/문장부호 차이 무시, 부동산 표준 질문 키는 사용하지 않음)"""
+    text = re.sub(r"[\s\?\!\.,~]+", " ", question or "")
+    return text.strip().lower()
+
+
+class SemanticAnswerCache:
+    """
+    질문 임베딩 기반 답변 캐시
+    동일하거나 충분히 유사한 질문이면 저장된 답변을 재사용
+    TTL 만료 및 LRU 방식으로 항목 제거, 지식베이스 인덱스 해시가 바뀌면 전체 무효화
+    """
+
+    def __init__(self, similarity_threshold: float = 0.95, ttl_seconds: float = 21600, max_entries: int = 500):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.index_hash = None
+
+        self._entries = OrderedDict()  # 정규화된 질문 -> 항목
+        self._matrix = None  # 유사도 계산용 임베딩 행렬 (항목 변경 시 재생성)
+        self._matrix_keys: List[str] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def set_index_hash(self, index_hash: str):
+        """지식베이스 인덱스 해시 설정 (변경되면 캐시 전체 무효화)"""
+        with self._lock:
+            if index_hash != self.index_hash:
+                self._entries.clear()
+                self._matrix = None
+                self.index_hash = index_hash
+
+    def peek_exact(self, question: str) -> Optional[Dict[str, Any]]:
+        """정규화된 질문 텍스트가 같은 항목 조회 (적중 통계에 넣지 않음, 임베딩 여부 판단용)"""
+        key = normalize_question_text(question)
+        with self._lock:
+            entry = self._get_live_entry(key)
+            return entry["value"] if entry is not None else None
+
+    def get_exact(self, question: str) -> Optional[Dict[str, Any]]:
+        """정규화된 질문 텍스트가 같은 항목 조회 (임베딩 호출 없음)"""
+        key = normalize_question_text(question)
+        with self._lock:
+            entry = self._get_live_entry(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["value"]
+
+    def get(self, question: str, embedding: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        """정확히 같은 질문 또는 유사도가 임계값 이상인 질문의 답변 조회 (embedding이 None이면 같은 질문만)"""
+        key = normalize_question_text(question)
+        with self._lock:
+            entry = self._get_live_entry(key)
+            if entry is None and embedding is not None:
+                entry = self._find_similar(embedding)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry["value"]
+
+    def put(self, question: str, embedding: List[float], value: Dict[str, Any]):
+        """답변 저장 (최대 개수 초과 시 가장 오래 사용되지 않은 항목 제거)"""
+        key = normalize_question_text(question)
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        with self._lock:
+            self._entries[key] = {
+                "vector": vector,
+                "value": value,
+                "created_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중 통계"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def _get_live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """만료되지 않은 항목 반환 (LRU 순서 갱신)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            del self._entries[key]
+            self._matrix = None
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _find_similar(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """코사인 유사도가 가장 높은 항목이 임계값 이상이면 반환"""
+        if not self._entries:
+            return None
+
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[k]["vector"] for k in self._matrix_keys])
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+
+        similarities = self._matrix @ (query / norm)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        return self._get_live_entry(self._matrix_keys[best])
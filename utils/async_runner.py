@@ -0,0 +1,44 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+# 모든 세션이 공유하는 백그라운드 이벤트 루프 (비동기 외부 호출은 모두 이 루프에서 실행)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """백그라운드 이벤트 루프 반환 (최초 호출 시 데몬 스레드에서 시작)"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-runner", daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """코루틴을 백그라운드 루프에서 실행하고 결과를 기다림 (동기 코드용)"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result(timeout)
+
+
+def iter_async(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """비동기 제너레이터를 백그라운드 루프에서 돌리며 동기 반복자로 변환
+
+    호출 스레드는 다음 항목을 기다리는 동안만 대기하고, 외부 호출 자체는 루프에서 처리됨
+    중간에 반복을 멈추면 비동기 제너레이터도 정리함
+    """
+    finished = False
+    try:
+        while True:
+            try:
+                yield run_sync(agen.__anext__())
+            except StopAsyncIteration:
+                finished = True
+                return
+    finally:
+        if not finished:
+            run_sync(agen.aclose())
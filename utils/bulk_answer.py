@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+표준 질문 일괄 답변
+JSONL 질문 파일을 읽어 SOL(용어 백과사전) 또는 MOLI(부동산 매물 검색) 답변을 한 번에 생성하고 결과를 JSONL로 저장
+이미 성공한 질문은 건너뛰므로 중간에 실패해도 같은 명령으로 다시 실행하면 이어서 처리
+
+실행: python utils/bulk_answer.py questions.jsonl answers.jsonl [--target sol|moli] [--concurrency 4] [--batch-size 100]
+입력 형식: 한 줄에 {"id": "q1", "question": "..."} (id가 없으면 줄 번호 사용) 또는 질문 문자열 하나
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import List, Dict, Any, Optional, Set
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 한 번에 임베딩/검색하는 질문 수 (묶음마다 결과 파일에 기록되어 이어서 처리 가능)
+BULK_BATCH_SIZE = 100
+
+BULK_TARGETS = ("sol", "moli")
+
+
+def load_questions(input_path: str) -> List[Dict[str, Any]]:
+    """JSONL 질문 파일 로드 ([{"id", "question"}, ...], 빈 질문 제외)"""
+    questions = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"question": item}
+            question = (item.get("question") or "").strip()
+            if not question:
+                print(f"⚠️ {line_no}번째 줄에 질문이 없어 건너뜁니다.")
+                continue
+            questions.append({"id": str(item.get("id", line_no)), "question": question})
+    return questions
+
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """결과 파일에서 이미 성공한 질문 id 목록 (오류 결과는 다시 처리)"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 중단되며 잘린 마지막 줄
+            if record.get("status") == "ok":
+                completed.add(record.get("id"))
+    return completed
+
+
+def _ends_with_newline(path: str) -> bool:
+    """파일이 비어 있거나 줄바꿈으로 끝나는지"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _result_record(target: str, item: Dict[str, Any], result) -> Dict[str, Any]:
+    """답변 결과를 결과 파일 한 줄로 변환 (MOLI 검색 실패도 오류로 기록해 다시 실행 시 재시도)"""
+    metadata = getattr(result, "metadata", {})
+    error = getattr(result, "error", "") or metadata.get("error", "") or metadata.get("search_error", "")
+    record = {
+        "id": item["id"],
+        "question": item["question"],
+        "target": target,
+        "status": "error" if error else "ok",
+        "answer": result.answer,
+        "used_web_search": result.used_web_search,
+        "response_time": round(result.response_time, 3),
+        "answered_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if target == "sol":
+        record["in_kb"] = result.in_kb
+        record["from_cache"] = result.from_cache
+    else:
+        record["search_query"] = result.search_query
+        record["naver_link"] = result.naver_link
+    if error:
+        record["error"] = error
+    return record
+
+
+def run_bulk_answer(input_path: str, output_path: str, target: str = "sol",
+                    max_concurrency: Optional[int] = None, batch_size: int = BULK_BATCH_SIZE) -> Dict[str, Any]:
+    """질문 파일 전체를 일괄 답변하여 결과 파일에 이어 씀
+
+    Returns:
+        dict: {"total", "skipped", "answered", "failed", "elapsed_seconds"}
+    """
+    if target not in BULK_TARGETS:
+        raise ValueError(f"target은 {', '.join(BULK_TARGETS)} 중 하나여야 합니다: {target}")
+
+    start_time = time.time()
+    questions = load_questions(input_path)
+    completed = load_completed_ids(output_path)
+    todo = [item for item in questions if item["id"] not in completed]
+    print(f"📦 질문 {len(questions)}개 중 이미 처리한 {len(questions) - len(todo)}개를 건너뛰고 {len(todo)}개 답변")
+
+    if target == "sol":
+        import dictionary
+        answer_batch = dictionary.get_dictionary_answers_batch
+        default_concurrency = dictionary.BATCH_MAX_CONCURRENCY
+    else:
+        import realty_search
+        answer_batch = realty_search.get_realty_search_answers_batch
+        default_concurrency = realty_search.REALTY_BATCH_MAX_CONCURRENCY
+    concurrency = max_concurrency or default_concurrency
+
+    counts = {"answered": 0, "failed": 0}
+    write_lock = threading.Lock()
+    with open(output_path, "a", encoding="utf-8") as out:
+        # 이전 실행이 줄 중간에 중단됐으면 줄을 바꿔서 이어 씀
+        if not _ends_with_newline(output_path):
+            out.write("\n")
+        for offset in range(0, len(todo), max(batch_size, 1)):
+            batch = todo[offset:offset + batch_size]
+
+            def _write(i: int, result):
+                record = _result_record(target, batch[i], result)
+                with write_lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()  # 중간에 중단되어도 끝난 답변은 남도록 바로 기록
+                    counts["answered" if record["status"] == "ok" else "failed"] += 1
+
+            batch_start = time.time()
+            answer_batch([item["question"] for item in batch], concurrency, _write)
+            done = min(offset + len(batch), len(todo))
+            print(f"📦 {done}/{len(todo)}개 완료 (묶음 {time.time() - batch_start:.2f}초)")
+
+    summary = {
+        "total": len(questions),
+        "skipped": len(questions) - len(todo),
+        **counts,
+        "elapsed_seconds": round(time.time() - start_time, 2),
+    }
+    print(f"📦 일괄 답변 종료: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSONL 질문 파일 일괄 답변 (SOL/MOLI)")
+    parser.add_argument("input", help="질문 JSONL 파일")
+    parser.add_argument("output", help="결과 JSONL 파일 (있으면 이어서 처리)")
+    parser.add_argument("--target", choices=BULK_TARGETS, default="sol", help="sol: 용어 백과사전, moli: 부동산 매물 검색")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시에 생성하는 답변 수")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="한 번에 임베딩/검색하는 질문 수")
+    args = parser.parse_args(argv)
+
+    summary = run_bulk_answer(args.input, args.output, args.target, args.concurrency, args.batch_size)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
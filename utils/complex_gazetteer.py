@@ -0,0 +1,215 @@
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+# 아파트 단지 사전 파일 (REALTY_COMPLEX_FILE 환경 변수로 교체 가능)
+COMPLEX_DICTIONARY_FILE = os.getenv(
+    "REALTY_COMPLEX_FILE",
+    os.path.join(os.path.dirname(__file__), "complexes.json")
+)
+
+# 이 글자 수 이하인 짧은 별칭('은마', '한진', '엘스')은 바로 뒤에 단지/거래 관련 표현이 있을 때만 인정
+SHORT_ALIAS_MAX_CHARS = 2
+SHORT_ALIAS_CONTEXT_WORDS = ("아파트", "단지", "매매", "전세", "월세", "시세", "매물", "호가", "실거래", "재건축")
+
+# 단지명 바로 뒤에 붙어도 되는 표현 (아파트/단지, 전용면적 숫자, 조사)
+ALIAS_SUFFIX_PATTERN = re.compile(
+    r"(?:아파트|단지)?\d*(?:은|는|이|가|을|를|의|에|에서|으로|로|도|만|과|와|랑|이랑|보다|까지)?"
+)
+
+
+@dataclass
+class ComplexMatch:
+    """질문에서 찾은 단지명"""
+    name: str  # 표준 단지명 (Tavily 검색어 / 네이버 링크에 사용)
+    region: str
+    alias: str  # 질문에서 실제로 일치한 별칭
+    start: int  # 원문 기준 시작 위치
+    end: int  # 원문 기준 끝 위치 (미포함)
+
+
+def _normalize(text: str) -> Tuple[str, List[int]]:
+    """공백 제거 + 소문자 변환, 정규화된 각 글자의 원문 위치도 함께 반환"""
+    chars = []
+    positions = []
+    for i, ch in enumerate(text):
+        if ch.isspace():
+            continue
+        chars.append(ch.lower())
+        positions.append(i)
+    return "".join(chars), positions
+
+
+def _token_end(text: str, index: int) -> int:
+    """index부터 이어지는 단어 글자(한글/영문/숫자)의 끝 위치"""
+    while index < len(text) and text[index].isalnum():
+        index += 1
+    return index
+
+
+def _next_token(text: str, index: int) -> str:
+    """index 이후 처음 나오는 단어"""
+    while index < len(text) and not text[index].isalnum():
+        index += 1
+    return text[index:_token_end(text, index)]
+
+
+def _is_token_aligned(text: str, start: int, end: int, alias_length: int) -> bool:
+    """원문에서 찾은 별칭이 단어 경계에 맞는지
+
+    시작은 단어 처음이어야 하고, 끝은 단어 끝이거나 뒤에 아파트/단지/면적 숫자/조사만 붙어야 함
+    별칭 안의 공백은 각 부분이 두 글자 이상일 때만 무시 ('래미안 위브'는 인정, '은 마'는 불인정)
+    짧은 별칭은 바로 뒤에 단지/거래 관련 표현이 있어야 함
+    """
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if any(len(part) < 2 for part in text[start:end].split()):
+        return False
+    suffix = text[end:_token_end(text, end)]
+    if not ALIAS_SUFFIX_PATTERN.fullmatch(suffix):
+        return False
+    if alias_length <= SHORT_ALIAS_MAX_CHARS:
+        # '은마아파트'처럼 바로 붙은 표현이 없으면 조사 뒤 다음 단어 확인 ('은마는 재건축')
+        context = suffix if suffix.startswith(SHORT_ALIAS_CONTEXT_WORDS) else _next_token(text, end + len(suffix))
+        return context.startswith(SHORT_ALIAS_CONTEXT_WORDS)
+    return True
+
+
+class AhoCorasick:
+    """다중 문자열 검색 오토마톤 (질문 한 번 훑기로 모든 별칭 매칭)"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]  # (패턴 길이, 값)
+        self._built = False
+
+    def add(self, pattern: str, value: Any):
+        """패턴 추가 (build 전에만 가능)"""
+        node = 0
+        for ch in pattern:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((len(pattern), value))
+        self._built = False
+
+    def build(self):
+        """실패 링크 계산 (BFS)"""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+
+    def iter_matches(self, text: str):
+        """(시작 위치, 끝 위치, 값) 순회"""
+        if not self._built:
+            self.build()
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, value in self._output[node]:
+                yield i - length + 1, i + 1, value
+
+
+class ComplexGazetteer:
+    """
+    아파트 단지 사전
+    단지명/별칭/지역 목록을 Aho-Corasick 오토마톤으로 색인하여
+    질문 한 번 훑기로 표준 단지명을 찾음
+    """
+
+    def __init__(self, complexes: List[Dict[str, Any]]):
+        self.complexes = complexes
+        self._automaton = AhoCorasick()
+        for entry in complexes:
+            for alias in {entry["name"], *entry.get("aliases", [])}:
+                normalized, _ = _normalize(alias)
+                if normalized:
+                    self._automaton.add(normalized, (entry, alias))
+        self._automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str) -> "ComplexGazetteer":
+        """JSON 사전 파일 로드 ([{"name", "aliases", "region"}, ...])"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def find_all(self, text: str) -> List[ComplexMatch]:
+        """질문에 나온 단지명 목록 (단어 경계에 맞는 것만, 겹치면 더 앞에서 시작하고 더 긴 것 우선)"""
+        text = text or ""
+        normalized, positions = _normalize(text)
+        candidates = sorted(
+            self._automaton.iter_matches(normalized),
+            key=lambda m: (m[0], -(m[1] - m[0]))
+        )
+
+        matches = []
+        last_end = 0
+        for start, end, (entry, alias) in candidates:
+            if start < last_end:
+                continue
+            original_start, original_end = positions[start], positions[end - 1] + 1
+            # 공백을 지운 문자열에서 찾았으므로 원문 단어 경계를 넘는 일치는 제외
+            if not _is_token_aligned(text, original_start, original_end, end - start):
+                continue
+            matches.append(ComplexMatch(
+                name=entry["name"],
+                region=entry.get("region", ""),
+                alias=alias,
+                start=original_start,
+                end=original_end
+            ))
+            last_end = end
+        return matches
+
+    def match(self, text: str) -> Optional[ComplexMatch]:
+        """질문에서 가장 길게 일치한 단지명 하나"""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return max(matches, key=lambda m: m.end - m.start)
+
+
+_gazetteer_instance = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> ComplexGazetteer:
+    """전역 단지 사전 (최초 호출 시 로드)"""
+    global _gazetteer_instance
+    if _gazetteer_instance is None:
+        with _gazetteer_lock:
+            if _gazetteer_instance is None:
+                try:
+                    _gazetteer_instance = ComplexGazetteer.from_file(COMPLEX_DICTIONARY_FILE)
+                except Exception as e:
+                    print(f"단지 사전 로드 중 오류: {e}")
+                    _gazetteer_instance = ComplexGazetteer([])
+    return _gazetteer_instance
+
+
+def match_complex(text: str) -> Optional[ComplexMatch]:
+    """질문에서 표준 단지명을 찾는 함수"""
+    return get_gazetteer().match(text)
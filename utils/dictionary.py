@@ -1,20 +1,85 @@
 import os
 import json
-import urllib.request
+import hashlib
+import pickle
+import shutil
+import tempfile
+import threading
 import streamlit as st
 import time
-from typing import List, Dict, Any
+import faiss
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
+from langchain.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
+from answer_cache import SemanticAnswerCache
+from routing_config import EMBEDDING_MODEL, RoutingConfig, load_routing_config
+from streaming import AnswerStream, STREAM_RESET, STREAM_ERROR, iter_llm_tokens
+from search_client import get_search_client, request_deadline
+from token_budget import fit_texts_to_budget, truncate_to_tokens, log_prompt_sections, record_llm_usage
 
 # 환경 변수 로드
 load_dotenv()
 
+# 지식베이스 마크다운 파일 경로
+KB_MARKDOWN_FILE = os.path.join(os.path.dirname(__file__), "realty_2025.md")
+
+# 빌드된 FAISS 인덱스를 저장하는 디렉토리 (입력 해시별 하위 디렉토리)
+KB_INDEX_DIR = os.path.join(os.path.dirname(__file__), ".kb_index")
+
+# 청크 텍스트 해시별 임베딩 벡터 저장 파일 (변경된 청크만 재임베딩)
+KB_EMBEDDING_STORE_FILE = os.path.join(KB_INDEX_DIR, "chunk_embeddings.pkl")
+
+# 청크 분할 및 임베딩 설정 (변경 시 인덱스 재생성)
+KB_CHUNK_SIZE = 500
+KB_CHUNK_OVERLAP = 100
+KB_CHUNK_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# 검색 문서 수 (KB 포함 여부 판단용 상위 문서 수, 답변 컨텍스트용 문서 수)
+KB_CHECK_K = 5
+QA_CONTEXT_K = 8
+
+# KB 포함/답변 충분성 판단 기준 (거리 임계값, 최소 문서 길이, 추측 실행 여유폭 등)은
+# utils/kb_routing.json에서 로드 (routing_config.RoutingConfig, benchmarks/bench_routing.py로 보정)
+
+# 추측 실행용 웹 검색 스레드 풀 (모든 세션이 공유)
+_web_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kb-web-search")
+
+# 일괄 답변 시 동시에 생성하는 답변 수 (LLM/웹 검색 동시 호출 상한)
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# 프롬프트 토큰 예산 (KB 문서 컨텍스트, 웹 검색 결과)
+KB_CONTEXT_TOKEN_BUDGET = int(os.getenv("KB_CONTEXT_TOKEN_BUDGET", "2000"))
+WEB_RESULT_TOKEN_BUDGET = int(os.getenv("WEB_RESULT_TOKEN_BUDGET", "1200"))
+
+# 모든 답변 요청에 공통으로 쓰는 지시사항 (시스템 메시지)
+KB_QA_SYSTEM_PROMPT = """당신은 스테이블코인 용어 백과사전 질문에 답하는 도우미입니다.
+제공된 정보를 바탕으로 정확하고 이해하기 쉬운 답변을 제공해주세요.
+답변은 한국어로 작성하고, 필요시 예시를 포함해주세요.
+답변만 출력하세요."""
+
+# 답변 캐시 설정 (유사도 임계값, 유효 시간, 최대 항목 수)
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "21600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+
+@dataclass
+class AnswerResult:
+    """질문 하나에 대한 답변 결과 (페이지는 이 객체 하나로 렌더링)"""
+    answer: str
+    in_kb: bool
+    used_web_search: bool
+    documents: List[Tuple[Document, float]] = field(default_factory=list)  # (문서, FAISS 거리)
+    from_cache: bool = False
+    response_time: float = 0.0
+    error: str = ""  # 답변 생성 중 오류 (없으면 빈 문자열)
+
 class StablecoinDictionary:
     """
     스테이블코인 용어 백과사전 RAG 시스템
@@ -22,23 +87,49 @@ class StablecoinDictionary:
     백과사전에 없는 내용은 인터넷 검색으로 보완
     """
     
-    def __init__(self):
-        self.embeddings = OpenAIEmbeddings()
-        self.llm = ChatOpenAI(
+    def __init__(self, embeddings=None, llm=None, routing: Optional[RoutingConfig] = None,
+                 index_dir: Optional[str] = None):
+        """embeddings/llm/routing/index_dir를 주면 기본 OpenAI 모델, kb_routing.json, .kb_index 대신 사용 (평가용)"""
+        self.embeddings = embeddings or OpenAIEmbeddings(model=EMBEDDING_MODEL)
+        self.llm = llm or ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.1,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            stream_usage=True  # 스트리밍 응답에도 토큰 사용량 포함
         )
+        self.routing = routing or load_routing_config()
+        self.index_dir = index_dir or KB_INDEX_DIR
+        self.embedding_store_file = (os.path.join(index_dir, "chunk_embeddings.pkl") if index_dir
+                                     else KB_EMBEDDING_STORE_FILE)
         self.vector_store = None
-        self.qa_chain = None
+        self.qa_prompt = None
+        self.index_hash = None
+        self._kb_row_mask = None  # FAISS 행별 KB 판단 대상 여부 (일괄 KB 확인용)
+        self._kb_row_mask_key = None
+        self._source_mtime = None
+        self._reload_lock = threading.Lock()
+        self.answer_cache = SemanticAnswerCache(
+            similarity_threshold=ANSWER_CACHE_SIMILARITY,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES
+        )
         self._initialize_knowledge_base()
     
-    def _load_markdown_content(self) -> List[Document]:
+    def _read_markdown_source(self) -> str:
+        """realty_2025.md 원문 읽기 (실패 시 빈 문자열)"""
+        try:
+            with open(KB_MARKDOWN_FILE, 'r', encoding='utf-8') as file:
+                return file.read()
+        except Exception as e:
+            print(f"마크다운 파일 읽기 중 오류: {e}")
+            return ""
+    
+    def _load_markdown_content(self, content: Optional[str] = None) -> List[Document]:
         """realty_2025.md 파일을 구조화된 문서로 로드"""
         try:
-            file_path = os.path.join(os.path.dirname(__file__), "realty_2025.md")
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
+            if content is None:
+                with open(KB_MARKDOWN_FILE, 'r', encoding='utf-8') as file:
+                    content = file.read()
             
             # 마크다운을 구조화된 섹션으로 분할
             documents = []
@@ -173,12 +264,206 @@ class StablecoinDictionary:
         
         return terms
     
+    def _embedding_model_name(self) -> str:
+        """현재 임베딩 모델 이름"""
+        return getattr(self.embeddings, "model", EMBEDDING_MODEL)
+    
+    def _compute_index_hash(self, content: str) -> str:
+        """마크다운 내용, 청크 설정, 임베딩 모델로부터 인덱스 해시 계산"""
+        key_source = json.dumps({
+            "content": content,
+            "chunk_size": KB_CHUNK_SIZE,
+            "chunk_overlap": KB_CHUNK_OVERLAP,
+            "separators": KB_CHUNK_SEPARATORS,
+            "embedding_model": self._embedding_model_name(),
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    
+    def _index_path(self, index_hash: str) -> str:
+        """인덱스 해시에 해당하는 저장 디렉토리 경로"""
+        return os.path.join(self.index_dir, index_hash[:16])
+    
+    def _read_faiss_index(self, index_file: str):
+        """FAISS 인덱스를 메모리 매핑으로 읽기 (지원되지 않으면 일반 로드)"""
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        try:
+            return faiss.read_index(index_file, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+        except Exception:
+            return faiss.read_index(index_file)
+    
+    def _load_index_from_disk(self, index_hash: str) -> bool:
+        """저장된 인덱스가 현재 해시와 일치하면 로드"""
+        index_dir = self._index_path(index_hash)
+        try:
+            if not os.path.exists(os.path.join(index_dir, "index.faiss")):
+                return False
+            
+            index = self._read_faiss_index(os.path.join(index_dir, "index.faiss"))
+            with open(os.path.join(index_dir, "index.pkl"), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            
+            self.vector_store = FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+            return True
+        except Exception as e:
+            print(f"저장된 인덱스 로드 중 오류: {e}")
+            return False
+    
+    def _save_index_to_disk(self, index_hash: str):
+        """빌드된 인덱스를 해시 디렉토리에 원자적으로 저장하고 이전 인덱스 정리"""
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            index_dir = self._index_path(index_hash)
+            
+            # 임시 디렉토리에 먼저 저장한 뒤 이름 변경 (다른 프로세스가 부분 파일을 읽지 않도록)
+            tmp_dir = tempfile.mkdtemp(dir=self.index_dir, prefix=".tmp-")
+            self.vector_store.save_local(tmp_dir)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "index_hash": index_hash,
+                    "embedding_model": self._embedding_model_name(),
+                    "created_at": time.time()
+                }, f)
+            
+            if os.path.exists(index_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.rename(tmp_dir, index_dir)
+            
+            # 이전 해시의 인덱스 삭제 (이미 매핑 중인 프로세스는 영향 없음)
+            for name in os.listdir(self.index_dir):
+                path = os.path.join(self.index_dir, name)
+                if path != index_dir and os.path.isdir(path) and not name.startswith(".tmp-"):
+                    shutil.rmtree(path, ignore_errors=True)
+        except Exception as e:
+            print(f"인덱스 저장 중 오류: {e}")
+    
+    def _load_previous_index(self) -> Optional[FAISS]:
+        """가장 최근에 저장된 (수정 가능한) 인덱스 로드 - 증분 갱신의 기준"""
+        try:
+            if not os.path.isdir(self.index_dir):
+                return None
+            
+            candidates = []
+            for name in os.listdir(self.index_dir):
+                meta_path = os.path.join(self.index_dir, name, "meta.json")
+                if name.startswith(".tmp-") or not os.path.exists(meta_path):
+                    continue
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                # 임베딩 모델이 다르면 벡터를 재사용할 수 없음
+                if meta.get("embedding_model") != self._embedding_model_name():
+                    continue
+                candidates.append((meta.get("created_at", 0), os.path.join(self.index_dir, name)))
+            
+            if not candidates:
+                return None
+            
+            _, index_dir = max(candidates)
+            index = faiss.read_index(os.path.join(index_dir, "index.faiss"))
+            with open(os.path.join(index_dir, "index.pkl"), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            return FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+        except Exception as e:
+            print(f"이전 인덱스 로드 중 오류: {e}")
+            return None
+    
+    def _chunk_text_hash(self, text: str) -> str:
+        """청크 텍스트 해시 (임베딩 저장소 키)"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def _chunk_doc_id(self, doc: Document) -> str:
+        """청크 텍스트와 메타데이터 해시 (FAISS docstore id)"""
+        key_source = json.dumps(
+            {"text": doc.page_content, "metadata": doc.metadata},
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    
+    def _load_embedding_store(self) -> Dict[str, List[float]]:
+        """청크 텍스트 해시별 임베딩 저장소 로드"""
+        try:
+            if os.path.exists(self.embedding_store_file):
+                with open(self.embedding_store_file, "rb") as f:
+                    store = pickle.load(f)
+                if store.get("embedding_model") == self._embedding_model_name():
+                    return store.get("vectors", {})
+        except Exception as e:
+            print(f"임베딩 저장소 로드 중 오류: {e}")
+        return {}
+    
+    def _save_embedding_store(self, vectors: Dict[str, List[float]]):
+        """청크 텍스트 해시별 임베딩 저장소를 원자적으로 저장"""
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, prefix=".tmp-", suffix=".pkl")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"embedding_model": self._embedding_model_name(), "vectors": vectors}, f)
+            os.replace(tmp_path, self.embedding_store_file)
+        except Exception as e:
+            print(f"임베딩 저장소 저장 중 오류: {e}")
+    
     def _initialize_knowledge_base(self):
         """스테이블코인 용어 백과사전 지식베이스 초기화"""
         print("🔄 스테이블코인 용어 백과사전 지식베이스 초기화 중...")
         
+        if os.path.exists(KB_MARKDOWN_FILE):
+            self._source_mtime = os.path.getmtime(KB_MARKDOWN_FILE)
+        content = self._read_markdown_source()
+        self.index_hash = self._compute_index_hash(content)
+        
+        # 인덱스 해시가 바뀌면 이전 답변 캐시는 무효
+        self.answer_cache.set_index_hash(self.index_hash)
+        
+        if self._load_index_from_disk(self.index_hash):
+            print(f"💾 저장된 FAISS 인덱스를 로드했습니다. ({self.index_hash[:16]})")
+        else:
+            self._build_index(content)
+            self._save_index_to_disk(self.index_hash)
+        
+        # 프롬프트 템플릿 정의 (공통 지시사항은 시스템 메시지, 검색된 문서는 컨텍스트로 직접 채움)
+        self.qa_prompt = ChatPromptTemplate.from_messages([
+            ("system", KB_QA_SYSTEM_PROMPT),
+            ("human", "{question}\n\n컨텍스트:\n{context}")
+        ])
+        
+        print("✅ 스테이블코인 용어 백과사전 지식베이스 초기화 완료!")
+        
+        # 통계 정보 출력
+        self._print_statistics()
+    
+    def _refresh_knowledge_base_if_changed(self):
+        """realty_2025.md가 수정되었으면 지식베이스를 다시 초기화 (답변 캐시도 무효화)"""
+        try:
+            mtime = os.path.getmtime(KB_MARKDOWN_FILE)
+        except OSError:
+            return
+        
+        if mtime == self._source_mtime:
+            return
+        
+        with self._reload_lock:
+            if mtime == self._source_mtime:
+                return
+            if self._compute_index_hash(self._read_markdown_source()) != self.index_hash:
+                print("📝 realty_2025.md 변경 감지 - 지식베이스를 갱신합니다.")
+                self._initialize_knowledge_base()
+            else:
+                self._source_mtime = mtime
+    
+    def _build_index(self, content: str):
+        """마크다운을 청크로 분할하고 임베딩하여 FAISS 인덱스 생성"""
         # 마크다운 파일을 구조화된 문서로 로드
-        documents = self._load_markdown_content()
+        documents = self._load_markdown_content(content) if content else []
         
         if not documents:
             print("⚠️ 마크다운 파일을 로드할 수 없습니다. 샘플 데이터를 사용합니다.")
@@ -199,45 +484,71 @@ class StablecoinDictionary:
         
         # 텍스트 분할 (더 작은 청크로 분할하여 정확도 향상)
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,  # 더 작은 청크로 변경
-            chunk_overlap=100,
-            separators=["\n\n", "\n", ". ", " ", ""]
+            chunk_size=KB_CHUNK_SIZE,  # 더 작은 청크로 변경
+            chunk_overlap=KB_CHUNK_OVERLAP,
+            separators=KB_CHUNK_SEPARATORS
         )
         splits = text_splitter.split_documents(documents)
         
         print(f"✂️ 텍스트를 {len(splits)}개의 청크로 분할했습니다.")
         
-        # Vector DB 생성
-        print("🔍 FAISS 벡터 데이터베이스 생성 중...")
-        self.vector_store = FAISS.from_documents(splits, self.embeddings)
+        # 동일한 청크(텍스트+메타데이터)는 하나만 유지
+        chunks = {}
+        for doc in splits:
+            chunks.setdefault(self._chunk_doc_id(doc), doc)
         
-        # QA 체인 생성 (새로운 방식 사용)
-        retriever = self.vector_store.as_retriever(search_kwargs={"k": 8})
-        
-        # 프롬프트 템플릿 정의
-        prompt_template = """
-        다음은 스테이블코인 용어 백과사전에 대한 질문입니다.
-        질문: {question}
+        # 저장소에 없는 청크 텍스트만 임베딩
+        stored_vectors = self._load_embedding_store()
+        vectors = {}
+        texts_to_embed = {}
+        for doc in chunks.values():
+            text_hash = self._chunk_text_hash(doc.page_content)
+            if text_hash in stored_vectors:
+                vectors[text_hash] = stored_vectors[text_hash]
+            else:
+                texts_to_embed[text_hash] = doc.page_content
         
-        제공된 정보를 바탕으로 정확하고 이해하기 쉬운 답변을 제공해주세요.
-        답변은 한국어로 작성하고, 필요시 예시를 포함해주세요.
+        if texts_to_embed:
+            print(f"🧮 변경된 청크 {len(texts_to_embed)}개 임베딩 중...")
+            embedded = self.embeddings.embed_documents(list(texts_to_embed.values()))
+            vectors.update(zip(texts_to_embed.keys(), embedded))
         
-        컨텍스트: {context}
-        """
+        def _text_embeddings(doc_ids):
+            return [
+                (chunks[doc_id].page_content, vectors[self._chunk_text_hash(chunks[doc_id].page_content)])
+                for doc_id in doc_ids
+            ]
         
-        # 새로운 체인 생성
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            chain_type="stuff",
-            retriever=retriever,
-            return_source_documents=True,
-            chain_type_kwargs={"prompt": PromptTemplate.from_template(prompt_template)}
-        )
+        # 이전 인덱스가 있으면 변경분만 패치, 없으면 저장된 벡터로 새로 생성
+        vector_store = self._load_previous_index()
+        if vector_store is not None:
+            old_ids = set(vector_store.index_to_docstore_id.values())
+            stale_ids = [doc_id for doc_id in old_ids if doc_id not in chunks]
+            new_ids = [doc_id for doc_id in chunks if doc_id not in old_ids]
+            
+            if stale_ids:
+                vector_store.delete(stale_ids)
+            if new_ids:
+                vector_store.add_embeddings(
+                    text_embeddings=_text_embeddings(new_ids),
+                    metadatas=[chunks[doc_id].metadata for doc_id in new_ids],
+                    ids=new_ids
+                )
+            print(f"🩹 FAISS 인덱스 증분 갱신: 추가 {len(new_ids)}개, 삭제 {len(stale_ids)}개, 신규 임베딩 {len(texts_to_embed)}개")
+        else:
+            print("🔍 FAISS 벡터 데이터베이스 생성 중...")
+            doc_ids = list(chunks.keys())
+            vector_store = FAISS.from_embeddings(
+                text_embeddings=_text_embeddings(doc_ids),
+                embedding=self.embeddings,
+                metadatas=[chunks[doc_id].metadata for doc_id in doc_ids],
+                ids=doc_ids
+            )
         
-        print("✅ 스테이블코인 용어 백과사전 지식베이스 초기화 완료!")
+        self.vector_store = vector_store
         
-        # 통계 정보 출력
-        self._print_statistics()
+        # 현재 청크에 해당하는 벡터만 남겨 저장 (삭제된 섹션의 벡터 정리)
+        self._save_embedding_store(vectors)
     
     def _print_statistics(self):
         """벡터 DB 통계 정보 출력"""
@@ -266,41 +577,38 @@ class StablecoinDictionary:
         except Exception as e:
             print(f"통계 정보 출력 중 오류: {e}")
     
-    def _search_internet(self, query: str) -> str:
-        """인터넷에서 스테이블코인 관련 정보 검색"""
+    def _search_internet(self, query: str, deadline: Optional[float] = None) -> Tuple[str, bool]:
+        """인터넷에서 스테이블코인 관련 정보 검색 (deadline: 요청 시간 예산이 끝나는 시각)
+        
+        (검색 결과 또는 오류 안내 문장, 검색 성공 여부) 반환
+        """
         try:
             # Tavily 우선 사용 (유일한 외부 검색 API)
             tavily_api_key = os.getenv("TAVILY_API_KEY")
             if tavily_api_key:
-                return self._tavily_search(query)
+                return self._tavily_search(query, deadline)
             
             # Tavily API 키 미설정 시 알림 반환
-            return "Tavily API 키가 설정되어 있지 않습니다. 환경 변수 TAVILY_API_KEY를 설정해주세요."
+            return "Tavily API 키가 설정되어 있지 않습니다. 환경 변수 TAVILY_API_KEY를 설정해주세요.", False
             
         except Exception as e:
-            return f"인터넷 검색 중 오류가 발생했습니다: {str(e)}"
+            return f"인터넷 검색 중 오류가 발생했습니다: {str(e)}", False
     
-    def _tavily_search(self, query: str) -> str:
-        """Tavily Search API를 사용한 웹 검색"""
+    def _tavily_search(self, query: str, deadline: Optional[float] = None) -> Tuple[str, bool]:
+        """Tavily Search API를 사용한 웹 검색 (공유 연결 풀, 재시도, 차단기 적용)"""
         try:
             tavily_api_key = os.getenv("TAVILY_API_KEY")
             if not tavily_api_key:
-                return "Tavily API 키가 설정되어 있지 않습니다. 환경 변수 TAVILY_API_KEY를 설정해주세요."
-            
-            url = "https://api.tavily.com/search"
-            payload = {
-                "api_key": tavily_api_key,
-                "query": query,
-                "search_depth": "advanced",
-                "max_results": 5,
-                "include_answer": True,
-                "include_images": False
-            }
-            data = json.dumps(payload).encode("utf-8")
+                return "Tavily API 키가 설정되어 있지 않습니다. 환경 변수 TAVILY_API_KEY를 설정해주세요.", False
             
-            req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
-            with urllib.request.urlopen(req, timeout=20) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
+            result = get_search_client().search(
+                query,
+                deadline=deadline,
+                search_depth="advanced",
+                max_results=5,
+                include_answer=True,
+                include_images=False
+            )
             
             # 결과 정리
             parts = []
@@ -318,35 +626,25 @@ class StablecoinDictionary:
                     formatted_sources.append(f"- {title} ({url_src})\n  요약: {snippet}")
                 parts.append("\n참고 출처:\n" + "\n".join(formatted_sources))
             
-            return "\n\n".join(parts) if parts else "웹 검색 결과를 찾기 어려웠습니다."
+            return ("\n\n".join(parts) if parts else "웹 검색 결과를 찾기 어려웠습니다."), True
         except Exception as e:
-            return f"Tavily 검색 중 오류: {str(e)}"
+            return f"Tavily 검색 중 오류: {str(e)}", False
     
     def _check_knowledge_coverage(self, question: str, answer: str) -> bool:
         """답변이 지식베이스에서 충분히 도출되었는지 확인"""
+        routing = self.routing
         # 간단한 품질 체크: 답변이 너무 짧거나 일반적인 경우
-        if len(answer) < 50:
+        if len(answer) < routing.min_answer_length:
             return False
         
         # 사과/정보부족 표현이 포함된 경우
-        low_confidence_phrases = [
-            "모르겠습니다", "찾을 수 없습니다", "정보가 부족합니다",
-            "알 수 없습니다", "확실하지 않습니다",
-            "제공된 정보에는", "제공받은 정보에는", "포함되어 있지 않습니다",
-            "해당 정보를 제공할 수 없습니다", "예측 가능합니다", "예상됩니다",
-            "고려할 때", "추세를 고려", "방향을 예상"
-        ]
-        
-        for phrase in low_confidence_phrases:
-            if phrase in answer:
-                return False
+        if any(phrase in answer for phrase in routing.low_confidence_phrases):
+            return False
         
         # 질문에 "예측", "미래", "앞으로" 같은 단어가 있고 답변에 구체적 정보가 없으면 False
-        future_keywords = ["예측", "미래", "앞으로", "향후", "2026", "2027", "내년"]
-        if any(keyword in question for keyword in future_keywords):
+        if any(keyword in question for keyword in routing.future_keywords):
             # 미래 관련 질문인데 답변이 추측성 표현만 있으면 KB에 없다고 판단
-            speculation_phrases = ["예상됩니다", "예측 가능합니다", "고려할 때", "추세를 고려"]
-            if any(phrase in answer for phrase in speculation_phrases):
+            if any(phrase in answer for phrase in routing.speculation_phrases):
                 # 구체적인 숫자나 사실이 있는지 확인
                 has_concrete_info = any(char.isdigit() for char in answer) or "2025" in answer
                 if not has_concrete_info:
@@ -354,52 +652,168 @@ class StablecoinDictionary:
         
         return True
     
-    def _is_in_knowledge_base(self, question: str) -> bool:
+    def _retrieve_with_scores(self, question: str, embedding: Optional[List[float]] = None, k: int = KB_CHECK_K) -> List[Tuple[Document, float]]:
+        """질문과 유사한 문서를 거리 점수와 함께 검색 (이미 계산된 질문 임베딩이 있으면 재사용)"""
+        if not self.vector_store:
+            return []
+        if embedding is not None:
+            return self.vector_store.similarity_search_with_score_by_vector(embedding, k=k)
+        return self.vector_store.similarity_search_with_score(question, k=k)
+    
+    def _search_index_batch(self, embeddings: List[List[float]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 질문 임베딩으로 FAISS 인덱스를 행렬 검색 한 번에 조회 (거리 행렬, 행 번호 행렬, 없는 자리는 -1)"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if getattr(self.vector_store, "_normalize_L2", False):
+            faiss.normalize_L2(vectors)
+        return self.vector_store.index.search(vectors, k)
+    
+    def _retrieve_batch_with_scores(self, embeddings: List[List[float]], k: int = QA_CONTEXT_K) -> List[List[Tuple[Document, float]]]:
+        """여러 질문 임베딩으로 FAISS 인덱스를 한 번에 검색 (질문별 (문서, 거리) 목록)"""
+        if not self.vector_store or not embeddings:
+            return [[] for _ in embeddings]
+        distances, indices = self._search_index_batch(embeddings, k)
+        
+        results = []
+        for row_distances, row_indices in zip(distances, indices):
+            docs_with_scores = []
+            for distance, i in zip(row_distances, row_indices):
+                if i == -1:
+                    continue
+                doc = self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[i])
+                if isinstance(doc, Document):
+                    docs_with_scores.append((doc, float(distance)))
+            results.append(docs_with_scores)
+        return results
+    
+    def _best_kb_distance(self, docs_with_scores: List[Tuple[Document, float]]) -> Optional[float]:
+        """검색된 상위 문서 중 realty_2025.md 문서의 최소 거리 (없으면 None)"""
+        distances = [
+            score for doc, score in docs_with_scores[:KB_CHECK_K]
+            if (doc.metadata.get('source') == 'realty_2025.md' and
+                len(doc.page_content) > self.routing.kb_min_content_length)
+        ]
+        return min(distances) if distances else None
+    
+    def _docs_in_knowledge_base(self, docs_with_scores: List[Tuple[Document, float]]) -> bool:
+        """검색된 문서 중 지식베이스 범위로 볼 수 있는 문서가 있는지 확인"""
+        # realty_2025.md에서 온 문서이고 유사도가 충분히 높은 경우만 True
+        # FAISS의 유사도 점수는 거리이므로 낮을수록 유사함 (일반적으로 0.5 이하가 유사)
+        best_distance = self._best_kb_distance(docs_with_scores)
+        return best_distance is not None and best_distance < self.routing.kb_distance_threshold
+    
+    def _is_borderline(self, docs_with_scores: List[Tuple[Document, float]]) -> bool:
+        """KB 포함으로 판단됐지만 거리가 임계값에 가까워 웹 검색 보완 가능성이 높은지 확인"""
+        best_distance = self._best_kb_distance(docs_with_scores)
+        threshold = self.routing.kb_distance_threshold
+        return (best_distance is not None and
+                threshold - self.routing.speculative_search_margin <= best_distance < threshold)
+    
+    def _is_in_knowledge_base(self, question: str, embedding: Optional[List[float]] = None) -> bool:
         """질문이 지식베이스에 있는 내용인지 빠르게 확인"""
         try:
-            if not self.vector_store:
-                return False
-            
             # 유사도 점수와 함께 검색 (유사도가 높은 문서만 KB에 있다고 판단)
-            docs_with_scores = self.vector_store.similarity_search_with_score(question, k=5)
-            
-            # 검색된 문서의 메타데이터와 유사도 점수 확인
-            for doc, score in docs_with_scores:
-                metadata = doc.metadata
-                # realty_2025.md에서 온 문서이고 유사도가 충분히 높은 경우만 True
-                # FAISS의 유사도 점수는 거리이므로 낮을수록 유사함 (일반적으로 0.5 이하가 유사)
-                if (metadata.get('source') == 'realty_2025.md' and 
-                    len(doc.page_content) > 50 and
-                    score < 0.7):  # 유사도 점수가 0.7 미만이면 관련 있다고 판단
-                    return True
-            
-            return False
+            docs_with_scores = self._retrieve_with_scores(question, embedding, k=KB_CHECK_K)
+            return self._docs_in_knowledge_base(docs_with_scores)
             
         except Exception as e:
             print(f"지식베이스 확인 중 오류: {e}")
             # 오류 발생 시 보수적으로 False 반환 (웹 검색으로 전환)
             return False
     
+    def _get_kb_row_mask(self) -> np.ndarray:
+        """FAISS 행별로 KB 판단 대상 문서(realty_2025.md, 최소 길이 초과)인지 나타내는 배열 (인덱스가 바뀔 때만 재계산)"""
+        key = (id(self.vector_store), self.index_hash, self.vector_store.index.ntotal)
+        if self._kb_row_mask is None or self._kb_row_mask_key != key:
+            docstore = self.vector_store.docstore
+            mask = np.zeros(self.vector_store.index.ntotal, dtype=bool)
+            for row, doc_id in self.vector_store.index_to_docstore_id.items():
+                doc = docstore.search(doc_id)
+                if isinstance(doc, Document) and row < len(mask):
+                    mask[row] = (doc.metadata.get('source') == 'realty_2025.md' and
+                                 len(doc.page_content) > self.routing.kb_min_content_length)
+            self._kb_row_mask, self._kb_row_mask_key = mask, key
+        return self._kb_row_mask
+    
+    def _best_kb_distance_batch(self, embeddings: List[List[float]]) -> np.ndarray:
+        """질문별 상위 KB_CHECK_K개 문서 중 KB 판단 대상 문서의 최소 거리 (없으면 inf)"""
+        distances, indices = self._search_index_batch(embeddings, KB_CHECK_K)
+        eligible = (indices >= 0) & self._get_kb_row_mask()[np.clip(indices, 0, None)]
+        return np.where(eligible, distances, np.inf).min(axis=1)
+    
+    def _is_in_knowledge_base_batch(self, questions: List[str],
+                                    embeddings: Optional[List[List[float]]] = None) -> np.ndarray:
+        """여러 질문이 지식베이스에 있는 내용인지 한 번에 확인 (질문 순서대로 bool 배열)
+        
+        임베딩 한 번, FAISS 행렬 검색 한 번으로 처리하고 출처/길이/거리 조건은 배열 연산으로 판단
+        (질문별 _is_in_knowledge_base와 같은 결과)
+        """
+        if not questions:
+            return np.zeros(0, dtype=bool)
+        try:
+            if not self.vector_store:
+                return np.zeros(len(questions), dtype=bool)
+            if embeddings is None:
+                embeddings = self.embeddings.embed_documents(questions)
+            return self._best_kb_distance_batch(embeddings) < self.routing.kb_distance_threshold
+        except Exception as e:
+            print(f"일괄 지식베이스 확인 중 오류: {e}")
+            # 오류 발생 시 보수적으로 모두 False (웹 검색으로 전환)
+            return np.zeros(len(questions), dtype=bool)
+    
+    def _build_qa_prompt(self, prompt: str, docs_with_scores: List[Tuple[Document, float]], name: str = "sol") -> list:
+        """이미 검색된 문서를 컨텍스트로 채운 QA 프롬프트 메시지 (재검색 없음)
+        
+        중복 문서를 제거하고 컨텍스트를 KB_CONTEXT_TOKEN_BUDGET 토큰 이내로 맞춤
+        """
+        chunks = fit_texts_to_budget([doc.page_content for doc, _ in docs_with_scores], KB_CONTEXT_TOKEN_BUDGET)
+        context = "\n\n".join(chunks)
+        log_prompt_sections(name, {"system": KB_QA_SYSTEM_PROMPT, "question": prompt, "context": context})
+        return self.qa_prompt.format_messages(question=prompt, context=context)
+    
+    def _generate_answer(self, prompt: str, docs_with_scores: List[Tuple[Document, float]], name: str = "sol") -> str:
+        """이미 검색된 문서를 컨텍스트로 넣어 답변 생성"""
+        messages = self._build_qa_prompt(prompt, docs_with_scores, name)
+        response = self.llm.invoke(messages)
+        record_llm_usage(name, messages, response.content, getattr(response, "usage_metadata", None))
+        return response.content
+    
+    def _stream_generate_answer(self, prompt: str, docs_with_scores: List[Tuple[Document, float]], name: str = "sol") -> Iterator[str]:
+        """이미 검색된 문서를 컨텍스트로 넣어 답변을 토큰 단위로 생성"""
+        return iter_llm_tokens(self.llm, self._build_qa_prompt(prompt, docs_with_scores, name), usage_name=name)
+    
+    def _kb_answer_prompt(self, question: str) -> str:
+        """지식베이스 문서 기반 답변 프롬프트"""
+        return f"""질문: {question}
+
+이 질문은 백과사전에 포함된 내용이므로 상세하고 정확한 답변을 제공해주세요."""
+    
+    def _web_answer_prompt(self, question: str, internet_result: str) -> str:
+        """인터넷 검색 결과 기반 답변 프롬프트 (검색 결과는 WEB_RESULT_TOKEN_BUDGET 토큰 이내)"""
+        internet_result = truncate_to_tokens(internet_result, WEB_RESULT_TOKEN_BUDGET)
+        return f"""질문: {question}
+
+인터넷 검색 결과: {internet_result}
+
+위 정보를 종합하여 사실 기반으로 명확하게 답변하세요.
+사과나 '정보가 없습니다'와 같은 표현은 사용하지 말고, 필요한 경우 핵심 출처 링크를 함께 제시하세요."""
+    
     def get_fast_answer(self, question: str) -> str:
         """빠른 답변을 위한 최적화된 함수 (DB에 있는 내용인 경우)"""
         start_time = time.time()
         
         try:
-            # 지식베이스에 있는 내용인지 빠르게 확인
-            is_in_kb = self._is_in_knowledge_base(question)
+            # 지식베이스에 있는 내용인지 빠르게 확인 (검색 결과는 답변 생성에 재사용)
+            docs_with_scores = self._retrieve_with_scores(question, k=KB_CHECK_K)
+            is_in_kb = self._docs_in_knowledge_base(docs_with_scores)
             
             if is_in_kb:
                 # DB에 있는 내용인 경우 - 최적화된 프롬프트로 빠른 답변
-                fast_prompt = f"""
-                질문: {question}
-                
-                위 질문에 대해 백과사전의 정보를 바탕으로 간결하고 정확하게 답변해주세요.
-                답변은 한국어로 작성하고, 핵심 내용 위주로 작성해주세요.
-                """
+                fast_prompt = f"""질문: {question}
+
+위 질문에 대해 백과사전의 정보를 바탕으로 간결하게, 핵심 내용 위주로 답변해주세요."""
                 
-                # 빠른 검색을 위해 k=3으로 제한
-                result = self.qa_chain({"query": fast_prompt})
-                answer = result["result"]
+                # 빠른 답변을 위해 상위 3개 문서만 컨텍스트로 사용
+                answer = self._generate_answer(fast_prompt, docs_with_scores[:3], name="sol-fast")
                 
                 response_time = time.time() - start_time
                 print(f"⚡ 빠른 답변 완료 (응답시간: {response_time:.2f}초)")
@@ -425,77 +839,170 @@ class StablecoinDictionary:
         Returns:
             tuple: (답변 문자열, 웹 검색 사용 여부)
         """
+        result = self.get_answer_result(question)
+        return result.answer, result.used_web_search
+    
+    def get_answer_result(self, question: str) -> AnswerResult:
+        """사용자 질문에 대한 답변, KB 포함 여부, 검색 문서, 웹 검색 사용 여부를 한 번에 반환
+        
+        질문 임베딩과 FAISS 검색은 요청당 한 번만 수행
+        """
+        return self.stream_answer(question).consume()
+    
+    def stream_answer(self, question: str, question_embedding: Optional[List[float]] = None,
+                      documents: Optional[List[Tuple[Document, float]]] = None) -> AnswerStream:
+        """사용자 질문에 대한 답변을 토큰 단위로 스트리밍
+        
+        KB 답변이 부족해 웹 검색 답변으로 교체할 때는 STREAM_RESET, 오류 안내로 교체할 때는 STREAM_ERROR를 먼저 보냄
+        스트림을 끝까지 소비하면 result에 AnswerResult가 완성됨
+        미리 계산한 질문 임베딩/검색 문서가 있으면 재사용 (일괄 답변용)
+        """
+        result = AnswerResult(answer="", in_kb=False, used_web_search=False)
+        return AnswerStream(result, self._answer_tokens(question, result, question_embedding, documents))
+    
+    def answer_batch(self, questions: List[str], max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                     on_result: Optional[Callable[[int, AnswerResult], None]] = None) -> List[AnswerResult]:
+        """여러 질문에 한 번에 답변 (질문 순서대로 AnswerResult 목록 반환)
+        
+        캐시에 없는 질문은 임베딩 한 번, FAISS 검색 한 번으로 처리하고,
+        답변 생성(LLM/웹 검색)만 max_concurrency개씩 동시에 실행
+        on_result(순번, 결과)는 답변이 끝나는 대로 호출 (결과 파일 이어 쓰기용)
+        """
         start_time = time.time()
-        used_web_search = False
+        self._refresh_knowledge_base_if_changed()
+        
+        # 같은 질문이 캐시에 있으면 임베딩하지 않음
+        pending = [i for i, q in enumerate(questions) if self.answer_cache.peek_exact(q) is None]
+        embeddings: Dict[int, List[float]] = {}
+        documents: Dict[int, List[Tuple[Document, float]]] = {}
+        if pending:
+            vectors = self.embeddings.embed_documents([questions[i] for i in pending])
+            embeddings = dict(zip(pending, vectors))
+            try:
+                documents = dict(zip(pending, self._retrieve_batch_with_scores(vectors, k=QA_CONTEXT_K)))
+            except Exception as e:
+                print(f"일괄 지식베이스 검색 중 오류: {e}")
+        print(f"📦 일괄 답변: 질문 {len(questions)}개 중 {len(pending)}개 임베딩/검색 ({time.time() - start_time:.2f}초)")
+        
+        results: List[Optional[AnswerResult]] = [None] * len(questions)
+        with ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="kb-batch") as executor:
+            futures = {
+                executor.submit(self.stream_answer(q, embeddings.get(i), documents.get(i)).consume): i
+                for i, q in enumerate(questions)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                if on_result:
+                    on_result(i, results[i])
+        
+        print(f"📦 일괄 답변 완료: {len(questions)}개 ({time.time() - start_time:.2f}초)")
+        return results
+    
+    def _answer_tokens(self, question: str, result: AnswerResult, question_embedding: Optional[List[float]] = None,
+                       documents: Optional[List[Tuple[Document, float]]] = None) -> Iterator[Any]:
+        """답변 생성 파이프라인 (토큰을 내보내면서 result를 채움)"""
+        start_time = time.time()
+        # 웹 검색은 요청 시작부터 정해진 시간 예산 안에서만 수행
+        search_deadline = request_deadline()
         
         try:
+            self._refresh_knowledge_base_if_changed()
+            
+            # 같은 질문이면 임베딩 없이 캐시에서 바로 반환 (적중/실패는 get에서 질문당 한 번만 집계)
+            if question_embedding is None and self.answer_cache.peek_exact(question) is None:
+                # 질문 임베딩은 캐시 조회와 KB 검색에 함께 사용
+                question_embedding = self.embeddings.embed_query(question)
+            cached = self.answer_cache.get(question, question_embedding)
+            if cached is None and question_embedding is None:
+                # 확인 직후 같은 질문 항목이 만료된 경우
+                question_embedding = self.embeddings.embed_query(question)
+            if cached is not None:
+                for key, value in cached.items():
+                    setattr(result, key, value)
+                result.from_cache = True
+                result.response_time = time.time() - start_time
+                print(f"💾 캐시된 답변 반환 (응답시간: {result.response_time:.3f}초)")
+                yield result.answer
+                return
+            
             # 먼저 지식베이스에 있는 내용인지 빠르게 확인
-            is_in_kb = self._is_in_knowledge_base(question)
+            if documents is not None:
+                result.documents = documents
+            else:
+                try:
+                    # 답변 컨텍스트에 쓸 문서까지 한 번에 검색 (상위 KB_CHECK_K개로 KB 포함 여부 판단)
+                    result.documents = self._retrieve_with_scores(question, question_embedding, k=QA_CONTEXT_K)
+                except Exception as e:
+                    print(f"지식베이스 확인 중 오류: {e}")
+            result.in_kb = self._docs_in_knowledge_base(result.documents)
             
-            if not is_in_kb:
+            if not result.in_kb:
                 # KB에 없으면 즉시 웹 검색 경로로 전환
-                used_web_search = True
-                internet_result = self._search_internet(question)
-                enhanced_prompt = f"""
-                다음 질문에 대해 답변해주세요:
-                질문: {question}
-                
-                인터넷 검색 결과: {internet_result}
-                
-                위 정보를 종합하여 사실 기반으로 명확하게 답변하세요.
-                답변은 한국어로 작성하고, 사과나 '정보가 없습니다'와 같은 표현은 사용하지 마세요.
-                필요한 경우 핵심 출처 링크를 함께 제시하세요.
-                답변만 출력하세요.
-                """
-                enhanced_result = self.qa_chain({"query": enhanced_prompt})
-                response_time = time.time() - start_time
-                print(f"인터넷 검색 기반 답변 완료 (응답시간: {response_time:.2f}초)")
-                return enhanced_result['result'], used_web_search
+                result.used_web_search = True
+                internet_result, search_ok = self._search_internet(question, search_deadline)
+                for token in self._stream_generate_answer(self._web_answer_prompt(question, internet_result), result.documents, name="sol-web"):
+                    result.answer += token
+                    yield token
+                if search_ok:
+                    self._cache_answer(question, question_embedding, result)
+                result.response_time = time.time() - start_time
+                print(f"인터넷 검색 기반 답변 완료 (응답시간: {result.response_time:.2f}초)")
+                return
             
             # 프롬프트 템플릿 (KB에 있는 경우)
-            prompt = f"""
-            다음은 스테이블코인 용어 백과사전에 대한 질문입니다.
-            질문: {question}
+            prompt = self._kb_answer_prompt(question)
             
-            제공된 정보를 바탕으로 정확하고 이해하기 쉬운 답변을 제공해주세요.
-            답변은 한국어로 작성하고, 필요시 예시를 포함해주세요.
-            이 질문은 백과사전에 포함된 내용이므로 상세하고 정확한 답변을 제공해주세요.
-            답변만 출력하세요.
-            """
+            # 경계선 질문이면 KB 답변 생성과 동시에 웹 검색을 미리 시작
+            web_search_future = None
+            if self._is_borderline(result.documents):
+                web_search_future = _web_search_executor.submit(self._search_internet, question, search_deadline)
             
-            # QA 체인 실행
-            result = self.qa_chain({"query": prompt})
-            answer = result["result"]
+            # 이미 검색된 문서로 답변 생성
+            for token in self._stream_generate_answer(prompt, result.documents, name="sol-kb"):
+                result.answer += token
+                yield token
             
             # 지식베이스에서 충분한 정보를 얻었는지 확인
-            if self._check_knowledge_coverage(question, answer):
-                response_time = time.time() - start_time
-                print(f"내부 지식 데이터 기반 답변 완료 (응답시간: {response_time:.2f}초)")
-                return answer, used_web_search
+            if self._check_knowledge_coverage(question, result.answer):
+                if web_search_future is not None:
+                    web_search_future.cancel()
+                self._cache_answer(question, question_embedding, result)
+                result.response_time = time.time() - start_time
+                print(f"내부 지식 데이터 기반 답변 완료 (응답시간: {result.response_time:.2f}초)")
             else:
-                # 인터넷 검색으로 보완
-                used_web_search = True
-                internet_result = self._search_internet(question)
-                enhanced_prompt = f"""
-                다음 질문에 대해 답변해주세요:
-                질문: {question}
-                
-                인터넷 검색 결과: {internet_result}
-                
-                위 정보를 종합하여 사실 기반으로 명확하게 답변하세요.
-                답변은 한국어로 작성하고, 사과나 '정보가 없습니다'와 같은 표현은 사용하지 마세요.
-                필요한 경우 핵심 출처 링크를 함께 제시하세요.
-                답변만 출력하세요.
-                """
-                enhanced_result = self.qa_chain({"query": enhanced_prompt})
-                response_time = time.time() - start_time
-                print(f"인터넷 검색 보완 답변 완료 (응답시간: {response_time:.2f}초)")
-                return enhanced_result["result"], used_web_search
+                # 인터넷 검색으로 보완 (미리 시작한 검색이 있으면 그 결과 사용)
+                result.used_web_search = True
+                result.answer = ""
+                yield STREAM_RESET
+                if web_search_future is not None:
+                    internet_result, search_ok = web_search_future.result()
+                else:
+                    internet_result, search_ok = self._search_internet(question, search_deadline)
+                for token in self._stream_generate_answer(self._web_answer_prompt(question, internet_result), result.documents, name="sol-web"):
+                    result.answer += token
+                    yield token
+                if search_ok:
+                    self._cache_answer(question, question_embedding, result)
+                result.response_time = time.time() - start_time
+                print(f"인터넷 검색 보완 답변 완료 (응답시간: {result.response_time:.2f}초)")
             
         except Exception as e:
-            response_time = time.time() - start_time
-            print(f"❌ 답변 생성 오류 (응답시간: {response_time:.2f}초)")
-            return f"답변 생성 중 오류가 발생했습니다: {str(e)}", used_web_search
+            result.response_time = time.time() - start_time
+            print(f"❌ 답변 생성 오류 (응답시간: {result.response_time:.2f}초)")
+            yield STREAM_ERROR
+            result.error = str(e)
+            result.answer = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+            yield result.answer
+    
+    def _cache_answer(self, question: str, embedding: List[float], result: AnswerResult):
+        """생성된 답변을 질문 임베딩과 함께 캐시에 저장 (웹 검색이 실패한 답변은 호출하지 않음)"""
+        self.answer_cache.put(question, embedding, {
+            "answer": result.answer,
+            "in_kb": result.in_kb,
+            "used_web_search": result.used_web_search,
+            "documents": result.documents
+        })
     
     def get_similar_terms(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """유사한 용어 검색"""
@@ -629,17 +1136,23 @@ class StablecoinDictionary:
             print(f"카테고리 목록 조회 중 오류: {e}")
             return []
 
-# 전역 인스턴스
+# 전역 인스턴스 (생성 중 다른 요청은 기다렸다가 같은 인스턴스 사용)
 _dictionary_instance = None
+_dictionary_lock = threading.Lock()
 
-def get_dictionary_answer(question: str) -> str:
-    """스테이블코인 용어 백과사전에서 답변을 가져오는 함수"""
+def get_dictionary() -> StablecoinDictionary:
+    """공유 StablecoinDictionary 인스턴스 반환 (최초 호출 시 지식베이스 로드/생성)"""
     global _dictionary_instance
     
     if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.get_answer(question)
+        with _dictionary_lock:
+            if _dictionary_instance is None:
+                _dictionary_instance = StablecoinDictionary()
+    return _dictionary_instance
+
+def get_dictionary_answer(question: str) -> str:
+    """스테이블코인 용어 백과사전에서 답변을 가져오는 함수"""
+    return get_dictionary().get_answer(question)
 
 def get_dictionary_answer_with_info(question: str) -> tuple[str, bool]:
     """스테이블코인 용어 백과사전에서 답변과 웹 검색 사용 여부를 가져오는 함수
@@ -647,61 +1160,45 @@ def get_dictionary_answer_with_info(question: str) -> tuple[str, bool]:
     Returns:
         tuple: (답변 문자열, 웹 검색 사용 여부)
     """
-    global _dictionary_instance
-    
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.get_answer_with_info(question)
+    return get_dictionary().get_answer_with_info(question)
+
+def get_dictionary_answer_result(question: str) -> AnswerResult:
+    """스테이블코인 용어 백과사전에서 답변, KB 포함 여부, 검색 문서, 웹 검색 사용 여부를 한 번에 가져오는 함수"""
+    return get_dictionary().get_answer_result(question)
+
+def stream_dictionary_answer(question: str) -> AnswerStream:
+    """스테이블코인 용어 백과사전 답변을 토큰 단위로 스트리밍하는 함수 (소비 후 stream.result에 AnswerResult)"""
+    return get_dictionary().stream_answer(question)
+
+def get_dictionary_answers_batch(questions: List[str], max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                                 on_result: Optional[Callable[[int, AnswerResult], None]] = None) -> List[AnswerResult]:
+    """여러 질문에 대한 스테이블코인 용어 백과사전 답변을 한 번에 가져오는 함수 (질문 순서대로 AnswerResult)"""
+    return get_dictionary().answer_batch(questions, max_concurrency, on_result)
 
 def get_fast_dictionary_answer(question: str) -> str:
     """스테이블코인 용어 백과사전에서 빠른 답변을 가져오는 함수 (DB에 있는 내용인 경우)"""
-    global _dictionary_instance
-    
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.get_fast_answer(question)
+    return get_dictionary().get_fast_answer(question)
 
 def get_similar_terms(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     """유사한 용어를 검색하는 함수"""
-    global _dictionary_instance
-    
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.get_similar_terms(query, top_k)
+    return get_dictionary().get_similar_terms(query, top_k)
 
 def search_terms_by_category(category: str, top_k: int = 10) -> List[Dict[str, Any]]:
     """카테고리별 용어를 검색하는 함수"""
-    global _dictionary_instance
-    
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.search_terms_by_category(category, top_k)
+    return get_dictionary().search_terms_by_category(category, top_k)
 
 def get_term_details(term: str) -> Dict[str, Any]:
     """특정 용어의 상세 정보를 조회하는 함수"""
-    global _dictionary_instance
-    
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.get_term_details(term)
+    return get_dictionary().get_term_details(term)
 
 def get_all_categories() -> List[str]:
     """모든 카테고리 목록을 조회하는 함수"""
-    global _dictionary_instance
-    
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    
-    return _dictionary_instance.get_all_categories()
+    return get_dictionary().get_all_categories()
 
 def is_question_in_kb(question: str) -> bool:
     """질문이 KB(realty_2025.md) 범위인지 공개 함수로 제공"""
-    global _dictionary_instance
-    if _dictionary_instance is None:
-        _dictionary_instance = StablecoinDictionary()
-    return _dictionary_instance._is_in_knowledge_base(question)
\ No newline at end of file
+    return get_dictionary()._is_in_knowledge_base(question)
+
+def is_in_knowledge_base_batch(questions: List[str]) -> np.ndarray:
+    """여러 질문이 KB(realty_2025.md) 범위인지 한 번에 확인 (질문 순서대로 bool 배열, 로그 질문 분류 등 대량 처리용)"""
+    return get_dictionary()._is_in_knowledge_base_batch(questions)
\ No newline at end of file
@@ -0,0 +1,174 @@
+import re
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional
+
+# 거래 유형 표현 -> 표준 거래 유형 (반전세는 월세로 분류)
+TRANSACTION_ALIASES = {
+    "반전세": "월세", "월세": "월세", "전세": "전세",
+    "매매": "매매", "실거래": "매매", "매수": "매매", "매도": "매매",
+}
+
+# 금액 표현 (억/천/만 단위가 하나 이상 있어야 금액으로 인정, 면적·층·연도 숫자 제외)
+_NOT_QUANTITY = r"(?![\d,]|\s*(?:㎡|m2|m²|평|층|동|호|년|세대|%|\.\d))"
+_EOK = (r"\d+(?:\.\d+)?\s*억(?:\s*\d\s*천(?:\s*만)?|\s*(?:\d{1,3}(?:,\d{3})+|\d{1,4})"
+        + _NOT_QUANTITY + r"(?:\s*만)?)?")
+_MAN = r"(?:\d\s*천\s*만|(?:\d{1,3}(?:,\d{3})+|\d{1,5})\s*만)"
+_AMOUNT = rf"(?:{_EOK}|{_MAN})(?:\s*원)?"
+
+# 본문 한 번 훑기용 통합 패턴 (거래 유형 / 보증금·월 표시 / 금액(범위, 보증금/월세 쌍 포함))
+PRICE_TOKEN_PATTERN = re.compile(
+    r"(?=[\d매전월반실보])"  # 후보 첫 글자가 아니면 바로 건너뜀
+    r"(?:(?P<tx>" + "|".join(sorted(TRANSACTION_ALIASES, key=len, reverse=True)) + r")"
+    r"|(?P<deposit>보증금)"
+    r"|(?P<monthly>(?<!\d)월(?!세)\s*(?=\d))"
+    r"|(?:(?P<low_bare>\d+(?:\.\d+)?)[ \t]*[~\-–][ \t]*(?=\d))?"
+    rf"(?P<amount>{_AMOUNT})"
+    rf"(?:[ \t]*(?:~|-|–|에서)[ \t]*(?P<amount_max>{_AMOUNT}))?"
+    r"(?:[ \t]*/[ \t]*(?:월\s*)?(?P<rent>\d{1,3}(?:,\d{3})*|\d+)(?:\s*만)?(?:\s*원)?)?)"
+)
+_TOKEN_GROUPS = ("tx", "deposit", "monthly", "low_bare", "amount", "amount_max", "rent")
+_AMOUNT_PARTS = re.compile(
+    r"(?:(?P<eok>\d+(?:\.\d+)?)\s*억)?\s*(?:(?P<cheon>\d)\s*천)?\s*(?P<man>\d{1,3}(?:,\d{3})+|\d+)?"
+)
+
+# 보증금 뒤 월세 금액을 같은 거래로 묶는 최대 거리 (글자 수)
+RENT_PAIR_MAX_GAP = 30
+
+
+@dataclass
+class PriceMention:
+    """본문에서 찾은 가격 (금액 단위: 만원)"""
+    transaction_type: str  # 매매/전세/월세 (문맥에서 알 수 없으면 빈 문자열)
+    amount: int  # 매매가/전세가/보증금 (범위면 하한)
+    amount_max: int  # 범위 상한 (단일 값이면 amount와 같음)
+    rent: int = 0  # 월세
+    start: int = 0
+    end: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def parse_amount(text: str) -> Optional[int]:
+    """'14억 5,000만원', '14.5억', '5천만원', '9,500만' 등을 만원 단위 정수로 변환"""
+    match = _AMOUNT_PARTS.match((text or "").strip())
+    if not match:
+        return None
+    eok, cheon, man = match.groups()
+    if not (eok or cheon or man):
+        return None
+    amount = 0.0
+    if eok:
+        amount += float(eok) * 10000
+    if cheon:
+        amount += int(cheon) * 1000
+    if man:
+        amount += int(man.replace(",", ""))
+    return int(round(amount))
+
+
+def parse_prices(text: str) -> List[PriceMention]:
+    """본문의 가격 표현을 한 번 훑어 거래 유형별 금액으로 변환
+
+    거래 유형은 가장 최근에 나온 매매/전세/월세 표현(소제목 포함)을 따르며,
+    '보증금 1억 / 월 250만원', '보증금 5,000만원 월세 180만원'처럼 보증금 뒤에
+    월세 금액이 오면 하나의 월세 가격으로 묶음
+    """
+    mentions: List[PriceMention] = []
+    current_tx = ""
+    expect_deposit = False
+    expect_rent = False
+    skip_monthly = False  # 보증금 없이 나온 '월 ...' 금액 (관리비 등)
+    pending: Optional[PriceMention] = None  # 월세 금액을 기다리는 보증금
+
+    for match in PRICE_TOKEN_PATTERN.finditer(text or ""):
+        tx, deposit, monthly, low_bare, amount_text, amount_max_text, rent_text = match.group(*_TOKEN_GROUPS)
+        if tx:
+            current_tx = TRANSACTION_ALIASES[tx]
+            if current_tx == "월세" and pending is not None:
+                expect_rent = True
+            continue
+        if deposit:
+            expect_deposit = True
+            continue
+        if monthly:
+            expect_rent = pending is not None
+            skip_monthly = pending is None
+            continue
+
+        amount = parse_amount(amount_text)
+        if amount is None:
+            continue
+        if skip_monthly:
+            skip_monthly = False
+            continue
+
+        if (expect_rent and pending is not None and
+                match.start() - pending.end <= RENT_PAIR_MAX_GAP and not rent_text):
+            pending.rent = amount
+            pending.transaction_type = "월세"
+            pending.end = match.end()
+            pending = None
+            expect_rent = False
+            continue
+        expect_rent = False
+
+        amount_max = amount
+        if amount_max_text:
+            amount_max = parse_amount(amount_max_text) or amount
+        elif low_bare:
+            # '14~16억'처럼 하한에 단위가 없으면 상한의 가장 큰 단위를 따름
+            low = float(low_bare)
+            amount, amount_max = int(low * 10000) if "억" in amount_text else int(low), amount
+        if amount_max < amount:
+            amount, amount_max = amount_max, amount
+
+        rent = int(rent_text.replace(",", "")) if rent_text else 0
+
+        mention = PriceMention(
+            transaction_type="월세" if rent else current_tx,
+            amount=amount,
+            amount_max=amount_max,
+            rent=rent,
+            start=match.start(),
+            end=match.end()
+        )
+        mentions.append(mention)
+
+        pending = mention if expect_deposit and not rent else None
+        expect_deposit = False
+
+    return mentions
+
+
+def format_manwon(amount: int) -> str:
+    """만원 단위 금액을 '14억 5,000만원' 형식으로 표시"""
+    eok, man = divmod(int(amount), 10000)
+    if eok and man:
+        return f"{eok}억 {man:,}만원"
+    if eok:
+        return f"{eok}억원"
+    return f"{man:,}만원"
+
+
+def format_short(amount: int) -> str:
+    """사이드바용 짧은 금액 표시 ('14.5억', '9,500만')"""
+    if amount >= 10000:
+        return f"{amount / 10000:.2f}".rstrip("0").rstrip(".") + "억"
+    return f"{amount:,}만"
+
+
+def summarize_prices(mentions: List[PriceMention]) -> str:
+    """거래 유형이 확인된 첫 유형(매매 > 전세 > 월세)의 가격 범위 요약"""
+    for transaction_type in ("매매", "전세", "월세"):
+        selected = [m for m in mentions if m.transaction_type == transaction_type]
+        if not selected:
+            continue
+        if transaction_type == "월세" and selected[0].rent:
+            return f"{format_short(selected[0].amount)}/{selected[0].rent:,}"
+        low = min(m.amount for m in selected)
+        high = max(m.amount_max for m in selected)
+        if low == high:
+            return format_short(low)
+        return f"{format_short(low)}~{format_short(high)}"
+    return ""
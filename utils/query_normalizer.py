@@ -0,0 +1,204 @@
+import os
+import re
+import threading
+from typing import List, Dict, Optional, Callable
+
+import numpy as np
+
+from realty_params import (
+    extract_area, extract_transaction_types,
+    TOKEN_PATTERN, TRANSACTION_KEYWORDS, PARTICLE_SUFFIXES,
+)
+from complex_gazetteer import match_complex
+
+# 표준 질문 키 규칙 버전 (규칙을 바꾸면 올려서 검색 이력 DB의 키를 다시 계산하게 함)
+CANONICAL_KEY_VERSION = "3"
+
+# 임베딩 기반 질문 군집화 유사도 (0이면 사용 안 함, 예: 0.93)
+QUERY_CLUSTER_SIMILARITY = float(os.getenv("QUERY_CLUSTER_SIMILARITY", "0"))
+
+# 질문 군집화에 사용하는 임베딩 모델
+QUERY_CLUSTER_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# 질문 군집화 시 기억하는 최대 키 수
+QUERY_CLUSTER_MAX_KEYS = 2000
+
+# 의미 없이 붙는 요청/의문 표현 (어느 질문에서나 제거)
+FILLER_WORDS = {
+    "알려줘", "알려주세요", "알려", "좀", "혹시", "정보", "관련", "검색", "찾아줘", "찾아", "보여줘",
+    "궁금해", "궁금해요", "궁금합니다", "뭐야", "뭐예요", "뭐에요", "무엇인가요", "어때", "어때요", "어떄",
+    "얼마", "얼마야", "얼마예요", "얼마에요", "요즘", "현재", "최근", "지금",
+}
+
+# 단지/거래 유형이 있는 매물 질문에서만 제거하는 가격·면적 표현
+PRICE_WORDS = {
+    "매물", "가격", "가격대", "시세", "매물가", "호가", "전용", "면적", "평", "평형", "타입",
+}
+
+# 거래 유형 표현 (토큰 단위로 제거, '매매가', '전세가격'처럼 가격 접미사가 붙은 형태 포함)
+TRANSACTION_WORDS = {
+    keyword + suffix for keyword, _ in TRANSACTION_KEYWORDS for suffix in ("", "가", "가격")
+}
+
+# 영문/숫자 어간에서만 떼는 한 글자 조사 (한글 어간은 '분양가', '대출한도'처럼 단어 끝과 구분할 수 없음)
+LATIN_STEM_PARTICLES = ("이", "가", "도", "에")
+
+# 영문/숫자 어간 뒤에 붙은 한글 (예: 'DSR이', 'LTV는', '84에')
+LATIN_STEM_PATTERN = re.compile(r"([0-9a-z]+)([가-힣]+)")
+
+# 전용면적 표현 (면적 값을 추출한 뒤 잔여 토큰에서 지울 때 사용)
+AREA_EXPRESSION_TEMPLATE = r"(?:전용\s*(?:면적)?\s*)?{value}\s*(?:㎡|m2|m²|제곱미터|타입|type|평)?"
+
+
+def _strip_question_particle(token: str) -> str:
+    """토큰 끝 조사 제거
+
+    영문/숫자 어간은 한 글자 조사('이', '가', '도', '에')까지 제거
+    한글 어간은 realty_params 조사만, 떼고도 두 글자 이상 남을 때 제거 (단지명/용어 훼손 방지)
+    """
+    latin = LATIN_STEM_PATTERN.fullmatch(token)
+    if latin:
+        stem, tail = latin.groups()
+        return stem if tail in PARTICLE_SUFFIXES + LATIN_STEM_PARTICLES else token
+    for suffix in PARTICLE_SUFFIXES:
+        if token.endswith(suffix) and len(token) > len(suffix) + 1:
+            return token[:-len(suffix)]
+    return token
+
+
+def _normalize_tokens(text: str, drop_price_words: bool = False) -> List[str]:
+    """소문자 변환, 문장부호 제거, 조사/요청 표현 제거 후 토큰 목록
+
+    drop_price_words이면 매물 질문의 가격·면적·거래 유형 표현도 제거
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall((text or "").lower()):
+        stripped = _strip_question_particle(token)
+        if token in FILLER_WORDS or stripped in FILLER_WORDS:
+            continue
+        if drop_price_words and (token in PRICE_WORDS or stripped in PRICE_WORDS or
+                                 token in TRANSACTION_WORDS or stripped in TRANSACTION_WORDS):
+            continue
+        tokens.append(stripped)
+    return tokens
+
+
+def normalize_question(question: str) -> str:
+    """공백/문장부호/조사/요청 표현 차이를 없앤 질문 문장"""
+    tokens = _normalize_tokens(question)
+    if not tokens:
+        return re.sub(r"\s+", " ", question or "").strip().lower()
+    return " ".join(tokens)
+
+
+def canonical_key(question: str) -> str:
+    """같은 의도의 질문이 같은 값을 갖는 표준 질문 키
+
+    '단지|전용면적|거래 유형|나머지 토큰(질문 순서 유지)' 형식
+    예: '답십리 래미안 위브 84 매매'와 '답십리 래미안위브 전용84 매매가격 알려줘'는 같은 키
+    어순과 반복은 의미가 달라질 수 있으므로 나머지 토큰은 정렬/중복 제거하지 않음
+    검색 이력과 Tavily 검색 결과 캐시가 같은 키를 사용
+    """
+    text = question or ""
+    complex_match = match_complex(text)
+    area = extract_area(text)
+    transaction_types = extract_transaction_types(text)
+
+    residual = text
+    if complex_match:
+        residual = text[:complex_match.start] + " " + text[complex_match.end:]
+    if area:
+        value = re.escape(area[:-1] if area.endswith("평") else area)
+        residual = re.sub(AREA_EXPRESSION_TEMPLATE.format(value=value), " ", residual, count=1, flags=re.IGNORECASE)
+
+    is_listing_question = bool(complex_match or transaction_types)
+    residual_tokens = _normalize_tokens(residual, drop_price_words=is_listing_question)
+
+    if not (complex_match or area or transaction_types or residual_tokens):
+        return normalize_question(text)
+    return "|".join([
+        complex_match.name.lower() if complex_match else "",
+        area,
+        "+".join(transaction_types),
+        " ".join(residual_tokens),
+    ])
+
+
+class QueryClusterer:
+    """
+    표준 질문 키 임베딩 군집화
+    단지/면적/거래 유형이 같은 키끼리만 비교하여, 나머지 표현이 충분히 유사하면 먼저 본 키로 합침
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]], similarity: float,
+                 max_keys: int = QUERY_CLUSTER_MAX_KEYS):
+        self.embed = embed
+        self.similarity = similarity
+        self.max_keys = max_keys
+
+        self._groups: Dict[str, Dict[str, np.ndarray]] = {}  # 구조 필드 -> {대표 키: 단위 벡터}
+        self._assigned: Dict[str, str] = {}  # 키 -> 대표 키
+        self._lock = threading.Lock()
+
+    def assign(self, key: str) -> str:
+        """키가 속한 군집의 대표 키 반환 (새 군집이면 자신이 대표)"""
+        with self._lock:
+            if key in self._assigned:
+                return self._assigned[key]
+
+        structured, _, residual = key.rpartition("|")
+        if not residual:
+            return key
+        try:
+            vector = np.asarray(self.embed(residual), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ 질문 군집화 임베딩 실패, 표준 키 사용: {e}")
+            return key
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return key
+        vector = vector / norm
+
+        with self._lock:
+            group = self._groups.setdefault(structured, {})
+            representative = key
+            if group:
+                keys = list(group.keys())
+                similarities = np.stack([group[k] for k in keys]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity:
+                    representative = keys[best]
+            if representative == key:
+                group[key] = vector
+            if len(self._assigned) < self.max_keys:
+                self._assigned[key] = representative
+            return representative
+
+
+_clusterer_instance = None
+_clusterer_lock = threading.Lock()
+
+
+def get_query_clusterer() -> Optional[QueryClusterer]:
+    """전역 질문 군집화 인스턴스 (QUERY_CLUSTER_SIMILARITY가 0이면 None)"""
+    global _clusterer_instance
+    if QUERY_CLUSTER_SIMILARITY <= 0:
+        return None
+    if _clusterer_instance is None:
+        with _clusterer_lock:
+            if _clusterer_instance is None:
+                from langchain_openai import OpenAIEmbeddings
+                embeddings = OpenAIEmbeddings(model=QUERY_CLUSTER_EMBEDDING_MODEL)
+                _clusterer_instance = QueryClusterer(embeddings.embed_query, QUERY_CLUSTER_SIMILARITY)
+    return _clusterer_instance
+
+
+def question_key(question: str) -> str:
+    """검색 이력용 질문 키 (표준 키, 군집화를 켜면 유사한 표준 키를 하나로 합침)"""
+    key = canonical_key(question)
+    try:
+        clusterer = get_query_clusterer()
+    except Exception as e:
+        print(f"⚠️ 질문 군집화 초기화 실패: {e}")
+        return key
+    return clusterer.assign(key) if clusterer else key
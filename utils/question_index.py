@@ -0,0 +1,244 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from query_normalizer import canonical_key, normalize_question
+from routing_config import EMBEDDING_MODEL
+from search_history import SearchHistoryStore, get_history_store
+
+# 질문 임베딩 저장 폴더 및 파일 (재시작 시 이전 질문을 다시 임베딩하지 않도록 저장)
+QUESTION_INDEX_DIR = os.path.join(os.path.dirname(__file__), ".question_index")
+QUESTION_EMBEDDING_STORE_FILE = os.path.join(QUESTION_INDEX_DIR, "question_embeddings.pkl")
+
+# 비슷한 이전 질문으로 제안하는 최소 코사인 유사도
+QUESTION_SUGGEST_SIMILARITY = float(os.getenv("QUESTION_SUGGEST_SIMILARITY", "0.9"))
+
+# 제안하는 최대 질문 수
+QUESTION_SUGGEST_K = 3
+
+# 이 글자 수보다 짧은 입력은 제안하지 않음 (입력 중 임베딩 호출 방지)
+QUESTION_SUGGEST_MIN_CHARS = 4
+
+# 인덱스에 넣는 최대 질문 수 (검색 횟수 상위)
+QUESTION_INDEX_MAX_QUESTIONS = 500
+
+# 입력 문장 임베딩 캐시 크기 (Streamlit 재실행마다 같은 입력을 다시 임베딩하지 않도록)
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
+
+@dataclass
+class QuestionSuggestion:
+    """비슷한 이전 질문과 저장된 답변"""
+    question: str
+    answer: str
+    similarity: float
+    count: int = 0
+    last_date: str = ""
+    price_summary: str = ""
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class QuestionSuggestionIndex:
+    """
+    검색 이력 질문 임베딩 인덱스
+    답변이 저장된 이전 질문 중 입력과 가장 가까운 질문을 찾아, 새 검색 대신 저장된 답변을 보여줄 수 있게 함
+    이력이 바뀌면(쓰기 순번 변경) 새 질문만 임베딩하여 인덱스를 다시 만들고, 임베딩은 파일로 저장
+    """
+
+    def __init__(self, embeddings=None, history_store: Optional[SearchHistoryStore] = None,
+                 store_path: str = QUESTION_EMBEDDING_STORE_FILE,
+                 similarity_threshold: float = QUESTION_SUGGEST_SIMILARITY):
+        if embeddings is None:
+            # SOL 지식베이스와 같은 임베딩 모델 사용
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
+        self.embeddings = embeddings
+        self.history_store = history_store or get_history_store()
+        self.store_path = store_path
+        self.similarity_threshold = similarity_threshold
+
+        self._vectors: Dict[str, List[float]] = self._load_embedding_store()  # 정규화 질문 해시 -> 임베딩
+        self._entries: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._entry_by_key: Dict[str, Dict[str, Any]] = {}
+        self._history_seq = None
+        self._query_cache = OrderedDict()
+        self._lock = threading.Lock()  # 인덱스/캐시 교체용 (네트워크 호출 중에는 잡지 않음)
+        self._refresh_lock = threading.Lock()  # 재구성은 한 번에 하나만
+
+    def _embedding_model_name(self) -> str:
+        return getattr(self.embeddings, "model", type(self.embeddings).__name__)
+
+    def _load_embedding_store(self) -> Dict[str, List[float]]:
+        """정규화 질문 해시별 임베딩 저장소 로드"""
+        try:
+            if os.path.exists(self.store_path):
+                with open(self.store_path, "rb") as f:
+                    store = pickle.load(f)
+                if store.get("embedding_model") == self._embedding_model_name():
+                    return store.get("vectors", {})
+        except Exception as e:
+            print(f"질문 임베딩 저장소 로드 중 오류: {e}")
+        return {}
+
+    def _save_embedding_store(self, vectors: Dict[str, List[float]]):
+        """정규화 질문 해시별 임베딩 저장소를 원자적으로 저장"""
+        try:
+            directory = os.path.dirname(self.store_path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pkl")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"embedding_model": self._embedding_model_name(), "vectors": vectors}, f)
+            os.replace(tmp_path, self.store_path)
+        except Exception as e:
+            print(f"질문 임베딩 저장소 저장 중 오류: {e}")
+
+    def refresh(self, force: bool = False, wait: bool = True) -> int:
+        """검색 이력이 바뀌었으면 인덱스 재구성 (새 질문만 임베딩)
+
+        임베딩 API 호출 중에는 인덱스 락을 잡지 않으므로 suggest는 기존 인덱스로 계속 응답
+        wait=False이면 다른 스레드가 재구성 중일 때 기다리지 않고 현재 인덱스 크기를 반환
+
+        Returns:
+            int: 인덱스에 있는 질문 수
+        """
+        store = self.history_store
+        seq = store.write_seq()
+        if not force and seq == self._history_seq:
+            return len(self._entries)
+        if not self._refresh_lock.acquire(blocking=wait):
+            return len(self._entries)
+        try:
+            if not force and seq == self._history_seq:
+                return len(self._entries)
+
+            entries = store.answered_questions(QUESTION_INDEX_MAX_QUESTIONS)
+            for entry in entries:
+                entry["text_hash"] = _text_hash(normalize_question(entry["question"]))
+
+            # 임베딩이 없는 질문만 골라 락 밖에서 임베딩
+            with self._lock:
+                known = set(self._vectors)
+            missing = {e["text_hash"]: normalize_question(e["question"])
+                       for e in entries if e["text_hash"] not in known}
+            embedded = self.embeddings.embed_documents(list(missing.values())) if missing else []
+
+            new_vectors = dict(zip(missing.keys(), embedded))
+            if entries:
+                # 저장소는 재구성 중인 이 스레드만 바꾸므로 기존 임베딩은 락 없이 읽어도 됨
+                matrix = np.asarray([new_vectors.get(e["text_hash"]) or self._vectors[e["text_hash"]]
+                                     for e in entries], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = matrix / np.where(norms == 0, 1, norms)
+            else:
+                matrix = None
+
+            with self._lock:
+                self._vectors.update(new_vectors)
+                self._matrix = matrix
+                self._entries = entries
+                self._entry_by_key = {e["key"]: e for e in entries}
+                self._history_seq = seq
+                snapshot = dict(self._vectors) if missing else None
+
+            if snapshot is not None:
+                self._save_embedding_store(snapshot)
+                print(f"🧭 비슷한 질문 인덱스: 새 질문 {len(missing)}개 임베딩")
+            return len(entries)
+        finally:
+            self._refresh_lock.release()
+
+    def _embed_query(self, text: str) -> np.ndarray:
+        """입력 문장 임베딩 (최근 입력은 캐시에서 반환)"""
+        with self._lock:
+            vector = self._query_cache.get(text)
+            if vector is not None:
+                self._query_cache.move_to_end(text)
+                return vector
+
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        with self._lock:
+            self._query_cache[text] = vector
+            while len(self._query_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    @staticmethod
+    def _to_suggestion(entry: Dict[str, Any], similarity: float) -> QuestionSuggestion:
+        return QuestionSuggestion(
+            question=entry["question"], answer=entry["answer"], similarity=similarity,
+            count=entry["count"], last_date=entry["last_date"], price_summary=entry["price_summary"]
+        )
+
+    def suggest(self, text: str, top_k: int = QUESTION_SUGGEST_K) -> List[QuestionSuggestion]:
+        """입력과 가장 비슷한 이전 질문 (표준 질문 키가 같으면 임베딩 없이 바로 반환, 유사도순)"""
+        if not text or len(text.strip()) < QUESTION_SUGGEST_MIN_CHARS:
+            return []
+        self.refresh(wait=False)  # 다른 스레드가 재구성 중이면 기존 인덱스로 응답
+        with self._lock:
+            entry_by_key = self._entry_by_key
+        if not entry_by_key:
+            return []
+
+        suggestions = []
+        exact = entry_by_key.get(canonical_key(text))
+        if exact is not None:
+            suggestions.append(self._to_suggestion(exact, 1.0))
+            if top_k <= 1:
+                return suggestions
+
+        query = self._embed_query(normalize_question(text))
+        with self._lock:
+            matrix, entries = self._matrix, self._entries
+        if matrix is None:
+            return suggestions
+
+        similarities = matrix @ query
+        for i in np.argsort(-similarities):
+            if len(suggestions) >= top_k or similarities[i] < self.similarity_threshold:
+                break
+            if exact is not None and entries[i]["key"] == exact["key"]:
+                continue
+            suggestions.append(self._to_suggestion(entries[i], float(similarities[i])))
+        return suggestions
+
+
+_question_index_instance = None
+_question_index_lock = threading.Lock()
+
+
+def get_question_index() -> QuestionSuggestionIndex:
+    """전역 비슷한 질문 인덱스 (최초 호출 시 생성)"""
+    global _question_index_instance
+    if _question_index_instance is None:
+        with _question_index_lock:
+            if _question_index_instance is None:
+                # MOLI 검색 이력과 같은 저장소 사용 (이전 JSON 이력 이전 경로 포함)
+                from realty_search import REALTY_SEARCH_CACHE_FILE
+                _question_index_instance = QuestionSuggestionIndex(
+                    history_store=get_history_store(REALTY_SEARCH_CACHE_FILE)
+                )
+    return _question_index_instance
+
+
+def suggest_similar_questions(text: str, top_k: int = QUESTION_SUGGEST_K) -> List[QuestionSuggestion]:
+    """입력 중인 질문과 비슷한, 답변이 저장된 이전 질문 목록 (오류 시 빈 목록)"""
+    try:
+        return get_question_index().suggest(text, top_k)
+    except Exception as e:
+        print(f"비슷한 질문 검색 중 오류: {e}")
+        return []
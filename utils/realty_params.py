@@ -0,0 +1,236 @@
+import re
+from typing import List, Dict, Any, Optional, Tuple
+from complex_gazetteer import match_complex
+
+# 시/도 및 구/시 단위 지역명 -> 표준 지역명
+REGION_ALIASES = {
+    "서울": "서울", "경기": "경기", "인천": "인천", "부산": "부산", "대구": "대구",
+    "대전": "대전", "광주": "광주", "울산": "울산", "세종": "세종",
+    # 서울 자치구
+    "종로구": "서울 종로구", "종로": "서울 종로구", "중구": "서울 중구",
+    "용산구": "서울 용산구", "용산": "서울 용산구", "성동구": "서울 성동구", "성동": "서울 성동구",
+    "광진구": "서울 광진구", "광진": "서울 광진구", "동대문구": "서울 동대문구", "동대문": "서울 동대문구",
+    "중랑구": "서울 중랑구", "중랑": "서울 중랑구", "성북구": "서울 성북구", "성북": "서울 성북구",
+    "강북구": "서울 강북구", "도봉구": "서울 도봉구", "도봉": "서울 도봉구",
+    "노원구": "서울 노원구", "노원": "서울 노원구", "은평구": "서울 은평구", "은평": "서울 은평구",
+    "서대문구": "서울 서대문구", "서대문": "서울 서대문구", "마포구": "서울 마포구", "마포": "서울 마포구",
+    "양천구": "서울 양천구", "양천": "서울 양천구", "강서구": "서울 강서구",
+    "구로구": "서울 구로구", "구로": "서울 구로구", "금천구": "서울 금천구", "금천": "서울 금천구",
+    "영등포구": "서울 영등포구", "영등포": "서울 영등포구", "동작구": "서울 동작구", "동작": "서울 동작구",
+    "관악구": "서울 관악구", "관악": "서울 관악구", "서초구": "서울 서초구", "서초": "서울 서초구",
+    "강남구": "서울 강남구", "강남": "서울 강남구", "송파구": "서울 송파구", "송파": "서울 송파구",
+    "강동구": "서울 강동구", "강동": "서울 강동구",
+    # 경기/광역시 주요 시·구
+    "성남": "경기 성남시", "분당": "경기 성남시 분당구", "수원": "경기 수원시",
+    "용인": "경기 용인시", "수지": "경기 용인시 수지구", "기흥": "경기 용인시 기흥구",
+    "고양": "경기 고양시", "과천": "경기 과천시", "하남": "경기 하남시", "안양": "경기 안양시",
+    "화성": "경기 화성시", "광명": "경기 광명시", "부천": "경기 부천시",
+    "김포": "경기 김포시", "파주": "경기 파주시", "의정부": "경기 의정부시", "남양주": "경기 남양주시",
+    "해운대": "부산 해운대구", "수성구": "대구 수성구",
+}
+
+# 동 단위 지역명 -> 표준 지역명 (단지명의 일부인 경우가 많아 키워드에도 유지)
+DONG_ALIASES = {
+    "답십리": "서울 동대문구", "전농": "서울 동대문구", "청량리": "서울 동대문구",
+    "행당": "서울 성동구", "왕십리": "서울 성동구", "성수": "서울 성동구", "옥수": "서울 성동구", "금호": "서울 성동구",
+    "잠실": "서울 송파구", "가락": "서울 송파구", "문정": "서울 송파구", "오금": "서울 송파구",
+    "대치": "서울 강남구", "도곡": "서울 강남구", "개포": "서울 강남구", "압구정": "서울 강남구", "청담": "서울 강남구",
+    "반포": "서울 서초구", "잠원": "서울 서초구", "방배": "서울 서초구",
+    "목동": "서울 양천구", "상계": "서울 노원구", "중계": "서울 노원구",
+    "아현": "서울 마포구", "공덕": "서울 마포구", "이촌": "서울 용산구", "한남": "서울 용산구",
+    "고덕": "서울 강동구", "둔촌": "서울 강동구", "여의도": "서울 영등포구", "신길": "서울 영등포구",
+    "흑석": "서울 동작구",
+    "판교": "경기 성남시 분당구", "영통": "경기 수원시 영통구", "광교": "경기 수원시 영통구",
+    "일산": "경기 고양시", "평촌": "경기 안양시 동안구", "동탄": "경기 화성시",
+    "송도": "인천 연수구", "청라": "인천 서구",
+}
+
+PROPERTY_TYPES = ["아파트", "오피스텔", "빌라", "원룸", "투룸", "쓰리룸", "단독주택", "다세대", "연립", "상가", "주상복합"]
+
+# 거래 유형 키워드 (반전세는 월세로 분류하므로 전세보다 먼저 확인)
+TRANSACTION_KEYWORDS = [
+    ("반전세", "월세"), ("월세", "월세"),
+    ("전세", "전세"),
+    ("매매", "매매"), ("매수", "매매"), ("매도", "매매"), ("실거래", "매매"),
+]
+ALL_TRANSACTION_TYPES = ["매매", "전세", "월세"]
+
+# 키워드에서 제외할 일반 표현
+STOPWORDS = {
+    "매물", "가격", "가격대", "시세", "매물가", "매매가", "매매가격", "전세가", "전세가격", "월세가",
+    "알려줘", "알려주세요", "알려", "얼마", "얼마야", "얼마에요", "얼마예요", "어때", "어떄", "검색", "찾아줘",
+    "찾아", "보여줘", "최근", "현재", "요즘", "정보", "나온", "있는", "관련", "추천", "좀", "혹시",
+    "전용", "평", "평형", "면적", "이상", "이하", "미만", "초과", "이내", "사이", "정도", "대", "호가",
+}
+PARTICLE_SUFFIXES = ("에서", "으로", "은", "는", "을", "를", "의")
+
+AREA_PATTERNS = [
+    re.compile(r"전용\s*(?:면적)?\s*(\d{2,3}(?:\.\d+)?)"),
+    re.compile(r"(\d{2,3}(?:\.\d+)?)\s*(?:㎡|m2|m²|제곱미터|타입|type)", re.IGNORECASE),
+]
+# 단위 없이 숫자만 쓴 경우 흔한 전용면적(㎡)만 면적으로 인정 (예: '래미안 위브 84 매매')
+COMMON_AREA_PATTERN = re.compile(r"(?<![\d.])(39|49|59|74|84|99|101|114|135)(?![\d.]|\s*(?:억|만|천|평|층|동|호|년|%))")
+PYEONG_PATTERN = re.compile(r"(\d{1,3})\s*평(?!균)")
+PRICE_RANGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*억\s*원?\s*(?:~|-|에서)\s*(\d+(?:\.\d+)?)\s*억(?:\s*원)?(?:\s*(?:사이|까지))?")
+PRICE_BOUND_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*억\s*원?\s*(이상|초과|넘는|이하|미만|아래|이내|대)")
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+# 규칙 기반 추출 결과를 그대로 사용할 최소 신뢰도 (미만이면 LLM 호출)
+FAST_EXTRACT_MIN_CONFIDENCE = 0.7
+
+# 신뢰도 가중치 (구조화된 필드만 가산, 어느 필드로도 설명되지 않는 토큰은 하나당 감산)
+CONFIDENCE_WEIGHTS = {
+    "complex": 0.5,
+    "region": 0.3,
+    "transaction_type": 0.2,
+    "area": 0.2,
+    "property_type": 0.2,
+    "price_range": 0.2,
+}
+UNEXPLAINED_TOKEN_PENALTY = 0.2
+
+
+def extract_area(question: str) -> str:
+    """질문에서 전용면적(㎡) 추출 (평 단위는 ㎡로 환산하지 않고 '34평' 형태로 반환)"""
+    for pattern in AREA_PATTERNS:
+        match = pattern.search(question)
+        if match:
+            value = match.group(1)
+            return value[:-2] if value.endswith(".0") else value
+    match = PYEONG_PATTERN.search(question)
+    if match:
+        return f"{match.group(1)}평"
+    match = COMMON_AREA_PATTERN.search(question)
+    if match:
+        return match.group(1)
+    return ""
+
+
+def extract_price_range(question: str) -> Tuple[str, Optional[int], Optional[int]]:
+    """질문에서 가격 조건 추출
+
+    Returns:
+        tuple: (원문 가격 표현, 최소 금액(만원), 최대 금액(만원))
+    """
+    match = PRICE_RANGE_PATTERN.search(question)
+    if match:
+        low, high = sorted(float(v) for v in match.groups())
+        return match.group(0).strip(), int(low * 10000), int(high * 10000)
+
+    match = PRICE_BOUND_PATTERN.search(question)
+    if match:
+        amount = int(float(match.group(1)) * 10000)
+        condition = match.group(2)
+        if condition in ("이상", "초과", "넘는"):
+            return match.group(0).strip(), amount, None
+        if condition == "대":
+            return match.group(0).strip(), amount, amount + 10000
+        return match.group(0).strip(), None, amount
+
+    return "", None, None
+
+
+def extract_transaction_types(question: str) -> List[str]:
+    """질문에 명시된 거래 유형 목록 (순서 유지, 중복 제거)"""
+    found = []
+    remaining = question
+    for keyword, transaction_type in TRANSACTION_KEYWORDS:
+        if keyword in remaining:
+            remaining = remaining.replace(keyword, " ")
+            if transaction_type not in found:
+                found.append(transaction_type)
+    return [t for t in ALL_TRANSACTION_TYPES if t in found]
+
+
+def extract_region(question: str) -> str:
+    """질문에 나온 지역명 중 가장 구체적인 표준 지역명"""
+    best = ""
+    for token in TOKEN_PATTERN.findall(question):
+        for name in (token, _strip_particle(token)):
+            region = REGION_ALIASES.get(name) or DONG_ALIASES.get(name)
+            if not region:
+                # '답십리동', '잠실동'처럼 동 접미사가 붙은 경우
+                if name.endswith("동") and name[:-1] in DONG_ALIASES:
+                    region = DONG_ALIASES[name[:-1]]
+            if region and len(region) > len(best):
+                best = region
+    return best
+
+
+def _is_dong_token(token: str) -> bool:
+    """동 단위 지역명 토큰인지 ('답십리', '잠실동')"""
+    return token in DONG_ALIASES or (token.endswith("동") and token[:-1] in DONG_ALIASES)
+
+
+def _strip_particle(token: str) -> str:
+    """토큰 끝의 조사 제거 (단지명 훼손을 막기 위해 흔한 조사만 처리)"""
+    for suffix in PARTICLE_SUFFIXES:
+        if token.endswith(suffix) and len(token) > len(suffix) + 1:
+            return token[:-len(suffix)]
+    return token
+
+
+def extract_search_params_fast(question: str) -> Tuple[Dict[str, Any], float]:
+    """규칙과 사전 기반으로 검색 파라미터 추출 (LLM 호출 없음)
+
+    Returns:
+        tuple: (LLM 추출 결과와 같은 형식의 파라미터, 신뢰도 0~1)
+    """
+    question = question or ""
+    transaction_types = extract_transaction_types(question)
+    area = extract_area(question)
+    price_range, price_min, price_max = extract_price_range(question)
+    region = extract_region(question)
+    property_type = next((p for p in PROPERTY_TYPES if p in question), "")
+
+    # 단지 사전에서 표준 단지명 찾기 (단지 지역이 더 구체적이면 지역도 대체)
+    complex_match = match_complex(question)
+    residual = question
+    if complex_match:
+        residual = question[:complex_match.start] + " " + question[complex_match.end:]
+        if len(complex_match.region) > len(region):
+            region = complex_match.region
+
+    # 단지명/가격/면적 표현을 지운 뒤 남은 토큰을 키워드로 사용
+    if price_range:
+        residual = residual.replace(price_range, " ")
+    residual = re.sub(r"\d+(?:\.\d+)?\s*(?:㎡|m2|m²|제곱미터|타입|type|평|억|만원|천)?", " ", residual, flags=re.IGNORECASE)
+
+    keywords = []
+    unexplained = 0  # 지역/단지/거래 유형 등 어느 필드로도 설명되지 않는 토큰 수
+    for token in TOKEN_PATTERN.findall(residual):
+        token = _strip_particle(token)
+        if (token in STOPWORDS or token in REGION_ALIASES or token in PROPERTY_TYPES or
+                any(keyword in token for keyword, _ in TRANSACTION_KEYWORDS)):
+            continue
+        if token not in keywords:
+            keywords.append(token)
+            if not _is_dong_token(token):
+                unexplained += 1
+
+    # 구조화된 필드로만 신뢰도를 계산 (남은 토큰은 키워드로 쓰되 신뢰도는 깎음)
+    fields = {
+        "complex": complex_match,
+        "region": region,
+        "transaction_type": transaction_types,
+        "area": area,
+        "property_type": property_type,
+        "price_range": price_range,
+    }
+    confidence = sum(CONFIDENCE_WEIGHTS[name] for name, value in fields.items() if value)
+    confidence -= UNEXPLAINED_TOKEN_PENALTY * unexplained
+    confidence = min(max(confidence, 0.0), 1.0)
+
+    params = {
+        "region": region,
+        "property_type": property_type,
+        "transaction_type": transaction_types or list(ALL_TRANSACTION_TYPES),
+        "price_range": price_range,
+        "keywords": " ".join(keywords),
+        "complex": complex_match.name if complex_match else "",
+        "area": area,
+        "price_min": price_min,
+        "price_max": price_max,
+    }
+    return params, round(confidence, 2)
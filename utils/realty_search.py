@@ -1,20 +1,135 @@
 import os
 import json
-import urllib.request
+import asyncio
+import threading
 import urllib.parse
 import streamlit as st
 import time
-import re
-from typing import List, Dict, Any, Tuple
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage
 from dotenv import load_dotenv
+from streaming import AnswerStream, STREAM_RESET, STREAM_ERROR, aiter_llm_tokens
+from async_runner import iter_async, run_sync
+from search_cache import CoalescingTTLCache
+from search_client import get_search_client, request_deadline
+from realty_params import extract_search_params_fast, extract_area, FAST_EXTRACT_MIN_CONFIDENCE
+from complex_gazetteer import match_complex
+from search_history import get_history_store
+from query_normalizer import canonical_key, question_key
+from price_parser import parse_prices, summarize_prices
+from realty_template import build_template_answer
+from token_budget import dedupe_texts, fit_texts_to_budget, truncate_to_tokens, log_prompt_sections, record_llm_usage
 
 # 환경 변수 로드
 load_dotenv()
 
-# 부동산 검색 이력 캐시 파일 경로
+# 이전 버전의 부동산 검색 이력 캐시 파일 경로 (최초 실행 시 SQLite 이력 DB로 이전)
 REALTY_SEARCH_CACHE_FILE = "realty_search_cache.json"
 
+# Tavily 검색 결과 캐시 유효 시간 (매물 가격은 하루 단위로 변동)
+TAVILY_CACHE_TTL_SECONDS = float(os.getenv("TAVILY_CACHE_TTL_SECONDS", "21600"))
+
+# 모든 세션이 공유하는 Tavily 검색 결과 캐시 (단지/면적/거래 유형 기준 표준 키, 어순·표현 차이 무시)
+_tavily_cache = CoalescingTTLCache(ttl_seconds=TAVILY_CACHE_TTL_SECONDS, key_fn=canonical_key)
+
+# 검색 파라미터 추출 방식별 횟수 (규칙 기반 / LLM)
+_param_extraction_stats = {"fast": 0, "llm": 0}
+
+# 동시에 보내는 검색어 변형 수 (1~3, 변형마다 Tavily 호출 1회)
+REALTY_SEARCH_VARIANTS = int(os.getenv("REALTY_SEARCH_VARIANTS", "3"))
+
+# 첫 변형 응답 후 나머지 변형을 더 기다리는 최대 시간 (초, 느린 변형 때문에 응답이 늦어지지 않도록)
+REALTY_FANOUT_STRAGGLER_SECONDS = float(os.getenv("REALTY_FANOUT_STRAGGLER_SECONDS", "2.0"))
+
+# 여러 변형에서 같은 URL이 나올 때마다 더하는 순위 점수 (Tavily 관련도 점수 0~1 기준)
+REALTY_VARIANT_AGREEMENT_BONUS = 0.2
+
+# 일괄 답변 시 동시에 처리하는 질문 수 (Tavily/LLM 동시 호출 상한)
+REALTY_BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# 답변에 사용하는 최대 검색 결과 수
+REALTY_MAX_SOURCES = 10
+
+# 답변 프롬프트에 넣는 검색 결과 토큰 예산 (전체, 검색 결과 1건당)
+REALTY_SNIPPET_TOKEN_BUDGET = int(os.getenv("REALTY_SNIPPET_TOKEN_BUDGET", "1500"))
+REALTY_SNIPPET_MAX_TOKENS = int(os.getenv("REALTY_SNIPPET_MAX_TOKENS", "250"))
+
+# 매물 답변 생성 지시사항 (모든 요청에 같은 내용이므로 시스템 메시지로 분리)
+REALTY_ANSWER_SYSTEM_PROMPT = """네이버 부동산 검색 결과를 바탕으로 매물 정보를 답변하는 도우미입니다.
+
+**매우 중요한 지시사항:**
+
+1. **거래 유형 구분 (반드시 엄격하게 구분):**
+   - **매매**: 집을 사고 파는 것. 가격은 "매매 XX억" 형식으로 표시됨
+   - **전세**: 전세금을 주고 집을 빌리는 것. 가격은 "전세 XX억" 형식으로 표시됨
+   - **월세**: 월세를 내고 집을 빌리는 것. 가격은 "월세 XX억" 또는 "보증금 XX억 / 월 XX만원" 형식으로 표시됨
+
+2. **검색 결과에서 가격 정보 추출 시 주의사항:**
+   - 검색 결과의 "내용" 부분을 매우 주의 깊게 읽어야 합니다
+   - "매매 31억", "전세 8억", "월세 8억" 같은 형식으로 명확히 표시된 가격만 사용
+   - 가격이 명확하지 않거나 이상하면 추측하지 말고, 네이버 부동산에서 직접 확인하도록 안내
+   - 서울 아파트 매매 가격이 3억원 미만이면 명백히 잘못된 정보입니다
+
+3. **답변 형식 (반드시 이 형식으로 작성):**
+   ```
+   ## [단지명/아파트명] 매물 정보
+
+   ### 매매 (사고 파는 것)
+   - [동호수] 매매 XX억
+   (매매 매물이 여러 개면 모두 나열)
+
+   ### 전세
+   - [동호수] 전세 XX억
+   (전세 매물이 여러 개면 모두 나열)
+
+   ### 월세
+   - [동호수] 월세 XX억 / 월 XX만원
+   (월세 매물이 여러 개면 모두 나열)
+
+   ⚠️ **중요**: 검색 결과의 가격 정보는 참고용입니다. 정확한 가격과 최신 정보는 네이버 부동산에서 직접 확인해주세요.
+
+   [네이버 부동산에서 직접 확인하기](질문에 함께 주어진 네이버 부동산 직접 검색 링크)
+   ```
+
+4. **검색 결과 해석 시 주의:**
+   - 검색 결과의 "내용" 부분에서 "매매", "전세", "월세" 키워드를 찾아서 정확히 구분
+   - 가격 정보가 명확하지 않으면 추측하지 말고, "검색 결과에서 정확한 가격 정보를 찾기 어려웠습니다"라고 명시
+   - 검색 결과에 매물이 없다고 나와도, 실제로는 네이버 부동산에 있을 수 있으므로 링크를 제공
+
+5. **예시 (헬리오시티의 경우):**
+   - 검색 결과에 "매매 31억", "매매 29억"이 나오면 → 매매 가격으로 정확히 표시
+   - 검색 결과에 "전세 8억"이 나오면 → 전세 가격으로 정확히 표시
+   - 검색 결과에 "월세 8억"이 나오면 → 월세 가격으로 정확히 표시
+
+답변은 한국어로 작성하고, 위 형식을 정확히 따르세요.
+**검색 결과를 매우 주의 깊게 읽고, 매매/전세/월세를 정확히 구분하여 답변하세요.**"""
+
+def _normalize_url(url: str) -> str:
+    """같은 페이지 판별용 URL (scheme/host 소문자, 마지막 '/'와 '#' 이후 제거)"""
+    parts = urllib.parse.urlsplit(url.strip())
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+@dataclass
+class NaverSearchResponse:
+    """Tavily 네이버 부동산 검색 응답"""
+    text: str  # 요약과 검색 결과를 합친 텍스트 (오류 시 오류 메시지)
+    urls: List[str] = field(default_factory=list)
+    sources: List[Dict[str, Any]] = field(default_factory=list)  # 순위순 [{"title", "url", "content", "score", "variants"}]
+    summary: str = ""  # Tavily 검색 요약
+    error: str = ""  # 검색 실패 사유 (API 키 없음/모든 검색어 변형 실패, 성공이면 빈 문자열)
+
+@dataclass
+class RealtySearchResult:
+    """부동산 매물 검색 결과"""
+    answer: str
+    used_web_search: bool = True  # 항상 웹 검색 사용
+    search_query: str = ""
+    naver_link: str = ""
+    response_time: float = 0.0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
 class RealtySearch:
     """
     네이버 부동산 매물 검색 챗봇
@@ -25,81 +140,204 @@ class RealtySearch:
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.1,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            stream_usage=True  # 스트리밍 응답에도 토큰 사용량 포함
         )
     
-    def _search_naver_realty(self, query: str) -> tuple:
-        """네이버 부동산 정보 검색 (Tavily API 사용)
+    def _search_query_variants(self, query: str) -> List[str]:
+        """검색 쿼리 변형 (네이버 부동산 한정, 공백 제거, '네이버 부동산' 키워드)"""
+        variants = [
+            f"{query} site:fin.land.naver.com",
+            query.replace(" ", "") + " site:fin.land.naver.com",  # 공백 제거
+            query + " 네이버 부동산"
+        ]
+        # 공백이 없는 검색어면 첫 두 변형이 같으므로 중복 제거
+        return list(dict.fromkeys(variants))[:max(REALTY_SEARCH_VARIANTS, 1)]
+    
+    async def _afetch_variants(self, variants: List[str], deadline: Optional[float]) -> List[Any]:
+        """검색어 변형을 동시에 검색 (첫 응답 후 REALTY_FANOUT_STRAGGLER_SECONDS까지만 나머지를 기다림)
         
         Returns:
-            tuple: (검색 결과 텍스트, 검색된 URL 리스트)
+            list: 변형 순서대로 Tavily 응답 또는 예외 (시간 안에 끝나지 않은 변형은 None)
+        """
+        client = get_search_client()
+        tasks = [
+            asyncio.ensure_future(client.asearch(
+                variant,
+                deadline=deadline,
+                search_depth="advanced",
+                max_results=10,  # 더 많은 결과 가져오기
+                include_answer=True,
+                include_images=False
+            ))
+            for variant in variants
+        ]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # 성공한 응답이 하나라도 오면 나머지는 짧게만 기다림
+                if any(not task.exception() for task in done):
+                    if pending:
+                        await asyncio.wait(pending, timeout=REALTY_FANOUT_STRAGGLER_SECONDS)
+                    break
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        responses = []
+        for task in tasks:
+            if not task.done() or task.cancelled():
+                responses.append(None)
+            else:
+                responses.append(task.exception() or task.result())
+        return responses
+    
+    def _merge_search_results(self, responses: List[Any]) -> Tuple[List[Dict[str, Any]], str]:
+        """변형별 검색 결과를 URL 기준으로 합치고 순위를 매긴 뒤 내용이 거의 같은 결과 제거
+        
+        순위 점수는 Tavily 관련도 최댓값에 여러 변형에서 함께 나온 횟수만큼 가산점을 더함
+        
+        Returns:
+            tuple: (순위순 검색 결과 [{"title", "url", "content", "score", "variants"}], 첫 검색 요약)
+        """
+        merged: Dict[str, Dict[str, Any]] = {}  # 정규화된 URL -> 검색 결과
+        summary = ""
+        for order, response in enumerate(responses):
+            if not isinstance(response, dict):
+                continue
+            if not summary and response.get("answer"):
+                summary = response["answer"]
+            for rank, item in enumerate(response.get("results", [])):
+                url_src = item.get("url", "")
+                if not url_src:
+                    continue
+                key = _normalize_url(url_src)
+                score = float(item.get("score") or 0.0)
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = {
+                        "title": item.get("title", "") or url_src or "출처",
+                        "url": url_src,
+                        "content": item.get("content", ""),
+                        "score": score,
+                        "variants": 1,
+                        "_order": (order, rank)
+                    }
+                else:
+                    entry["variants"] += 1
+                    entry["score"] = max(entry["score"], score)
+                    # 같은 페이지면 더 긴 본문을 사용
+                    if len(item.get("content", "")) > len(entry["content"]):
+                        entry["content"] = item.get("content", "")
+        
+        ranked = sorted(
+            merged.values(),
+            key=lambda e: (-(e["score"] + REALTY_VARIANT_AGREEMENT_BONUS * (e["variants"] - 1)), e["_order"])
+        )
+        kept = dedupe_texts([e["content"] for e in ranked])
+        sources = []
+        for i in kept[:REALTY_MAX_SOURCES]:
+            entry = ranked[i]
+            del entry["_order"]
+            sources.append(entry)
+        return sources, summary
+    
+    async def _asearch_naver_realty(self, query: str, deadline: Optional[float] = None) -> NaverSearchResponse:
+        """네이버 부동산 정보 검색 (Tavily API 비동기 호출, deadline: 요청 시간 예산이 끝나는 시각)
+        
+        검색어 변형들을 같은 시간 예산 안에서 동시에 검색하고 결과를 합침
         """
         try:
             tavily_api_key = os.getenv("TAVILY_API_KEY")
             if not tavily_api_key:
-                return "Tavily API 키가 설정되어 있지 않습니다. 환경 변수 TAVILY_API_KEY를 설정해주세요.", []
-            
-            # 검색 쿼리를 더 유연하게 만들기 (여러 변형 시도)
-            search_queries = [
-                f"{query} site:fin.land.naver.com",
-                query.replace(" ", "") + " site:fin.land.naver.com",  # 공백 제거
-                query + " 네이버 부동산"
-            ]
-            
-            all_results = []
-            all_urls = []
-            
-            for search_query in search_queries[:1]:  # 첫 번째 쿼리만 사용
-                url = "https://api.tavily.com/search"
-                payload = {
-                    "api_key": tavily_api_key,
-                    "query": search_query,
-                    "search_depth": "advanced",
-                    "max_results": 10,  # 더 많은 결과 가져오기
-                    "include_answer": True,
-                    "include_images": False
-                }
-                data = json.dumps(payload).encode("utf-8")
-                
-                req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
-                with urllib.request.urlopen(req, timeout=20) as resp:
-                    result = json.loads(resp.read().decode("utf-8"))
-                
-                # 결과 정리
-                sources = result.get("results", [])
-                if sources:
-                    for item in sources:
-                        title = item.get("title", "") or item.get("url", "") or "출처"
-                        url_src = item.get("url", "")
-                        snippet = item.get("content", "")
-                        if url_src and url_src not in all_urls:
-                            all_urls.append(url_src)
-                            all_results.append({
-                                "title": title,
-                                "url": url_src,
-                                "content": snippet
-                            })
+                message = "Tavily API 키가 설정되어 있지 않습니다. 환경 변수 TAVILY_API_KEY를 설정해주세요."
+                return NaverSearchResponse(message, error=message)
+            
+            variants = self._search_query_variants(query)
+            responses = await self._afetch_variants(variants, deadline)
+            errors = [r for r in responses if isinstance(r, BaseException)]
+            if len(errors) == len(responses):
+                raise errors[0]
+            all_results, summary = self._merge_search_results(responses)
+            succeeded = sum(1 for r in responses if isinstance(r, dict))
+            print(f"🔀 검색어 변형 {succeeded}/{len(variants)}개 응답, 중복 제거 후 결과 {len(all_results)}건")
             
             # 결과 포맷팅 (더 상세하게)
             parts = []
-            if result.get("answer"):
-                parts.append(f"검색 요약: {result.get('answer')}")
+            if summary:
+                parts.append(f"검색 요약: {summary}")
             
             if all_results:
                 formatted_sources = []
-                for item in all_results[:10]:
+                for item in all_results:
                     snippet = item["content"][:500] + ("..." if len(item["content"]) > 500 else "") if item["content"] else ""
                     formatted_sources.append(f"제목: {item['title']}\nURL: {item['url']}\n내용: {snippet}\n---")
                 parts.append("\n검색된 매물 정보 (상세):\n" + "\n".join(formatted_sources))
             
             result_text = "\n\n".join(parts) if parts else "네이버 부동산에서 관련 매물 정보를 찾기 어려웠습니다."
-            return result_text, all_urls
+            return NaverSearchResponse(result_text, [item["url"] for item in all_results], all_results, summary)
             
         except Exception as e:
-            return f"네이버 부동산 검색 중 오류: {str(e)}", []
+            return NaverSearchResponse(f"네이버 부동산 검색 중 오류: {str(e)}", error=str(e))
+    
+    async def _asearch_naver_realty_cached(self, query: str, deadline: Optional[float] = None) -> Tuple[NaverSearchResponse, Dict[str, Any]]:
+        """네이버 부동산 검색 (같은 검색어는 캐시된 결과 재사용, 동시 요청은 병합)
+        
+        Returns:
+            tuple: (검색 응답, 캐시 정보)
+        """
+        search, cache_info = await _tavily_cache.aget_or_compute(
+            query,
+            lambda: self._asearch_naver_realty(query, deadline),
+            should_cache=lambda value: bool(value.urls)  # 결과가 있는 경우만 캐시 (오류 제외)
+        )
+        cache_info["hit_rate"] = _tavily_cache.stats()["hit_rate"]
+        return search, cache_info
     
-    def _extract_search_params(self, question: str) -> Dict[str, Any]:
-        """질문에서 지역, 매물 유형(매매/전세/월세), 가격대 등을 추출"""
+    def _format_search_results_for_prompt(self, search: NaverSearchResponse) -> str:
+        """답변 프롬프트용 검색 결과 (내용이 거의 같은 결과는 제거하고 토큰 예산 이내로 자름)"""
+        if not search.sources:
+            return truncate_to_tokens(search.text, REALTY_SNIPPET_TOKEN_BUDGET)
+        
+        kept = dedupe_texts([item["content"] for item in search.sources])
+        entries = [
+            f"제목: {search.sources[i]['title']}\nURL: {search.sources[i]['url']}\n내용: {search.sources[i]['content']}\n---"
+            for i in kept
+        ]
+        parts = []
+        if search.summary:
+            parts.append(f"검색 요약: {truncate_to_tokens(search.summary, REALTY_SNIPPET_MAX_TOKENS)}")
+        parts.append("\n검색된 매물 정보 (상세):\n" + "\n".join(
+            fit_texts_to_budget(entries, REALTY_SNIPPET_TOKEN_BUDGET, per_item_max=REALTY_SNIPPET_MAX_TOKENS)
+        ))
+        return "\n\n".join(parts)
+    
+    def _log_param_extraction(self, method: str, confidence: float, metadata: Dict[str, Any] = None):
+        """검색 파라미터 추출 방식 집계 및 출력"""
+        _param_extraction_stats[method] += 1
+        total = _param_extraction_stats["fast"] + _param_extraction_stats["llm"]
+        fast_hit_rate = _param_extraction_stats["fast"] / total
+        print(f"🔎 검색 파라미터 추출: {method} (신뢰도 {confidence:.2f}, 규칙 기반 적중률 {fast_hit_rate:.0%})")
+        
+        if metadata is not None:
+            metadata["param_extraction"] = {
+                "method": method,
+                "confidence": confidence,
+                "fast_hit_rate": fast_hit_rate
+            }
+    
+    def _merge_llm_params(self, params: Dict[str, Any], llm_params: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM 결과를 우선하되, LLM이 비워둔 항목은 규칙 기반 결과로 채움"""
+        merged = dict(params)
+        for key, value in llm_params.items():
+            if value:
+                merged[key] = value
+        return merged
+    
+    async def _aextract_search_params_llm(self, question: str) -> Dict[str, Any]:
+        """LLM으로 질문에서 지역, 매물 유형(매매/전세/월세), 가격대 등을 추출"""
         prompt = f"""
         다음 부동산 매물 검색 질문을 분석하여 정보를 추출해주세요.
         질문: {question}
@@ -118,7 +356,8 @@ class RealtySearch:
         """
         
         try:
-            response = self.llm.invoke(prompt)
+            response = await self.llm.ainvoke(prompt)
+            record_llm_usage("moli-params", prompt, response.content, getattr(response, "usage_metadata", None))
             result_text = response.content.strip()
             # JSON 추출 (마크다운 코드 블록 제거)
             if "```json" in result_text:
@@ -146,11 +385,11 @@ class RealtySearch:
         # 질문에서 단지명이나 아파트명 추출 시도
         search_term = ""
         
-        # 주요 단지명 패턴 매칭
-        if "한진타운" in question or "한진" in question:
-            search_term = "행당한진타운" if "행당" in question else "한진타운"
-        elif "헬리오시티" in question or "헬리오" in question:
-            search_term = "헬리오시티"
+        # 단지 사전에서 찾은 표준 단지명 우선
+        complex_match = None if params.get("complex") else match_complex(question)
+        complex_name = params.get("complex") or (complex_match.name if complex_match else "")
+        if complex_name:
+            search_term = complex_name
         elif params.get("keywords"):
             search_term = params["keywords"]
         elif params.get("region"):
@@ -163,223 +402,270 @@ class RealtySearch:
         
         return f"{base_url}/?content=recent"
     
+    def _build_search_query(self, question: str, params: Dict[str, Any]) -> Tuple[str, Any, str]:
+        """검색 파라미터로 네이버 부동산 검색어 구성
+        
+        Returns:
+            tuple: (검색어, 거래 유형, 전용면적)
+        """
+        search_query_parts = []
+        
+        # 단지 사전에서 찾은 표준 단지명
+        if params.get("complex"):
+            search_query_parts.append(params["complex"])
+        
+        if params.get("region"):
+            search_query_parts.append(params["region"])
+        if params.get("property_type"):
+            search_query_parts.append(params["property_type"])
+        
+        transaction_types = params.get("transaction_type", [])
+        if isinstance(transaction_types, list) and transaction_types:
+            if len(transaction_types) == 1:
+                search_query_parts.append(transaction_types[0])
+        
+        # 전용면적 정보 추가
+        area = params.get("area") or extract_area(question)
+        if area:
+            search_query_parts.append(area if area.endswith("평") else f"전용{area}")
+        
+        if params.get("keywords") and params["keywords"] not in " ".join(search_query_parts):
+            search_query_parts.append(params["keywords"])
+        
+        search_query = " ".join(search_query_parts) if search_query_parts else question
+        return search_query, transaction_types, area
+    
+    async def _aprepare_answer(self, question: str, result: RealtySearchResult,
+                               deadline: Optional[float] = None) -> Tuple[Optional[list], Optional[str]]:
+        """검색 파라미터 추출, 네이버 부동산 검색 후 답변 준비
+        
+        규칙 기반 추출의 신뢰도가 낮으면 그 검색어로 Tavily 검색을 먼저 시작하고,
+        검색을 기다리는 동안 LLM으로 파라미터를 보완
+        검색 결과에서 매물 가격을 확실히 추출할 수 있으면 템플릿 답변을 바로 만들고,
+        애매한 경우에만 GPT 답변 생성 프롬프트를 구성
+        
+        Returns:
+            tuple: (GPT 프롬프트 메시지, 템플릿 답변) 중 하나만 값이 있음
+        """
+        # 질문에서 검색 파라미터 추출 (규칙 기반)
+        params, confidence = extract_search_params_fast(question)
+        search_query, transaction_types, area = self._build_search_query(question, params)
+        
+        if confidence >= FAST_EXTRACT_MIN_CONFIDENCE:
+            self._log_param_extraction("fast", confidence, result.metadata)
+            # 네이버 부동산 검색 (캐시 적중 여부와 캐시 나이는 메타데이터로 전달)
+            search, cache_info = await self._asearch_naver_realty_cached(search_query, deadline)
+        else:
+            self._log_param_extraction("llm", confidence, result.metadata)
+            search_task = asyncio.ensure_future(self._asearch_naver_realty_cached(search_query, deadline))
+            try:
+                params = self._merge_llm_params(params, await self._aextract_search_params_llm(question))
+                refined_query, transaction_types, area = self._build_search_query(question, params)
+                search, cache_info = await search_task
+            except BaseException:
+                search_task.cancel()
+                raise
+            
+            # 규칙 기반 검색어로 결과를 찾지 못했을 때만 보완된 검색어로 다시 검색
+            speculative = "reused"
+            if refined_query != search_query and not search.urls:
+                speculative = "retried"
+                search_query = refined_query
+                search, cache_info = await self._asearch_naver_realty_cached(search_query, deadline)
+            result.metadata["speculative_search"] = speculative
+        
+        result.metadata["tavily_cache"] = cache_info
+        if search.error:
+            # 검색 실패 안내로 만든 답변은 이력/일괄 결과에 정상 답변으로 남기지 않음
+            result.metadata["search_error"] = search.error
+            print(f"⚠️ 네이버 부동산 검색 실패, 답변을 저장하지 않음: {search.error}")
+        # 검색 결과 원문의 가격을 숫자로 변환 (정렬/중복 제거/분석용)
+        result.metadata["snippet_prices"] = [p.to_dict() for p in parse_prices(search.text)]
+        if cache_info["cache_hit"]:
+            print(f"💾 캐시된 Tavily 검색 결과 사용 ({cache_info['age_seconds']:.0f}초 전, 적중률 {cache_info['hit_rate']:.0%})")
+        
+        # 네이버 부동산 링크 생성
+        naver_link = self._generate_naver_link(params, question)
+        result.search_query = search_query
+        result.naver_link = naver_link
+        
+        # 단지명이 확인된 검색 결과에서 가격을 확실히 추출할 수 있으면 GPT 없이 답변 작성
+        requested_types = transaction_types if isinstance(transaction_types, list) and transaction_types else ["매매", "전세", "월세"]
+        template_answer, template_confidence = build_template_answer(
+            search.sources, params.get("complex", ""), area, requested_types, naver_link
+        )
+        result.metadata["answer_mode"] = "template" if template_answer else "llm"
+        result.metadata["template_confidence"] = template_confidence
+        if template_answer:
+            print(f"🧩 검색 결과에서 직접 답변 작성 (신뢰도 {template_confidence:.2f}, GPT 호출 생략)")
+            return None, template_answer
+        
+        # GPT로 답변 생성 (고정 지시사항은 시스템 메시지, 검색 결과는 토큰 예산 이내로)
+        search_results = self._format_search_results_for_prompt(search)
+        question_section = f"""다음은 네이버 부동산 매물 검색 질문입니다.
+질문: {question}
+
+검색 파라미터:
+- 지역: {params.get('region', '지정 안됨')}
+- 매물 유형: {params.get('property_type', '지정 안됨')}
+- 거래 유형: {', '.join(transaction_types) if isinstance(transaction_types, list) else transaction_types}
+- 가격대: {params.get('price_range', '지정 안됨')}"""
+        human_prompt = f"{question_section}\n\n네이버 부동산 검색 결과:\n{search_results}\n\n네이버 부동산 직접 검색 링크: {naver_link}"
+        
+        log_prompt_sections("moli", {
+            "system": REALTY_ANSWER_SYSTEM_PROMPT,
+            "question": question_section,
+            "search_results": search_results
+        })
+        answer_prompt = [SystemMessage(content=REALTY_ANSWER_SYSTEM_PROMPT), HumanMessage(content=human_prompt)]
+        
+        return answer_prompt, None
+    
     def search_realty(self, question: str) -> tuple:
         """부동산 매물 검색 및 답변 생성
         
         Returns:
             tuple: (답변 문자열, 웹 검색 사용 여부 - 항상 True)
         """
+        result = self.search_realty_result(question)
+        return result.answer, result.used_web_search
+    
+    def search_realty_result(self, question: str) -> RealtySearchResult:
+        """부동산 매물 검색 및 답변 생성 (검색어, 링크, 응답시간 등 메타데이터 포함)"""
+        return run_sync(self.asearch_realty(question))
+    
+    async def aprefetch_search(self, question: str, deadline: Optional[float] = None) -> bool:
+        """규칙 기반 검색어로 네이버 부동산 검색만 미리 수행해 검색 결과 캐시를 채움 (워밍업용)
+        
+        Returns:
+            bool: 검색 결과가 캐시에 있는지
+        """
+        params, _ = extract_search_params_fast(question)
+        search_query, _, _ = self._build_search_query(question, params)
+        search, _ = await self._asearch_naver_realty_cached(search_query, deadline)
+        return bool(search.urls)
+    
+    def stream_search_realty(self, question: str) -> AnswerStream:
+        """부동산 매물 검색 답변을 토큰 단위로 스트리밍 (소비 후 result에 RealtySearchResult)
+        
+        파이프라인은 공유 이벤트 루프에서 비동기로 실행되고, 호출 스레드는 토큰만 받아감
+        """
+        result = RealtySearchResult(answer="")
+        return AnswerStream(result, iter_async(self._asearch_realty_tokens(question, result)))
+    
+    async def asearch_realty(self, question: str) -> RealtySearchResult:
+        """부동산 매물 검색 및 답변 생성 (비동기)"""
+        result = RealtySearchResult(answer="")
+        async for _ in self._asearch_realty_tokens(question, result):
+            pass
+        return result
+    
+    async def asearch_batch(self, questions: List[str], max_concurrency: int = REALTY_BATCH_MAX_CONCURRENCY,
+                            on_result: Optional[Callable[[int, RealtySearchResult], None]] = None) -> List[RealtySearchResult]:
+        """여러 질문을 max_concurrency개씩 동시에 검색/답변 (질문 순서대로 결과 반환)
+        
+        on_result(순번, 결과)는 답변이 끝나는 대로 별도 스레드에서 호출 (결과 파일 이어 쓰기용)
+        """
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        
+        async def _answer(i: int, question: str) -> RealtySearchResult:
+            async with semaphore:
+                result = await self.asearch_realty(question)
+            if on_result:
+                await asyncio.to_thread(on_result, i, result)
+            return result
+        
+        return list(await asyncio.gather(*(_answer(i, q) for i, q in enumerate(questions))))
+    
+    async def _asearch_realty_tokens(self, question: str, result: RealtySearchResult) -> AsyncIterator[Any]:
+        """부동산 매물 검색 파이프라인 (토큰을 내보내면서 result를 채움)"""
         start_time = time.time()
+        # 네이버 부동산 검색은 요청 시작부터 정해진 시간 예산 안에서만 수행
+        search_deadline = request_deadline()
         
         try:
-            # 질문에서 검색 파라미터 추출
-            params = self._extract_search_params(question)
-            
-            # 네이버 부동산 검색 쿼리 구성 (더 유연하게)
-            search_query_parts = []
-            
-            # 질문에서 직접 단지명이나 키워드 추출
-            if "한진타운" in question or "한진" in question:
-                if "행당" in question:
-                    search_query_parts.append("행당한진타운")
-                else:
-                    search_query_parts.append("한진타운")
-            elif "헬리오시티" in question or "헬리오" in question:
-                search_query_parts.append("헬리오시티")
-            
-            if params.get("region"):
-                search_query_parts.append(params["region"])
-            if params.get("property_type"):
-                search_query_parts.append(params["property_type"])
-            
-            transaction_types = params.get("transaction_type", [])
-            if isinstance(transaction_types, list) and transaction_types:
-                if len(transaction_types) == 1:
-                    search_query_parts.append(transaction_types[0])
-            
-            # 전용면적 정보 추가
-            if "전용" in question or "59" in question or "㎡" in question:
-                if "59" in question:
-                    search_query_parts.append("전용59")
-                elif "㎡" in question:
-                    # 면적 추출
-                    area_match = re.search(r'(\d+)\s*㎡', question)
-                    if area_match:
-                        area = area_match.group(1)
-                        search_query_parts.append(f"전용{area}")
-            
-            if params.get("keywords") and params["keywords"] not in " ".join(search_query_parts):
-                search_query_parts.append(params["keywords"])
-            
-            search_query = " ".join(search_query_parts) if search_query_parts else question
-            
-            # 네이버 부동산 검색
-            search_results, found_urls = self._search_naver_realty(search_query)
-            
-            # 네이버 부동산 링크 생성
-            naver_link = self._generate_naver_link(params, question)
-            
-            # GPT로 답변 생성
-            answer_prompt = f"""
-            다음은 네이버 부동산 매물 검색 질문입니다.
-            질문: {question}
-            
-            검색 파라미터:
-            - 지역: {params.get('region', '지정 안됨')}
-            - 매물 유형: {params.get('property_type', '지정 안됨')}
-            - 거래 유형: {', '.join(transaction_types) if isinstance(transaction_types, list) else transaction_types}
-            - 가격대: {params.get('price_range', '지정 안됨')}
-            
-            네이버 부동산 검색 결과:
-            {search_results}
-            
-            네이버 부동산 직접 검색 링크: {naver_link}
-            
-            위 정보를 바탕으로 다음을 포함하여 답변해주세요:
-            
-            **매우 중요한 지시사항:**
-            
-            1. **거래 유형 구분 (반드시 엄격하게 구분):**
-               - **매매**: 집을 사고 파는 것. 가격은 "매매 XX억" 형식으로 표시됨
-               - **전세**: 전세금을 주고 집을 빌리는 것. 가격은 "전세 XX억" 형식으로 표시됨
-               - **월세**: 월세를 내고 집을 빌리는 것. 가격은 "월세 XX억" 또는 "보증금 XX억 / 월 XX만원" 형식으로 표시됨
-            
-            2. **검색 결과에서 가격 정보 추출 시 주의사항:**
-               - 검색 결과의 "내용" 부분을 매우 주의 깊게 읽어야 합니다
-               - "매매 31억", "전세 8억", "월세 8억" 같은 형식으로 명확히 표시된 가격만 사용
-               - 가격이 명확하지 않거나 이상하면 추측하지 말고, 네이버 부동산에서 직접 확인하도록 안내
-               - 서울 아파트 매매 가격이 3억원 미만이면 명백히 잘못된 정보입니다
-            
-            3. **답변 형식 (반드시 이 형식으로 작성):**
-               ```
-               ## [단지명/아파트명] 매물 정보
-               
-               ### 매매 (사고 파는 것)
-               - [동호수] 매매 XX억
-               - [동호수] 매매 XX억
-               (매매 매물이 여러 개면 모두 나열)
-               
-               ### 전세
-               - [동호수] 전세 XX억
-               - [동호수] 전세 XX억
-               (전세 매물이 여러 개면 모두 나열)
-               
-               ### 월세
-               - [동호수] 월세 XX억 / 월 XX만원
-               - [동호수] 월세 XX억 / 월 XX만원
-               (월세 매물이 여러 개면 모두 나열)
-               
-               ⚠️ **중요**: 검색 결과의 가격 정보는 참고용입니다. 정확한 가격과 최신 정보는 네이버 부동산에서 직접 확인해주세요.
-               
-               [네이버 부동산에서 직접 확인하기]({naver_link})
-               ```
-            
-            4. **검색 결과 해석 시 주의:**
-               - 검색 결과의 "내용" 부분에서 "매매", "전세", "월세" 키워드를 찾아서 정확히 구분
-               - 가격 정보가 명확하지 않으면 추측하지 말고, "검색 결과에서 정확한 가격 정보를 찾기 어려웠습니다"라고 명시
-               - 검색 결과에 매물이 없다고 나와도, 실제로는 네이버 부동산에 있을 수 있으므로 링크를 제공
-            
-            5. **예시 (헬리오시티의 경우):**
-               - 검색 결과에 "매매 31억", "매매 29억"이 나오면 → 매매 가격으로 정확히 표시
-               - 검색 결과에 "전세 8억"이 나오면 → 전세 가격으로 정확히 표시
-               - 검색 결과에 "월세 8억"이 나오면 → 월세 가격으로 정확히 표시
+            answer_prompt, template_answer = await self._aprepare_answer(question, result, search_deadline)
             
-            답변은 한국어로 작성하고, 위 형식을 정확히 따르세요.
-            **검색 결과를 매우 주의 깊게 읽고, 매매/전세/월세를 정확히 구분하여 답변하세요.**
-            """
-            
-            response = self.llm.invoke(answer_prompt)
-            answer = response.content
+            if template_answer:
+                result.answer = template_answer
+                yield template_answer
+            else:
+                async for token in aiter_llm_tokens(self.llm, answer_prompt, usage_name="moli"):
+                    result.answer += token
+                    yield token
             
             # 링크가 없으면 추가
-            if naver_link not in answer:
-                answer += f"\n\n[네이버 부동산에서 직접 확인하기]({naver_link})"
-            
-            response_time = time.time() - start_time
-            print(f"부동산 매물 검색 완료 (응답시간: {response_time:.2f}초)")
+            if result.naver_link not in result.answer:
+                link_text = f"\n\n[네이버 부동산에서 직접 확인하기]({result.naver_link})"
+                result.answer += link_text
+                yield link_text
             
-            return answer, True  # 항상 웹 검색 사용
+            result.response_time = time.time() - start_time
+            print(f"부동산 매물 검색 완료 (응답시간: {result.response_time:.2f}초)")
             
         except Exception as e:
-            response_time = time.time() - start_time
-            print(f"❌ 부동산 매물 검색 오류 (응답시간: {response_time:.2f}초)")
-            return f"부동산 매물 검색 중 오류가 발생했습니다: {str(e)}", True
+            result.response_time = time.time() - start_time
+            print(f"❌ 부동산 매물 검색 오류 (응답시간: {result.response_time:.2f}초)")
+            yield STREAM_ERROR
+            result.metadata["error"] = str(e)
+            result.answer = f"부동산 매물 검색 중 오류가 발생했습니다: {str(e)}"
+            yield result.answer
 
 # 전역 인스턴스
 _realty_search_instance = None
+_realty_search_lock = threading.Lock()
 
 def load_realty_search_cache():
-    """부동산 검색 이력 캐시 파일에서 데이터 로드"""
+    """부동산 검색 이력 전체를 기존 JSON 캐시 형식으로 로드"""
     try:
-        if os.path.exists(REALTY_SEARCH_CACHE_FILE):
-            with open(REALTY_SEARCH_CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        return get_history_store(REALTY_SEARCH_CACHE_FILE).load_all()
     except Exception:
         pass
     return {"question_counts": {}, "searches": []}
 
 def save_realty_search_cache(cache_data):
-    """부동산 검색 이력 캐시 파일에 데이터 저장"""
+    """부동산 검색 이력 전체를 주어진 데이터로 교체 (하위 호환성)"""
     try:
-        with open(REALTY_SEARCH_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        get_history_store(REALTY_SEARCH_CACHE_FILE).replace_all(cache_data)
     except Exception:
         pass
 
-def record_realty_search(question: str, answer: str):
-    """부동산 검색 이력을 기록 (질문 전체를 저장)"""
+def realty_answer_error(result: RealtySearchResult) -> str:
+    """답변 생성 오류 또는 검색 실패 사유 (정상 답변이면 빈 문자열)"""
+    return result.metadata.get("error") or result.metadata.get("search_error", "")
+
+def record_realty_search(question: str, answer: str, save_answer: bool = True):
+    """부동산 검색 이력을 기록 (표준 질문 키로 합산, 처음 기록한 질문 문장을 표시용으로 저장)
+    
+    save_answer가 True면 답변도 저장하여 비슷한 질문 제안에서 재사용 (오류 답변은 저장하지 않음)
+    """
     try:
         if not question or not question.strip():
             return
         
         question_clean = question.strip()
         
-        # 답변에서 가격 정보 추출 (10자 이내)
-        price_summary = ""
-        price_patterns = [
-            r'매매\s*(\d+억(?:\s*\d+[,\d]*)?)',
-            r'전세\s*(\d+억(?:\s*\d+[,\d]*)?)',
-            r'월세\s*(\d+억(?:\s*\d+[,\d]*)?)',
-        ]
-        
-        found_prices = []
-        for pattern in price_patterns:
-            matches = re.findall(pattern, answer)
-            if matches:
-                found_prices.extend(matches[:2])  # 최대 2개 가격만
-        
-        if found_prices:
-            if len(found_prices) == 1:
-                price_summary = found_prices[0]
-            else:
-                price_summary = f"{found_prices[0]} ~ {found_prices[-1]}"
-            
-            # 10자 이내로 제한
-            if len(price_summary) > 10:
-                price_summary = price_summary[:10] + "..."
+        # 답변에서 가격 정보 추출 (거래 유형별 숫자 금액 -> 짧은 요약)
+        prices = parse_prices(answer)
+        price_summary = summarize_prices(prices)
         
         # 현재 날짜 가져오기
         from datetime import datetime
         current_date = datetime.now().strftime("%Y.%m.%d")
         
-        cache_data = load_realty_search_cache()
-        question_counts = cache_data.get("question_counts", {})
+        # 질문 카운트 원자적 증가 및 정보 업데이트
+        store = get_history_store(REALTY_SEARCH_CACHE_FILE)
+        store.record(question_clean, current_date, price_summary, key=question_key(question_clean),
+                     answer=answer if save_answer else "")
         
-        # 질문 카운트 증가 및 정보 업데이트
-        if question_clean in question_counts:
-            question_counts[question_clean]["count"] = question_counts[question_clean].get("count", 0) + 1
-            question_counts[question_clean]["last_date"] = current_date
-            if price_summary:
-                question_counts[question_clean]["price_summary"] = price_summary
-        else:
-            question_counts[question_clean] = {
-                "count": 1,
-                "last_date": current_date,
-                "price_summary": price_summary
-            }
-        
-        cache_data["question_counts"] = question_counts
-        save_realty_search_cache(cache_data)
+        # 단지가 확인되면 답변 속 가격을 단지/면적/거래유형별 시계열에 추가
+        complex_match = match_complex(question_clean)
+        if complex_match:
+            store.record_prices(complex_match.name, extract_area(question_clean), [
+                (p.transaction_type, amount, p.rent)
+                for p in prices if p.transaction_type
+                for amount in sorted({p.amount, p.amount_max})
+            ])
     except Exception as e:
         print(f"검색 이력 기록 중 오류: {e}")
 
@@ -393,60 +679,87 @@ def get_top_questions(top_k=5):
         if not isinstance(top_k, int) or top_k < 1:
             top_k = 5
         
-        cache_data = load_realty_search_cache()
-        if not isinstance(cache_data, dict):
-            cache_data = {"question_counts": {}}
-        
-        question_counts = cache_data.get("question_counts", {})
-        if not isinstance(question_counts, dict):
-            question_counts = {}
-        
-        # 많이 검색한 순서로 정렬 (count 기준)
-        sorted_questions = sorted(
-            question_counts.items(), 
-            key=lambda x: x[1].get("count", 0) if isinstance(x[1], dict) else (x[1] if isinstance(x[1], int) else 0), 
-            reverse=True
-        )
-        
-        result = []
-        for question, data in sorted_questions[:top_k]:
-            if question and question.strip():
-                if isinstance(data, dict):
-                    result.append({
-                        'question': question.strip(),
-                        'count': data.get("count", 1),
-                        'last_date': data.get("last_date", ""),
-                        'price_summary': data.get("price_summary", "")
-                    })
-                else:
-                    # 하위 호환성 (이전 형식)
-                    result.append({
-                        'question': question.strip(),
-                        'count': data if isinstance(data, int) else 1,
-                        'last_date': "",
-                        'price_summary': ""
-                    })
-        
-        return result
+        return get_history_store(REALTY_SEARCH_CACHE_FILE).top_questions(top_k)
     except Exception as e:
         print(f"get_top_questions 오류: {e}")
         return []
 
-def get_realty_search_answer(question: str) -> tuple:
-    """부동산 매물 검색 답변을 가져오는 함수
+def get_price_trend(question: str, days: int = 180, max_points: int = 60) -> Dict[str, Any]:
+    """질문의 단지/면적 기준 거래 유형별 가격 추이 반환
     
     Returns:
-        tuple: (답변 문자열, 웹 검색 사용 여부)
+        dict: {"complex", "area", "series": {거래 유형: [{"ts", "min", "max", "avg", "rent_avg", "count"}, ...]}}
     """
+    try:
+        complex_match = match_complex(question)
+        if not complex_match:
+            return {}
+        
+        area = extract_area(question)
+        end_ts = int(time.time())
+        start_ts = end_ts - days * 86400
+        store = get_history_store(REALTY_SEARCH_CACHE_FILE)
+        series = {}
+        for transaction_type in ["매매", "전세", "월세"]:
+            points = store.price_series(complex_match.name, area, transaction_type,
+                                        start_ts=start_ts, end_ts=end_ts, max_points=max_points)
+            if points:
+                series[transaction_type] = points
+        return {"complex": complex_match.name, "area": area, "series": series}
+    except Exception as e:
+        print(f"가격 추이 조회 중 오류: {e}")
+        return {}
+
+def get_param_extraction_stats() -> Dict[str, Any]:
+    """검색 파라미터 추출 방식별 횟수와 규칙 기반 적중률 반환"""
+    total = _param_extraction_stats["fast"] + _param_extraction_stats["llm"]
+    return {
+        **_param_extraction_stats,
+        "fast_hit_rate": _param_extraction_stats["fast"] / total if total else 0.0
+    }
+
+def get_realty_search() -> RealtySearch:
+    """공유 RealtySearch 인스턴스 반환 (최초 호출 시 생성)"""
     global _realty_search_instance
     
     if _realty_search_instance is None:
-        _realty_search_instance = RealtySearch()
+        with _realty_search_lock:
+            if _realty_search_instance is None:
+                _realty_search_instance = RealtySearch()
+    return _realty_search_instance
+
+def get_realty_search_answer(question: str) -> tuple:
+    """부동산 매물 검색 답변을 가져오는 함수
     
-    answer, used_web_search = _realty_search_instance.search_realty(question)
+    Returns:
+        tuple: (답변 문자열, 웹 검색 사용 여부)
+    """
+    result = get_realty_search().search_realty_result(question)
     
     # 검색 이력 기록
-    record_realty_search(question, answer)
+    record_realty_search(question, result.answer, save_answer=not realty_answer_error(result))
+    
+    return result.answer, result.used_web_search
+
+def get_realty_search_answers_batch(questions: List[str], max_concurrency: int = REALTY_BATCH_MAX_CONCURRENCY,
+                                    on_result: Optional[Callable[[int, RealtySearchResult], None]] = None) -> List[RealtySearchResult]:
+    """여러 질문의 부동산 매물 검색 답변을 한 번에 가져오는 함수 (일괄 사전 계산용, 검색 이력에는 기록하지 않음)"""
+    return run_sync(get_realty_search().asearch_batch(questions, max_concurrency, on_result))
+
+def stream_realty_search_answer(question: str) -> AnswerStream:
+    """부동산 매물 검색 답변을 토큰 단위로 스트리밍하는 함수 (스트림 종료 시 검색 이력 기록)"""
+    stream = get_realty_search().stream_search_realty(question)
+    
+    def _tokens():
+        yield from stream
+        # 검색 이력 기록
+        record_realty_search(question, stream.result.answer, save_answer=not realty_answer_error(stream.result))
     
-    return answer, used_web_search
+    return AnswerStream(stream.result, _tokens())
 
+async def asearch_realty_answer(question: str) -> RealtySearchResult:
+    """부동산 매물 검색 답변 (비동기, 이벤트 루프 하나에서 여러 요청을 동시에 처리할 때 사용)"""
+    result = await get_realty_search().asearch_realty(question)
+    # 검색 이력 기록 (SQLite 쓰기는 루프를 막지 않도록 별도 스레드에서)
+    await asyncio.to_thread(record_realty_search, question, result.answer, not realty_answer_error(result))
+    return result
@@ -0,0 +1,175 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+from complex_gazetteer import get_gazetteer
+from price_parser import parse_prices, format_manwon
+
+# 템플릿 답변을 그대로 사용할 최소 신뢰도 (미만이면 GPT로 답변 생성)
+TEMPLATE_MIN_CONFIDENCE = float(os.getenv("REALTY_TEMPLATE_MIN_CONFIDENCE", "0.8"))
+
+# 거래 유형별 최대 표시 매물 수
+TEMPLATE_MAX_LISTINGS = 10
+
+# 가격 뒤 동/층/면적 정보를 찾는 최대 거리 (글자 수)
+DETAIL_MAX_CHARS = 40
+
+# 아파트 가격 하한 (만원, 이보다 낮으면 잘못 추출된 가격으로 간주)
+MIN_PLAUSIBLE_PRICE = {"매매": 30000, "전세": 5000, "월세": 100}
+
+TRANSACTION_HEADINGS = {"매매": "매매 (사고 파는 것)", "전세": "전세", "월세": "월세"}
+
+_DONG_PATTERN = re.compile(r"(?<!\d)(\d{1,4})\s*동(?!\d)")
+_FLOOR_PATTERN = re.compile(r"(저층|중층|고층|탑층|(?<!\d)\d{1,2}(?:/\d{1,2})?\s*층)")
+_AREA_PATTERN = re.compile(r"(?:\d{2,3}[A-Z]?/)?(\d{2,3}(?:\.\d+)?)\s*(?:㎡|m2|m²)")
+
+
+@dataclass
+class Listing:
+    """검색 결과 원문에서 찾은 매물 (금액 단위: 만원)"""
+    transaction_type: str
+    amount: int
+    amount_max: int
+    rent: int = 0
+    dong: str = ""
+    floor: str = ""
+    area: str = ""
+    url: str = ""
+
+    @property
+    def key(self) -> Tuple:
+        return self.transaction_type, self.amount, self.amount_max, self.rent, self.dong, self.floor, self.area
+
+    def price_text(self) -> str:
+        """'매매 19억 5,000만원', '월세 1억원 / 월 250만원' 형식의 가격"""
+        if self.rent:
+            return f"월세 {format_manwon(self.amount)} / 월 {self.rent:,}만원"
+        if self.amount_max != self.amount:
+            return f"{self.transaction_type} {format_manwon(self.amount)} ~ {format_manwon(self.amount_max)}"
+        return f"{self.transaction_type} {format_manwon(self.amount)}"
+
+
+def _area_matches(listing_area: str, area: str) -> bool:
+    """매물 면적이 질문의 전용면적과 같은지 (소수점 이하 무시, 평 단위는 비교하지 않음)"""
+    if not listing_area or not area or area.endswith("평"):
+        return True
+    return int(float(listing_area)) == int(float(area))
+
+
+def extract_listings(sources: List[Dict[str, Any]], complex_name: str, area: str = "") -> Tuple[List[Listing], Dict[str, int]]:
+    """단지명이 언급된 검색 결과에서 매물 목록 추출
+
+    Returns:
+        tuple: (중복 제거된 매물 목록, 통계 {"sources", "mentions", "untyped", "implausible"})
+    """
+    gazetteer = get_gazetteer()
+    listings: List[Listing] = []
+    seen = set()
+    stats = {"sources": 0, "mentions": 0, "untyped": 0, "implausible": 0}
+
+    for source in sources:
+        content = source.get("content", "") or ""
+        text = f"{source.get('title', '')}\n{content}"
+        if not any(m.name == complex_name for m in gazetteer.find_all(text)):
+            continue
+        stats["sources"] += 1
+
+        mentions = parse_prices(content)
+        for i, mention in enumerate(mentions):
+            stats["mentions"] += 1
+            if not mention.transaction_type:
+                stats["untyped"] += 1
+                continue
+            if mention.amount < MIN_PLAUSIBLE_PRICE[mention.transaction_type]:
+                stats["implausible"] += 1
+                continue
+
+            # 가격 바로 뒤(다음 가격 전까지)에서 동/층/면적 정보 찾기
+            detail_end = mentions[i + 1].start if i + 1 < len(mentions) else len(content)
+            detail = content[mention.end:min(detail_end, mention.end + DETAIL_MAX_CHARS)]
+            dong = _DONG_PATTERN.search(detail)
+            floor = _FLOOR_PATTERN.search(detail)
+            listing_area = _AREA_PATTERN.search(detail)
+
+            listing = Listing(
+                transaction_type=mention.transaction_type,
+                amount=mention.amount,
+                amount_max=mention.amount_max,
+                rent=mention.rent,
+                dong=f"{dong.group(1)}동" if dong else "",
+                floor=floor.group(1).replace(" ", "") if floor else "",
+                area=listing_area.group(1) if listing_area else "",
+                url=source.get("url", "")
+            )
+            if not _area_matches(listing.area, area) or listing.key in seen:
+                continue
+            seen.add(listing.key)
+            listings.append(listing)
+
+    return listings, stats
+
+
+def template_confidence(listings: List[Listing], stats: Dict[str, int], transaction_types: List[str]) -> float:
+    """템플릿 답변 신뢰도 (0~1)
+
+    단지가 언급된 검색 결과에서 요청한 거래 유형의 매물을 찾았고,
+    거래 유형을 알 수 없거나 비정상적인 가격이 적을수록 높음
+    """
+    relevant = [l for l in listings if l.transaction_type in transaction_types]
+    if not stats["sources"] or not relevant:
+        return 0.0
+
+    confidence = 1.0
+    if stats["mentions"]:
+        confidence -= 0.4 * stats["untyped"] / stats["mentions"]
+        confidence -= 0.4 * stats["implausible"] / stats["mentions"]
+    if len(relevant) == 1:
+        confidence -= 0.1
+    return round(max(confidence, 0.0), 2)
+
+
+def render_listing_answer(complex_name: str, area: str, listings: List[Listing],
+                          transaction_types: List[str], naver_link: str) -> str:
+    """GPT 답변과 같은 마크다운 형식으로 매물 정보 답변 작성"""
+    area_text = ""
+    if area:
+        area_text = f" {area}" if area.endswith("평") else f" 전용 {area}㎡"
+    lines = [f"## {complex_name}{area_text} 매물 정보", ""]
+
+    for transaction_type in ["매매", "전세", "월세"]:
+        if transaction_type not in transaction_types:
+            continue
+        lines.append(f"### {TRANSACTION_HEADINGS[transaction_type]}")
+        selected = sorted(
+            (l for l in listings if l.transaction_type == transaction_type),
+            key=lambda l: (l.amount, l.rent)
+        )[:TEMPLATE_MAX_LISTINGS]
+        if not selected:
+            lines.append(f"- 검색 결과에서 {transaction_type} 매물 정보를 찾기 어려웠습니다.")
+        for listing in selected:
+            detail = " ".join(part for part in (listing.dong, listing.floor,
+                                                f"{listing.area}㎡" if listing.area else "") if part)
+            lines.append(f"- {detail + ' ' if detail else ''}{listing.price_text()}")
+        lines.append("")
+
+    lines.append("⚠️ **중요**: 검색 결과의 가격 정보는 참고용입니다. 정확한 가격과 최신 정보는 네이버 부동산에서 직접 확인해주세요.")
+    lines.append("")
+    lines.append(f"[네이버 부동산에서 직접 확인하기]({naver_link})")
+    return "\n".join(lines)
+
+
+def build_template_answer(sources: List[Dict[str, Any]], complex_name: str, area: str,
+                          transaction_types: List[str], naver_link: str) -> Tuple[Optional[str], float]:
+    """검색 결과만으로 답변을 만들 수 있으면 템플릿 답변 반환
+
+    Returns:
+        tuple: (템플릿 답변 또는 None(신뢰도 부족), 신뢰도)
+    """
+    if not complex_name or not sources:
+        return None, 0.0
+    listings, stats = extract_listings(sources, complex_name, area)
+    confidence = template_confidence(listings, stats, transaction_types)
+    if confidence < TEMPLATE_MIN_CONFIDENCE:
+        return None, confidence
+    return render_listing_answer(complex_name, area, listings, transaction_types, naver_link), confidence
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field, asdict, fields
+from typing import List, Optional
+
+# SOL 지식베이스/비슷한 질문 인덱스 임베딩 모델 (라우팅 거리 임계값은 이 모델 기준으로 보정, 변경 시 인덱스 재생성)
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# SOL 지식베이스/웹 검색 라우팅 기준 파일 (KB_ROUTING_CONFIG 환경 변수로 교체 가능)
+KB_ROUTING_CONFIG_FILE = os.getenv(
+    "KB_ROUTING_CONFIG",
+    os.path.join(os.path.dirname(__file__), "kb_routing.json")
+)
+
+
+@dataclass
+class RoutingConfig:
+    """KB 포함 판단 및 KB 답변 충분성 판단 기준 (benchmarks/bench_routing.py로 보정)"""
+    # KB 포함 판단 기준 (FAISS 거리 임계값, 최소 문서 길이)
+    kb_distance_threshold: float = 0.7
+    kb_min_content_length: int = 50
+    # 최상위 문서 거리가 [임계값 - 여유폭, 임계값) 구간이면 KB 답변과 동시에 웹 검색을 미리 시작 (0이면 비활성화)
+    speculative_search_margin: float = 0.15
+    # KB 답변이 이보다 짧으면 웹 검색으로 보완
+    min_answer_length: int = 50
+    # KB 답변에 이 표현이 있으면 정보 부족으로 보고 웹 검색으로 보완
+    low_confidence_phrases: List[str] = field(default_factory=lambda: [
+        "모르겠습니다", "찾을 수 없습니다", "정보가 부족합니다",
+        "알 수 없습니다", "확실하지 않습니다",
+        "제공된 정보에는", "제공받은 정보에는", "포함되어 있지 않습니다",
+        "해당 정보를 제공할 수 없습니다", "예측 가능합니다", "예상됩니다",
+        "고려할 때", "추세를 고려", "방향을 예상"
+    ])
+    # 미래 관련 질문 키워드와, 그런 질문의 답변에서 추측으로 보는 표현
+    future_keywords: List[str] = field(default_factory=lambda: ["예측", "미래", "앞으로", "향후", "2026", "2027", "내년"])
+    speculation_phrases: List[str] = field(default_factory=lambda: ["예상됩니다", "예측 가능합니다", "고려할 때", "추세를 고려"])
+
+
+def load_routing_config(path: Optional[str] = None) -> RoutingConfig:
+    """라우팅 기준 파일 로드 (파일이 없거나 잘못되면 기본값, 없는 항목도 기본값)
+
+    SPECULATIVE_SEARCH_MARGIN 환경 변수가 있으면 파일 값보다 우선
+    """
+    path = path or KB_ROUTING_CONFIG_FILE
+    values = {}
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            known = {f.name for f in fields(RoutingConfig)}
+            unknown = sorted(set(data) - known)
+            if unknown:
+                print(f"⚠️ 라우팅 기준 파일의 알 수 없는 항목 무시: {', '.join(unknown)}")
+            values = {k: v for k, v in data.items() if k in known}
+    except Exception as e:
+        print(f"라우팅 기준 파일 로드 중 오류, 기본값 사용: {e}")
+
+    config = RoutingConfig(**values)
+    if os.getenv("SPECULATIVE_SEARCH_MARGIN"):
+        config.speculative_search_margin = float(os.getenv("SPECULATIVE_SEARCH_MARGIN"))
+    return config
+
+
+def save_routing_config(config: RoutingConfig, path: Optional[str] = None):
+    """라우팅 기준 파일을 원자적으로 저장"""
+    path = path or KB_ROUTING_CONFIG_FILE
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(asdict(config), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
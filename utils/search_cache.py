@@ -0,0 +1,130 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def normalize_search_query(query: str) -> str:
+    """캐시 키용 검색어 정규화 (대소문자, 연속 공백 차이 무시)"""
+    return re.sub(r"\s+", " ", query or "").strip().lower()
+
+
+class CoalescingTTLCache:
+    """
+    검색 결과 공유 캐시
+    정규화된 검색어(key_fn, 기본 normalize_search_query)를 키로 TTL 동안 결과를 재사용하고,
+    같은 검색어의 동시 요청은 하나의 외부 호출로 병합
+    """
+
+    def __init__(self, ttl_seconds: float = 21600, max_entries: int = 1000,
+                 key_fn: Callable[[str], str] = normalize_search_query):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.key_fn = key_fn
+
+        self._entries = OrderedDict()  # 키 -> (저장 시각, 값)
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _claim(self, key: str) -> Tuple[Optional[Tuple[Any, Dict[str, Any]]], Optional[Future], bool]:
+        """캐시 조회 후 (적중 결과, 기다릴/채울 Future, 직접 계산해야 하는지) 반환"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                age = time.time() - stored_at
+                if age <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return (value, {"cache_hit": True, "coalesced": False, "age_seconds": age}), None, False
+                del self._entries[key]
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                # 같은 검색어를 다른 세션이 조회 중이면 그 결과를 기다림
+                self.coalesced += 1
+                return None, future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.misses += 1
+            return None, future, True
+
+    def _fail(self, key: str, future: Future, error: BaseException):
+        # 기다리는 요청이 멈추지 않도록 실패도 전달
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+
+    def _store(self, key: str, future: Future, value: Any, cacheable: bool) -> Tuple[Any, Dict[str, Any]]:
+        with self._lock:
+            if cacheable:
+                self._entries[key] = (time.time(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+        return value, {"cache_hit": False, "coalesced": False, "age_seconds": 0.0}
+
+    def get_or_compute(self, query: str, compute: Callable[[], Any],
+                       should_cache: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, Dict[str, Any]]:
+        """캐시된 결과를 반환하거나 compute()로 새로 계산
+
+        Returns:
+            tuple: (결과, 캐시 정보 {"cache_hit", "coalesced", "age_seconds"})
+        """
+        key = self.key_fn(query)
+        hit, future, leader = self._claim(key)
+        if hit is not None:
+            return hit
+        if not leader:
+            return future.result(), {"cache_hit": True, "coalesced": True, "age_seconds": 0.0}
+
+        try:
+            value = compute()
+            cacheable = should_cache is None or should_cache(value)
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        return self._store(key, future, value, cacheable)
+
+    async def aget_or_compute(self, query: str, compute: Callable[[], Awaitable[Any]],
+                              should_cache: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, Dict[str, Any]]:
+        """get_or_compute의 비동기 버전 (compute는 코루틴 함수, 동기 호출과 같은 캐시/병합 공유)"""
+        key = self.key_fn(query)
+        hit, future, leader = self._claim(key)
+        if hit is not None:
+            return hit
+        if not leader:
+            return await asyncio.wrap_future(future), {"cache_hit": True, "coalesced": True, "age_seconds": 0.0}
+
+        try:
+            value = await compute()
+            cacheable = should_cache is None or should_cache(value)
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        return self._store(key, future, value, cacheable)
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중 통계 (병합된 요청은 적중으로 계산)"""
+        served = self.hits + self.coalesced
+        total = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": served / total if total else 0.0
+        }
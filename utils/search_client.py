@@ -0,0 +1,285 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# Tavily 검색 API 주소
+TAVILY_SEARCH_URL = os.getenv("TAVILY_SEARCH_URL", "https://api.tavily.com/search")
+
+# 요청 한 건(질문 하나)이 외부 검색에 쓸 수 있는 전체 시간 (초, 재시도 포함)
+SEARCH_REQUEST_BUDGET_SECONDS = float(os.getenv("SEARCH_REQUEST_BUDGET_SECONDS", "25"))
+
+# 호출 1회 최대 대기 시간, 연결 대기 시간, 남은 시간이 이보다 적으면 호출하지 않음 (초)
+SEARCH_CALL_TIMEOUT_SECONDS = float(os.getenv("SEARCH_CALL_TIMEOUT_SECONDS", "20"))
+SEARCH_CONNECT_TIMEOUT_SECONDS = 5.0
+SEARCH_MIN_CALL_SECONDS = 1.0
+
+# 일시적 오류(시간 초과, 연결 오류, 429, 5xx) 재시도 횟수와 지수 백오프 (초)
+SEARCH_MAX_RETRIES = int(os.getenv("SEARCH_MAX_RETRIES", "2"))
+SEARCH_BACKOFF_BASE_SECONDS = 0.5
+SEARCH_BACKOFF_MAX_SECONDS = 4.0
+
+# 연속 실패가 이 횟수에 이르면 일정 시간 동안 호출하지 않고 바로 실패 처리
+SEARCH_BREAKER_FAILURE_THRESHOLD = int(os.getenv("SEARCH_BREAKER_FAILURE_THRESHOLD", "5"))
+SEARCH_BREAKER_RESET_SECONDS = float(os.getenv("SEARCH_BREAKER_RESET_SECONDS", "30"))
+
+# 연결 풀 크기 (모든 세션이 공유, keep-alive로 TLS 핸드셰이크 재사용)
+SEARCH_POOL_MAX_CONNECTIONS = int(os.getenv("SEARCH_POOL_MAX_CONNECTIONS", "10"))
+SEARCH_POOL_KEEPALIVE_SECONDS = 60.0
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class SearchClientError(Exception):
+    """외부 검색 호출 실패"""
+
+
+class CircuitOpenError(SearchClientError):
+    """차단기가 열려 있어 호출하지 않음"""
+
+
+def request_deadline(budget_seconds: Optional[float] = None) -> float:
+    """지금부터 요청 예산만큼 지난 시각 (time.monotonic 기준)"""
+    return time.monotonic() + (SEARCH_REQUEST_BUDGET_SECONDS if budget_seconds is None else budget_seconds)
+
+
+class CircuitBreaker:
+    """
+    연속 실패 차단기
+    연속 실패가 기준에 이르면 열림(바로 실패), 대기 시간이 지나면 시험 호출 1건만 허용하고
+    성공하면 닫힘, 실패하면 다시 열림
+    """
+
+    def __init__(self, failure_threshold: int = SEARCH_BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = SEARCH_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """호출 가능 여부 (반열림 상태에서는 시험 호출 1건만 허용)"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"🚧 검색 API 연속 실패 {self._failures}회, {self.reset_seconds:.0f}초 동안 호출 중단")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class TavilySearchClient:
+    """
+    Tavily 검색 공유 클라이언트
+    연결 풀(keep-alive)을 재사용하고, 일시적 오류는 요청 예산 안에서 지터 백오프로 재시도하며,
+    연속 실패 시 차단기로 바로 실패 처리해 Streamlit 작업 스레드가 묶이지 않도록 함
+    동기 호출(search)과 비동기 호출(asearch)은 재시도 정책과 차단기를 공유
+    """
+
+    def __init__(self, url: str = TAVILY_SEARCH_URL, max_retries: int = SEARCH_MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None, transport: Optional[httpx.BaseTransport] = None,
+                 async_transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self._client = httpx.Client(transport=transport, **self._client_options())
+        # 비동기 클라이언트는 사용할 이벤트 루프에서 처음 호출될 때 생성
+        self._async_transport = async_transport
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "short_circuited": 0}
+
+    @staticmethod
+    def _client_options() -> Dict[str, Any]:
+        return {
+            "limits": httpx.Limits(
+                max_connections=SEARCH_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=SEARCH_POOL_MAX_CONNECTIONS,
+                keepalive_expiry=SEARCH_POOL_KEEPALIVE_SECONDS
+            ),
+            "headers": {"Content-Type": "application/json"}
+        }
+
+    def _ensure_async_client(self):
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(transport=self._async_transport, **self._client_options())
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _backoff_seconds(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """재시도 전 대기 시간 (Retry-After가 있으면 우선, 없으면 full jitter 지수 백오프)"""
+        if retry_after:
+            try:
+                return min(float(retry_after), SEARCH_BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass
+        return random.uniform(0, min(SEARCH_BACKOFF_MAX_SECONDS, SEARCH_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+    def _begin(self, query: str, deadline: Optional[float], options: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """요청 본문과 마감 시각 (예산이 없거나 차단기가 열려 있으면 바로 실패)"""
+        if deadline is None:
+            deadline = request_deadline()
+        if deadline - time.monotonic() < SEARCH_MIN_CALL_SECONDS:
+            raise SearchClientError("검색 시간 예산을 모두 사용했습니다")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError("검색 API 응답이 계속 실패해 잠시 호출을 중단했습니다")
+        return {"api_key": os.getenv("TAVILY_API_KEY"), "query": query, **options}, deadline
+
+    def _attempt_timeout(self, deadline: float) -> httpx.Timeout:
+        """호출 1회 대기 시간 (남은 예산을 넘지 않음)"""
+        self._count("requests")
+        call_timeout = min(SEARCH_CALL_TIMEOUT_SECONDS, max(deadline - time.monotonic(), SEARCH_MIN_CALL_SECONDS))
+        return httpx.Timeout(call_timeout, connect=min(SEARCH_CONNECT_TIMEOUT_SECONDS, call_timeout))
+
+    def _parse_response(self, resp: httpx.Response) -> Optional[Dict[str, Any]]:
+        """성공 응답이면 결과, 재시도할 응답이면 None"""
+        if resp.status_code in RETRYABLE_STATUS_CODES:
+            return None
+        if resp.status_code >= 400:
+            # 4xx(잘못된 키 등)는 재시도해도 같으므로 차단기 집계 없이 바로 실패
+            self.breaker.record_success()
+            raise SearchClientError(f"HTTP {resp.status_code}")
+        result = resp.json()
+        self.breaker.record_success()
+        return result
+
+    def _retry_wait(self, attempt: int, deadline: float, last_error: Exception,
+                    resp: Optional[httpx.Response]) -> Optional[float]:
+        """다음 재시도 전 대기 시간 (재시도하지 않으면 None)"""
+        if attempt >= self.max_retries:
+            return None
+        wait = self._backoff_seconds(attempt, resp.headers.get("Retry-After") if resp is not None else None)
+        if deadline - time.monotonic() - wait < SEARCH_MIN_CALL_SECONDS:
+            return None
+        self._count("retries")
+        print(f"🔁 검색 API 재시도 {attempt + 1}/{self.max_retries} ({last_error}, {wait:.2f}초 후)")
+        return wait
+
+    def _give_up(self, last_error: Exception) -> SearchClientError:
+        self._count("failures")
+        self.breaker.record_failure()
+        return SearchClientError(f"검색 API 호출 실패: {last_error}")
+
+    def search(self, query: str, deadline: Optional[float] = None, **options) -> Dict[str, Any]:
+        """Tavily 검색 (options는 search_depth, max_results 등 API 파라미터)
+
+        Args:
+            deadline: 이 시각(time.monotonic 기준)까지 끝내야 함 (없으면 지금부터 요청 예산)
+
+        Raises:
+            SearchClientError: 재시도 후에도 실패, 예산 소진, 차단기 열림
+        """
+        payload, deadline = self._begin(query, deadline, options)
+        for attempt in range(self.max_retries + 1):
+            resp = None
+            try:
+                resp = self._client.post(self.url, json=payload, timeout=self._attempt_timeout(deadline))
+                result = self._parse_response(resp)
+                if result is not None:
+                    return result
+                last_error = SearchClientError(f"HTTP {resp.status_code}")
+            except (httpx.TimeoutException, httpx.TransportError, ValueError) as e:
+                # ValueError: 응답이 JSON이 아님 (프록시 오류 페이지 등)
+                last_error = e
+            wait = self._retry_wait(attempt, deadline, last_error, resp)
+            if wait is None:
+                break
+            time.sleep(wait)
+        raise self._give_up(last_error) from last_error
+
+    async def asearch(self, query: str, deadline: Optional[float] = None, **options) -> Dict[str, Any]:
+        """Tavily 비동기 검색 (search와 같은 재시도/예산/차단기 정책, 대기 중 스레드를 점유하지 않음)"""
+        self._ensure_async_client()
+        payload, deadline = self._begin(query, deadline, options)
+        for attempt in range(self.max_retries + 1):
+            resp = None
+            try:
+                resp = await self._async_client.post(self.url, json=payload, timeout=self._attempt_timeout(deadline))
+                result = self._parse_response(resp)
+                if result is not None:
+                    return result
+                last_error = SearchClientError(f"HTTP {resp.status_code}")
+            except (httpx.TimeoutException, httpx.TransportError, ValueError) as e:
+                last_error = e
+            wait = self._retry_wait(attempt, deadline, last_error, resp)
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+        raise self._give_up(last_error) from last_error
+
+    def _origin(self) -> str:
+        url = httpx.URL(self.url)
+        return f"{url.scheme}://{url.netloc.decode()}/"
+
+    def warm_up(self) -> bool:
+        """검색 API 서버와 연결(TCP/TLS)을 미리 맺어 연결 풀에 넣어둠 (응답 코드는 무시)"""
+        try:
+            self._client.head(self._origin(), timeout=SEARCH_CONNECT_TIMEOUT_SECONDS)
+            return True
+        except httpx.HTTPError as e:
+            print(f"⚠️ 검색 API 연결 준비 실패: {e}")
+            return False
+
+    async def awarm_up(self) -> bool:
+        """warm_up의 비동기 버전 (비동기 연결 풀용, 사용할 이벤트 루프에서 호출)"""
+        self._ensure_async_client()
+        try:
+            await self._async_client.head(self._origin(), timeout=SEARCH_CONNECT_TIMEOUT_SECONDS)
+            return True
+        except httpx.HTTPError as e:
+            print(f"⚠️ 검색 API 비동기 연결 준비 실패: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """호출/재시도/실패/차단 횟수와 차단기 상태"""
+        with self._stats_lock:
+            return {**self._stats, "breaker_state": self.breaker.state}
+
+    def close(self):
+        self._client.close()
+
+
+# 모든 세션이 공유하는 검색 클라이언트
+_search_client = None
+_search_client_lock = threading.Lock()
+
+
+def get_search_client() -> TavilySearchClient:
+    """공유 검색 클라이언트 반환 (최초 호출 시 생성)"""
+    global _search_client
+    if _search_client is None:
+        with _search_client_lock:
+            if _search_client is None:
+                _search_client = TavilySearchClient()
+    return _search_client
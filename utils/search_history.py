@@ -0,0 +1,497 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable
+
+from query_normalizer import canonical_key, CANONICAL_KEY_VERSION
+
+# 부동산 검색 이력 DB 파일 경로 (REALTY_HISTORY_DB 환경 변수로 변경 가능)
+REALTY_HISTORY_DB_FILE = os.getenv("REALTY_HISTORY_DB", "realty_search_history.db")
+
+# 다른 세션이 쓰기 중일 때 기다리는 최대 시간 (밀리초)
+HISTORY_BUSY_TIMEOUT_MS = 5000
+
+# 메모리에 유지하는 인기 질문 개수 (사이드바 top_k보다 크게)
+TOP_QUESTIONS_CACHE_SIZE = 50
+
+# 질문별 검색 횟수 테이블 (표준 질문 키 기준, question은 표시용 질문 문장)
+QUESTION_COUNTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS question_counts (
+        canonical_key TEXT PRIMARY KEY,
+        question TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        last_date TEXT NOT NULL DEFAULT '',
+        price_summary TEXT NOT NULL DEFAULT '',
+        updated_at REAL NOT NULL DEFAULT 0,
+        last_answer TEXT NOT NULL DEFAULT '',
+        answered_at REAL NOT NULL DEFAULT 0
+    )
+"""
+QUESTION_COUNTS_INDEX = "CREATE INDEX IF NOT EXISTS idx_question_counts_count ON question_counts(count DESC)"
+QUESTION_COUNTS_INSERT = """
+    INSERT INTO question_counts (canonical_key, question, count, last_date, price_summary, updated_at,
+                                 last_answer, answered_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class SearchHistoryStore:
+    """
+    부동산 검색 이력 저장소 (SQLite WAL 모드)
+    표현만 다른 질문은 표준 질문 키(query_normalizer)로 합산하고,
+    질문별 검색 횟수를 한 번의 UPSERT로 원자적으로 증가시키므로
+    여러 세션이 동시에 기록해도 횟수가 유실되지 않고, 이력 크기와 무관하게 기록 비용이 일정함
+    인기 질문 상위 목록은 메모리에 유지하며 기록할 때마다 갱신하고,
+    다른 프로세스의 기록은 PRAGMA data_version과 쓰기 순번으로 감지하여 다시 읽음
+    """
+
+    def __init__(self, db_path: str = REALTY_HISTORY_DB_FILE, legacy_json_path: Optional[str] = None,
+                 key_fn: Callable[[str], str] = canonical_key):
+        self.db_path = db_path
+        self.key_fn = key_fn
+        self._local = threading.local()
+        self._init_schema()
+
+        # 인기 질문 상위 목록 캐시 ((-count, rowid) 순 정렬)
+        self._top_lock = threading.Lock()
+        self._top_cache: Optional[List[Dict[str, Any]]] = None
+        self._top_complete = False  # 전체 질문 수가 캐시 크기보다 작아 모두 담겨 있는지
+        self._top_seq = None  # 캐시가 반영한 마지막 쓰기 순번
+        self._top_data_version = None
+        # data_version 확인 전용 연결 (다른 연결의 커밋만 감지하므로 쓰기에는 사용하지 않음)
+        self._monitor = sqlite3.connect(db_path, timeout=HISTORY_BUSY_TIMEOUT_MS / 1000,
+                                        isolation_level=None, check_same_thread=False)
+        if legacy_json_path:
+            self.migrate_from_json(legacy_json_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 DB 연결 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=HISTORY_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={HISTORY_BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        """테이블 및 인덱스 생성"""
+        conn = self._connect()
+        conn.executescript(QUESTION_COUNTS_SCHEMA + ";" + QUESTION_COUNTS_INDEX + ";" + """
+            CREATE TABLE IF NOT EXISTS history_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            INSERT OR IGNORE INTO history_meta (key, value) VALUES ('write_seq', '0');
+            -- 단지/면적/거래유형별 가격 시계열 (추가 전용, 키 순으로 저장되어 기간 조회가 연속 구간 읽기)
+            CREATE TABLE IF NOT EXISTS price_history (
+                complex TEXT NOT NULL,
+                area TEXT NOT NULL DEFAULT '',
+                transaction_type TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                price INTEGER NOT NULL,
+                rent INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (complex, area, transaction_type, ts, price, rent)
+            ) WITHOUT ROWID;
+        """)
+        self._migrate_question_keys(conn)
+        # 답변 저장 컬럼이 없던 DB에 컬럼 추가 (비슷한 질문 제안에서 저장된 답변 재사용)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(question_counts)")}
+        for column, ddl in (("last_answer", "TEXT NOT NULL DEFAULT ''"), ("answered_at", "REAL NOT NULL DEFAULT 0")):
+            if column not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE question_counts ADD COLUMN {column} {ddl}")
+                except sqlite3.OperationalError:
+                    pass  # 다른 프로세스가 먼저 추가함
+
+    def _question_keys_current(self, conn: sqlite3.Connection) -> bool:
+        """질문 테이블이 현재 규칙의 표준 질문 키로 저장되어 있는지"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(question_counts)")}
+        version = conn.execute("SELECT value FROM history_meta WHERE key = 'key_version'").fetchone()
+        return "canonical_key" in columns and version is not None and version[0] == CANONICAL_KEY_VERSION
+
+    def _migrate_question_keys(self, conn: sqlite3.Connection):
+        """원문 질문 키(이전 스키마)나 이전 규칙의 키를 현재 표준 질문 키로 다시 계산하여 합산"""
+        if self._question_keys_current(conn):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 다른 프로세스가 먼저 마이그레이션했으면 건너뜀
+            if self._question_keys_current(conn):
+                conn.execute("COMMIT")
+                return
+            # 저장된 답변 컬럼이 없던 스키마에서는 빈 답변으로 읽음
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(question_counts)")}
+            answer_columns = ("last_answer, answered_at" if {"last_answer", "answered_at"} <= columns
+                              else "'' AS last_answer, 0 AS answered_at")
+            rows = conn.execute(
+                "SELECT question, count, last_date, price_summary, updated_at, " + answer_columns +
+                " FROM question_counts ORDER BY rowid"
+            ).fetchall()
+            merged = self._merge_question_rows(rows)
+            conn.execute("DROP TABLE question_counts")
+            conn.execute(QUESTION_COUNTS_SCHEMA)
+            conn.execute(QUESTION_COUNTS_INDEX)
+            conn.executemany(QUESTION_COUNTS_INSERT, merged)
+            conn.execute(
+                "INSERT INTO history_meta (key, value) VALUES ('key_version', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (CANONICAL_KEY_VERSION,)
+            )
+            self._bump_write_seq(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if rows:
+            print(f"🗂️ 검색 이력 질문 {len(rows)}개를 표준 질문 키 {len(merged)}개로 합쳤습니다.")
+
+    def _merge_question_rows(self, rows: Iterable[Tuple[str, int, str, str, float, str, float]]) -> List[Tuple]:
+        """(질문, 횟수, 날짜, 가격 요약, 갱신 시각, 답변, 답변 시각)을 표준 질문 키별로 합산
+
+        횟수는 합계, 날짜는 가장 최근 값, 가격 요약은 가장 최근에 갱신된 비어 있지 않은 값,
+        답변은 가장 최근에 저장된 비어 있지 않은 값,
+        표시용 질문은 횟수가 가장 많은 문장 (같으면 먼저 나온 문장)
+
+        Returns:
+            list: [(표준 질문 키, 표시용 질문, 횟수, 날짜, 가격 요약, 갱신 시각, 답변, 답변 시각), ...] (처음 나온 순서)
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for question, count, last_date, price_summary, updated_at, last_answer, answered_at in rows:
+            key = self.key_fn(question)
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {"question": question, "top_count": count, "count": count,
+                               "last_date": last_date or "", "price_summary": price_summary or "",
+                               "summary_at": (last_date or "", updated_at or 0), "updated_at": updated_at or 0,
+                               "last_answer": last_answer or "", "answered_at": answered_at or 0}
+                continue
+            entry["count"] += count
+            if count > entry["top_count"]:
+                entry["question"], entry["top_count"] = question, count
+            entry["last_date"] = max(entry["last_date"], last_date or "")
+            entry["updated_at"] = max(entry["updated_at"], updated_at or 0)
+            summary_at = (last_date or "", updated_at or 0)
+            if price_summary and (not entry["price_summary"] or summary_at >= entry["summary_at"]):
+                entry["price_summary"], entry["summary_at"] = price_summary, summary_at
+            if last_answer and (not entry["last_answer"] or (answered_at or 0) >= entry["answered_at"]):
+                entry["last_answer"], entry["answered_at"] = last_answer, answered_at or 0
+        return [
+            (key, e["question"], e["count"], e["last_date"], e["price_summary"], e["updated_at"],
+             e["last_answer"], e["answered_at"])
+            for key, e in merged.items()
+        ]
+
+    @staticmethod
+    def _bump_write_seq(conn: sqlite3.Connection) -> int:
+        """쓰기 순번 증가 후 증가 전 값 반환 (트랜잭션 안에서 호출)"""
+        seq = int(conn.execute("SELECT value FROM history_meta WHERE key = 'write_seq'").fetchone()[0])
+        conn.execute("UPDATE history_meta SET value = ? WHERE key = 'write_seq'", (str(seq + 1),))
+        return seq
+
+    def _read_write_seq(self) -> int:
+        """현재 쓰기 순번"""
+        return int(self._monitor.execute(
+            "SELECT value FROM history_meta WHERE key = 'write_seq'"
+        ).fetchone()[0])
+
+    def record(self, question: str, last_date: str, price_summary: str = "", key: Optional[str] = None,
+               answer: str = ""):
+        """질문 검색 횟수 1 증가 (key: 표준 질문 키, 없으면 key_fn으로 계산 / 가격 요약과 답변은 새 값이 있을 때만 갱신)"""
+        key = key or self.key_fn(question)
+        now = time.time()
+        conn = self._connect()
+        with self._top_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("""
+                    INSERT INTO question_counts (canonical_key, question, count, last_date, price_summary, updated_at,
+                                                 last_answer, answered_at)
+                    VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+                    ON CONFLICT(canonical_key) DO UPDATE SET
+                        count = count + 1,
+                        last_date = excluded.last_date,
+                        price_summary = CASE WHEN excluded.price_summary != ''
+                                             THEN excluded.price_summary ELSE price_summary END,
+                        updated_at = excluded.updated_at,
+                        last_answer = CASE WHEN excluded.last_answer != ''
+                                           THEN excluded.last_answer ELSE last_answer END,
+                        answered_at = CASE WHEN excluded.last_answer != ''
+                                           THEN excluded.answered_at ELSE answered_at END
+                """, (key, question, last_date, price_summary, now, answer, now if answer else 0))
+                row = conn.execute(
+                    "SELECT rowid, canonical_key, question, count, last_date, price_summary "
+                    "FROM question_counts WHERE canonical_key = ?",
+                    (key,)
+                ).fetchone()
+                seq = self._bump_write_seq(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            # 캐시 이후 다른 쓰기가 없었으면 메모리 상위 목록만 갱신, 아니면 다음 조회 시 다시 읽음
+            if self._top_cache is not None and seq == self._top_seq:
+                self._update_top_cache(self._row_to_entry(row))
+                self._top_seq = seq + 1
+            else:
+                self._top_cache = None
+
+    def top_questions(self, top_k: int = 5) -> List[Dict[str, Any]]:
+        """가장 많이 검색한 질문 상위 k개 (메모리 캐시에서 O(k)로 반환)"""
+        if top_k > TOP_QUESTIONS_CACHE_SIZE:
+            return [self._public_entry(e) for e in self._query_top(top_k, self._connect())]
+
+        with self._top_lock:
+            data_version = self._monitor.execute("PRAGMA data_version").fetchone()[0]
+            if self._top_cache is not None and data_version != self._top_data_version:
+                # 다른 연결의 커밋 발생: 이 프로세스가 이미 반영한 쓰기뿐인지 순번으로 확인
+                if self._read_write_seq() != self._top_seq:
+                    self._top_cache = None
+                self._top_data_version = data_version
+
+            if self._top_cache is None:
+                self._top_seq = self._read_write_seq()
+                self._top_cache = self._query_top(TOP_QUESTIONS_CACHE_SIZE)
+                self._top_complete = len(self._top_cache) < TOP_QUESTIONS_CACHE_SIZE
+                self._top_data_version = data_version
+
+            return [self._public_entry(e) for e in self._top_cache[:top_k]]
+
+    def answered_questions(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """저장된 답변이 있는 질문 목록 (검색 횟수순)
+
+        Returns:
+            list: [{"key", "question", "count", "last_date", "price_summary", "answer", "answered_at"}, ...]
+        """
+        rows = self._connect().execute("""
+            SELECT canonical_key, question, count, last_date, price_summary, last_answer, answered_at
+            FROM question_counts
+            WHERE last_answer != ''
+            ORDER BY count DESC, rowid ASC
+            LIMIT ?
+        """, (limit,)).fetchall()
+        return [
+            {"key": key, "question": question, "count": count, "last_date": last_date,
+             "price_summary": price_summary, "answer": answer, "answered_at": answered_at}
+            for key, question, count, last_date, price_summary, answer, answered_at in rows
+        ]
+
+    def write_seq(self) -> int:
+        """현재 쓰기 순번 (다른 세션/프로세스 포함, 이력이 바뀌었는지 확인용)"""
+        with self._top_lock:
+            return self._read_write_seq()
+
+    def _query_top(self, limit: int, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+        """count 인덱스로 상위 질문 조회"""
+        rows = (conn or self._monitor).execute("""
+            SELECT rowid, canonical_key, question, count, last_date, price_summary
+            FROM question_counts
+            ORDER BY count DESC, rowid ASC
+            LIMIT ?
+        """, (limit,)).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def _update_top_cache(self, entry: Dict[str, Any]):
+        """검색 횟수가 1 늘어난 질문을 메모리 상위 목록에 반영"""
+        cache = self._top_cache
+        for i, cached in enumerate(cache):
+            if cached["key"] == entry["key"]:
+                cache[i] = entry
+                break
+        else:
+            # 목록 밖 질문은 마지막 항목보다 앞설 때만 진입 (전체가 담긴 경우는 항상 추가)
+            if not self._top_complete and self._sort_key(entry) > self._sort_key(cache[-1]):
+                return
+            cache.append(entry)
+
+        cache.sort(key=self._sort_key)
+        if len(cache) > TOP_QUESTIONS_CACHE_SIZE:
+            del cache[TOP_QUESTIONS_CACHE_SIZE:]
+            self._top_complete = False
+
+    @staticmethod
+    def _sort_key(entry: Dict[str, Any]):
+        return -entry["count"], entry["rowid"]
+
+    @staticmethod
+    def _row_to_entry(row) -> Dict[str, Any]:
+        rowid, key, question, count, last_date, price_summary = row
+        return {"rowid": rowid, "key": key, "question": question, "count": count,
+                "last_date": last_date, "price_summary": price_summary}
+
+    @staticmethod
+    def _public_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: entry[k] for k in ("question", "count", "last_date", "price_summary")}
+
+    def load_all(self) -> Dict[str, Any]:
+        """전체 이력을 기존 JSON 캐시 형식으로 반환"""
+        rows = self._connect().execute(
+            "SELECT question, count, last_date, price_summary FROM question_counts ORDER BY rowid"
+        ).fetchall()
+        return {
+            "question_counts": {
+                q: {"count": c, "last_date": d, "price_summary": p}
+                for q, c, d, p in rows
+            },
+            "searches": []
+        }
+
+    def replace_all(self, cache_data: Dict[str, Any]):
+        """전체 이력을 주어진 JSON 캐시 형식 데이터로 교체 (하나의 트랜잭션)"""
+        now = time.time()
+        rows = self._merge_question_rows(
+            (q, c, d, p, now, "", 0) for q, c, d, p in self._iter_question_rows(cache_data)
+        )
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM question_counts")
+            conn.executemany(QUESTION_COUNTS_INSERT, rows)
+            self._bump_write_seq(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._top_lock:
+            self._top_cache = None
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """기존 realty_search_cache.json 이력을 한 번만 가져옴 (가져온 질문 수 반환)"""
+        if not os.path.exists(json_path):
+            return 0
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrated = conn.execute(
+                "SELECT value FROM history_meta WHERE key = 'migrated_json'"
+            ).fetchone()
+            if migrated:
+                conn.execute("COMMIT")
+                return 0
+
+            with open(json_path, "r", encoding="utf-8") as f:
+                cache_data = json.load(f)
+
+            now = time.time()
+            rows = self._merge_question_rows(
+                (q, c, d, p, now, "", 0) for q, c, d, p in self._iter_question_rows(cache_data)
+            )
+            conn.executemany(QUESTION_COUNTS_INSERT + """
+                ON CONFLICT(canonical_key) DO UPDATE SET
+                    count = count + excluded.count,
+                    last_date = MAX(last_date, excluded.last_date),
+                    price_summary = CASE WHEN price_summary = ''
+                                         THEN excluded.price_summary ELSE price_summary END
+            """, rows)
+            conn.execute(
+                "INSERT INTO history_meta (key, value) VALUES ('migrated_json', ?)",
+                (os.path.abspath(json_path),)
+            )
+            self._bump_write_seq(conn)
+            conn.execute("COMMIT")
+            print(f"🗂️ 검색 이력 {len(rows)}건을 {json_path}에서 가져왔습니다.")
+            return len(rows)
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            print(f"검색 이력 마이그레이션 중 오류: {e}")
+            return 0
+
+    def record_prices(self, complex_name: str, area: str, prices: List[Tuple[str, int, int]],
+                      ts: Optional[int] = None) -> int:
+        """가격 시계열에 관측값 추가
+
+        Args:
+            complex_name: 표준 단지명
+            area: 전용면적 ('84', '34평' 등, 모르면 빈 문자열)
+            prices: (거래 유형, 가격 또는 보증금(만원), 월세(만원, 없으면 0)) 목록
+            ts: 관측 시각 (epoch 초, 기본값 현재)
+
+        Returns:
+            int: 추가된 관측값 수
+        """
+        if not complex_name or not prices:
+            return 0
+        ts = int(ts if ts is not None else time.time())
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO price_history (complex, area, transaction_type, ts, price, rent) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(complex_name, area or "", tx, ts, int(price), int(rent or 0)) for tx, price, rent in prices]
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+            return added
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def price_series(self, complex_name: str, area: str, transaction_type: str,
+                     start_ts: Optional[int] = None, end_ts: Optional[int] = None,
+                     bucket_seconds: Optional[int] = None, max_points: Optional[int] = None) -> List[Dict[str, Any]]:
+        """기간 내 가격 시계열을 구간별로 집계하여 반환
+
+        bucket_seconds를 지정하지 않으면 max_points 이하가 되도록 구간 크기를 정하고,
+        둘 다 없으면 하루 단위로 집계 (구간은 start_ts부터 나눔)
+
+        Returns:
+            list: [{"ts", "min", "max", "avg", "rent_avg", "count"}, ...] (시간순, 가격 단위 만원)
+        """
+        start_ts = int(start_ts) if start_ts is not None else 0
+        end_ts = int(end_ts) if end_ts is not None else int(time.time())
+        if not bucket_seconds:
+            if max_points:
+                bucket_seconds = max(1, math.ceil((end_ts - start_ts + 1) / max_points))
+            else:
+                bucket_seconds = 86400
+
+        rows = self._connect().execute("""
+            SELECT ? + ((ts - ?) / ?) * ? AS bucket, MIN(price), MAX(price), AVG(price), AVG(rent), COUNT(*)
+            FROM price_history
+            WHERE complex = ? AND area = ? AND transaction_type = ? AND ts BETWEEN ? AND ?
+            GROUP BY bucket
+            ORDER BY bucket
+        """, (start_ts, start_ts, bucket_seconds, bucket_seconds, complex_name, area or "", transaction_type,
+              start_ts, end_ts)).fetchall()
+        return [
+            {"ts": bucket, "min": low, "max": high, "avg": round(avg),
+             "rent_avg": round(rent_avg), "count": count}
+            for bucket, low, high, avg, rent_avg, count in rows
+        ]
+
+    @staticmethod
+    def _iter_question_rows(cache_data: Dict[str, Any]):
+        """JSON 캐시 형식에서 (질문, 횟수, 날짜, 가격 요약) 추출 (이전 형식 포함)"""
+        question_counts = cache_data.get("question_counts", {}) if isinstance(cache_data, dict) else {}
+        if not isinstance(question_counts, dict):
+            return
+        for question, data in question_counts.items():
+            if not question or not question.strip():
+                continue
+            if isinstance(data, dict):
+                yield (question.strip(), int(data.get("count", 1)),
+                       data.get("last_date", ""), data.get("price_summary", ""))
+            else:
+                # 하위 호환성 (이전 형식: 질문 -> 횟수)
+                yield question.strip(), data if isinstance(data, int) else 1, "", ""
+
+
+_history_store_instance = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store(legacy_json_path: Optional[str] = None) -> SearchHistoryStore:
+    """전역 검색 이력 저장소 (최초 호출 시 생성 및 JSON 이력 마이그레이션)"""
+    global _history_store_instance
+    if _history_store_instance is None:
+        with _history_store_lock:
+            if _history_store_instance is None:
+                _history_store_instance = SearchHistoryStore(legacy_json_path=legacy_json_path)
+    return _history_store_instance
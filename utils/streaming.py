@@ -0,0 +1,60 @@
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Union
+from token_budget import record_llm_usage
+
+# 지금까지 출력한 답변을 버리고 새로 시작하라는 신호 (예: KB 답변이 부족해 웹 검색 답변으로 교체)
+STREAM_RESET = object()
+
+# 지금까지 출력한 답변을 버리고 오류 안내로 교체하라는 신호 (다음 토큰부터 오류 메시지)
+STREAM_ERROR = object()
+
+
+class AnswerStream:
+    """
+    답변 토큰 스트림
+    반복하면 토큰(문자열) 또는 STREAM_RESET/STREAM_ERROR가 순서대로 나오고,
+    반복이 끝나면 result에 최종 결과 객체가 완성됨
+    """
+
+    def __init__(self, result: Any, tokens: Iterator[Union[str, object]]):
+        self.result = result
+        self._tokens = tokens
+
+    def __iter__(self):
+        yield from self._tokens
+
+    def consume(self) -> Any:
+        """스트림을 끝까지 소비하고 최종 결과 반환 (비스트리밍 호출용)"""
+        for _ in self._tokens:
+            pass
+        return self.result
+
+
+def iter_llm_tokens(llm, prompt, usage_name: Optional[str] = None) -> Iterator[str]:
+    """LangChain 채팅 모델의 스트리밍 응답을 문자열 토큰으로 변환
+
+    usage_name을 지정하면 스트림이 끝난 뒤 해당 이름으로 토큰 사용량을 기록
+    """
+    usage: Dict[str, int] = {}
+    completion = []
+    for chunk in llm.stream(prompt):
+        if getattr(chunk, "usage_metadata", None):
+            usage = dict(chunk.usage_metadata)
+        if chunk.content:
+            completion.append(chunk.content)
+            yield chunk.content
+    if usage_name:
+        record_llm_usage(usage_name, prompt, "".join(completion), usage)
+
+
+async def aiter_llm_tokens(llm, prompt, usage_name: Optional[str] = None) -> AsyncIterator[str]:
+    """iter_llm_tokens의 비동기 버전 (이벤트 루프에서 스트리밍 응답을 받음)"""
+    usage: Dict[str, int] = {}
+    completion = []
+    async for chunk in llm.astream(prompt):
+        if getattr(chunk, "usage_metadata", None):
+            usage = dict(chunk.usage_metadata)
+        if chunk.content:
+            completion.append(chunk.content)
+            yield chunk.content
+    if usage_name:
+        record_llm_usage(usage_name, prompt, "".join(completion), usage)
@@ -0,0 +1,197 @@
+import re
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 글자 수 기반 추정치 사용
+    tiktoken = None
+
+# 토큰 수 계산 기준 모델
+DEFAULT_TOKEN_MODEL = "gpt-3.5-turbo"
+
+# 채팅 메시지 하나당 붙는 형식 토큰 수 (OpenAI 채팅 형식 기준 근사치)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# 거의 같은 검색 결과/문서로 보는 글자 3-gram 자카드 유사도
+NEAR_DUPLICATE_SIMILARITY = 0.9
+
+# 예산이 이만큼도 남지 않으면 다음 항목을 잘라 넣지 않고 중단
+MIN_PARTIAL_TOKENS = 30
+
+_encoders: Dict[str, Any] = {}
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder(model: str):
+    """모델별 tiktoken 인코더 (인코딩 파일을 받을 수 없으면 None)"""
+    if tiktoken is None:
+        return None
+    if model not in _encoders:
+        with _encoder_lock:
+            if model not in _encoders:
+                try:
+                    _encoders[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encoders[model] = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"⚠️ tiktoken 인코더 로드 실패, 추정치 사용: {e}")
+                    _encoders[model] = None
+    return _encoders[model]
+
+
+def _estimate_tokens(text: str) -> int:
+    """tiktoken 없이 토큰 수 추정 (한글 등 비ASCII 1글자 ≈ 1토큰, ASCII 4글자 ≈ 1토큰)"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + (ascii_chars + 3) // 4
+
+
+def count_tokens(text: str, model: str = DEFAULT_TOKEN_MODEL) -> int:
+    """텍스트의 토큰 수"""
+    if not text:
+        return 0
+    encoder = _get_encoder(model)
+    if encoder is None:
+        return _estimate_tokens(text)
+    return len(encoder.encode(text))
+
+
+def count_message_tokens(messages: Union[str, Sequence[Any]], model: str = DEFAULT_TOKEN_MODEL) -> int:
+    """프롬프트(문자열 또는 채팅 메시지 목록)의 토큰 수"""
+    if isinstance(messages, str):
+        return count_tokens(messages, model)
+    return sum(count_tokens(str(m.content), model) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = DEFAULT_TOKEN_MODEL) -> str:
+    """최대 토큰 수를 넘지 않도록 텍스트 뒷부분을 자름"""
+    if max_tokens <= 0 or not text:
+        return ""
+    encoder = _get_encoder(model)
+    if encoder is not None:
+        tokens = encoder.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        # 멀티바이트 글자 중간에서 잘리면 생기는 대체 문자는 제거
+        return encoder.decode(tokens[:max_tokens]).rstrip("�") + "..."
+
+    if _estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + "..."
+
+
+def _shingles(text: str) -> set:
+    normalized = re.sub(r"\s+", "", text or "").lower()
+    return {normalized[i:i + 3] for i in range(max(len(normalized) - 2, 1))}
+
+
+def dedupe_texts(texts: List[str], similarity: float = NEAR_DUPLICATE_SIMILARITY) -> List[int]:
+    """같거나 거의 같은 텍스트를 제거하고 남길 항목의 인덱스 반환 (앞선 항목 우선)"""
+    kept: List[int] = []
+    kept_shingles: List[set] = []
+    for i, text in enumerate(texts):
+        shingles = _shingles(text)
+        duplicate = False
+        for other in kept_shingles:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= similarity:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(i)
+            kept_shingles.append(shingles)
+    return kept
+
+
+def fit_texts_to_budget(texts: List[str], budget: int, per_item_max: Optional[int] = None,
+                        model: str = DEFAULT_TOKEN_MODEL) -> List[str]:
+    """중복을 제거한 뒤 앞에서부터 총 토큰 예산 안에 들어가는 만큼만 반환
+
+    항목별 최대 토큰(per_item_max)을 넘는 항목은 잘라서 넣고,
+    예산이 모자라면 마지막 항목은 남은 예산만큼 자름
+    """
+    fitted = []
+    remaining = budget
+    for i in dedupe_texts(texts):
+        text = texts[i]
+        if per_item_max:
+            text = truncate_to_tokens(text, per_item_max, model)
+        tokens = count_tokens(text, model)
+        if tokens > remaining:
+            if remaining >= MIN_PARTIAL_TOKENS:
+                fitted.append(truncate_to_tokens(text, remaining, model))
+            break
+        fitted.append(text)
+        remaining -= tokens
+    return fitted
+
+
+def log_prompt_sections(name: str, sections: Dict[str, str], model: str = DEFAULT_TOKEN_MODEL) -> Dict[str, int]:
+    """프롬프트 구성 요소별 토큰 수 계산 및 출력"""
+    counts = {section: count_tokens(text, model) for section, text in sections.items()}
+    detail = " · ".join(f"{section} {tokens}" for section, tokens in counts.items())
+    print(f"🧮 [{name}] 프롬프트 토큰: {detail} (합계 {sum(counts.values())})")
+    return counts
+
+
+class TokenUsageTracker:
+    """요청 종류별 프롬프트/완성 토큰 누적 집계"""
+
+    def __init__(self):
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+        """요청 한 건의 토큰 사용량 기록"""
+        with self._lock:
+            usage = self._usage.setdefault(name, {
+                "requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_requests": 0
+            })
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+            if estimated:
+                usage["estimated_requests"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """요청 종류별 누적 토큰과 요청당 평균"""
+        with self._lock:
+            return {
+                name: {
+                    **usage,
+                    "avg_prompt_tokens": usage["prompt_tokens"] / usage["requests"],
+                    "avg_completion_tokens": usage["completion_tokens"] / usage["requests"]
+                }
+                for name, usage in self._usage.items()
+            }
+
+
+# 모든 세션이 공유하는 토큰 사용량 집계
+token_usage = TokenUsageTracker()
+
+
+def record_llm_usage(name: str, prompt: Union[str, Sequence[Any]], completion: str,
+                     usage: Optional[Dict[str, int]] = None, model: str = DEFAULT_TOKEN_MODEL):
+    """LLM 호출 한 건의 토큰 사용량 기록 및 출력 (API 응답에 사용량이 없으면 추정치)"""
+    estimated = not usage or not usage.get("input_tokens")
+    if estimated:
+        prompt_tokens = count_message_tokens(prompt, model)
+        completion_tokens = count_tokens(completion, model)
+    else:
+        prompt_tokens = usage["input_tokens"]
+        completion_tokens = usage.get("output_tokens", 0)
+    token_usage.record(name, prompt_tokens, completion_tokens, estimated)
+    print(f"🧮 [{name}] 토큰 사용: 프롬프트 {prompt_tokens} / 완성 {completion_tokens}{' (추정)' if estimated else ''}")
+
+
+def get_token_usage_stats() -> Dict[str, Dict[str, Any]]:
+    """요청 종류별 누적 토큰 사용량 반환"""
+    return token_usage.stats()
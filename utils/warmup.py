@@ -0,0 +1,195 @@
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional
+
+from async_runner import run_sync, get_event_loop
+from search_client import get_search_client, request_deadline
+
+# 워밍업 때 자주 검색한 질문의 검색 결과를 미리 받아둘지 (Tavily 유료 호출이 생기므로 기본값은 사용 안 함)
+WARMUP_PREFETCH_SEARCH = os.getenv("WARMUP_PREFETCH_SEARCH", "false").lower() in ("1", "true", "yes")
+
+# 워밍업 때 이력 DB에서 미리 읽어둘 자주 검색한 질문 수
+WARMUP_TOP_QUESTIONS = int(os.getenv("WARMUP_TOP_QUESTIONS", "3"))
+
+# 그중 검색 결과를 미리 받아둘 최대 질문 수 (질문마다 Tavily 유료 호출이 검색어 변형 수만큼 발생)
+WARMUP_PREFETCH_MAX_QUESTIONS = int(os.getenv("WARMUP_PREFETCH_MAX_QUESTIONS", "3"))
+
+# 질문 미리 검색 동시 실행 수
+WARMUP_CONCURRENCY = 3
+
+# 워밍업 전체 검색 시간 예산 (초)
+WARMUP_SEARCH_BUDGET_SECONDS = float(os.getenv("WARMUP_SEARCH_BUDGET_SECONDS", "60"))
+
+# 페이지 준비 완료 기준이 되는 로컬 단계 (지식베이스 인덱스, 모델/사전/이력 DB)
+WARMUP_READY_STEPS = ("dictionary", "realty")
+# 준비 완료 후 백그라운드에서 계속하는 네트워크 단계 (실패하거나 느려도 준비 완료에 영향 없음)
+WARMUP_BACKGROUND_STEPS = ("http_pool", "search_cache", "question_index")
+WARMUP_STEPS = WARMUP_READY_STEPS + WARMUP_BACKGROUND_STEPS
+
+
+@dataclass
+class WarmupStatus:
+    """워밍업 진행 상태 (state: idle/running/ready/failed는 로컬 단계 기준, 단계별 pending/running/done/failed)"""
+    state: str = "idle"
+    steps: Dict[str, str] = field(default_factory=lambda: {step: "pending" for step in WARMUP_STEPS})
+    errors: Dict[str, str] = field(default_factory=dict)
+    primed_questions: int = 0
+    started_at: float = 0.0
+    ready_at: float = 0.0
+    finished_at: float = 0.0
+
+
+_status = WarmupStatus()
+_status_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_ready_event = threading.Event()
+
+
+def _set_step(step: str, state: str, error: str = ""):
+    with _status_lock:
+        _status.steps[step] = state
+        if error:
+            _status.errors[step] = error
+
+
+def _run_step(step: str, func) -> bool:
+    """워밍업 단계 실행 (실패해도 다음 단계 계속 진행)"""
+    _set_step(step, "running")
+    started = time.time()
+    try:
+        func()
+        _set_step(step, "done")
+        print(f"🔥 워밍업 {step} 완료 ({time.time() - started:.2f}초)")
+        return True
+    except Exception as e:
+        _set_step(step, "failed", str(e))
+        print(f"⚠️ 워밍업 {step} 실패: {e}")
+        return False
+
+
+def _warm_dictionary():
+    """SOL 지식베이스 로드/생성 (마크다운 파싱, 임베딩, FAISS 인덱스, 통계 검색)"""
+    # LangChain 등 무거운 모듈은 워밍업 스레드에서 import (첫 화면 렌더링을 막지 않도록)
+    import dictionary
+    dictionary.get_dictionary()
+
+
+def _warm_realty():
+    """MOLI 인스턴스, 단지 사전, 검색 이력 DB 준비"""
+    import realty_search
+    from complex_gazetteer import get_gazetteer
+    realty_search.get_realty_search()
+    get_gazetteer()
+    realty_search.get_top_questions(top_k=max(WARMUP_TOP_QUESTIONS, 1))
+
+
+def _warm_http_pool():
+    """검색 API 동기/비동기 연결 풀에 연결을 미리 맺어둠"""
+    client = get_search_client()
+    get_event_loop()
+    client.warm_up()
+    run_sync(client.awarm_up())
+
+
+def _warm_search_cache():
+    """자주 검색한 질문의 네이버 부동산 검색 결과를 미리 받아 캐시에 넣어둠 (WARMUP_PREFETCH_SEARCH일 때만)
+
+    검색 이력은 MOLI 질문에만 있으므로 SOL 답변 캐시는 채우지 않음
+    MOLI는 답변 자체를 메모리에 캐시하지 않으므로 검색 결과 캐시를 채우면 첫 답변에서 검색 대기가 없어지고,
+    가격을 확실히 추출할 수 있는 질문은 GPT 호출 없이 템플릿 답변이 바로 만들어짐
+    """
+    import realty_search
+    limit = min(WARMUP_TOP_QUESTIONS, WARMUP_PREFETCH_MAX_QUESTIONS)
+    if not WARMUP_PREFETCH_SEARCH or limit <= 0 or not os.getenv("TAVILY_API_KEY"):
+        return
+    questions = [q["question"] for q in realty_search.get_top_questions(top_k=limit)]
+    if not questions:
+        return
+
+    searcher = realty_search.get_realty_search()
+    deadline = request_deadline(WARMUP_SEARCH_BUDGET_SECONDS)
+
+    async def _prefetch_all():
+        semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+
+        async def _prefetch(question: str) -> bool:
+            async with semaphore:
+                return await searcher.aprefetch_search(question, deadline)
+
+        return await asyncio.gather(*(_prefetch(q) for q in questions), return_exceptions=True)
+
+    results = run_sync(_prefetch_all())
+    primed = sum(1 for r in results if r is True)
+    with _status_lock:
+        _status.primed_questions = primed
+    print(f"🔥 자주 검색한 질문 {primed}/{len(questions)}개 검색 결과 캐시 완료")
+
+
+def _warm_question_index():
+    """비슷한 질문 제안 인덱스 생성 (저장되지 않은 이전 질문만 임베딩)"""
+    import question_index
+    if not os.getenv("OPENAI_API_KEY"):
+        return
+    count = question_index.get_question_index().refresh()
+    print(f"🔥 비슷한 질문 인덱스 {count}개 질문 준비 완료")
+
+
+def _run_warmup():
+    with _status_lock:
+        _status.state = "running"
+        _status.started_at = time.time()
+    print("🔥 서버 워밍업 시작")
+
+    results = [
+        _run_step("dictionary", _warm_dictionary),
+        _run_step("realty", _warm_realty),
+    ]
+
+    with _status_lock:
+        _status.state = "ready" if all(results) else "failed"
+        _status.ready_at = time.time()
+        elapsed = _status.ready_at - _status.started_at
+    _ready_event.set()
+    print(f"🔥 서버 워밍업 준비 완료: {_status.state} ({elapsed:.2f}초)")
+
+    # 네트워크 단계는 준비 완료 이후에 진행 (외부 API 지연이 첫 화면을 막지 않도록)
+    _run_step("http_pool", _warm_http_pool)
+    _run_step("search_cache", _warm_search_cache)
+    _run_step("question_index", _warm_question_index)
+
+    with _status_lock:
+        _status.finished_at = time.time()
+        elapsed = _status.finished_at - _status.started_at
+    print(f"🔥 서버 워밍업 종료 ({elapsed:.2f}초)")
+
+
+def start_warmup() -> Dict[str, Any]:
+    """백그라운드 워밍업 시작 (이미 시작했으면 아무것도 하지 않음, 여러 번 호출해도 안전)"""
+    global _warmup_thread
+    if _warmup_thread is None:
+        with _status_lock:
+            if _warmup_thread is None:
+                _warmup_thread = threading.Thread(target=_run_warmup, name="warmup", daemon=True)
+                _warmup_thread.start()
+    return get_warmup_status()
+
+
+def is_ready() -> bool:
+    """로컬 워밍업 단계가 끝났는지 (실패해도 끝났으면 True, 실패한 단계는 첫 요청 때 다시 초기화 / 네트워크 단계는 기다리지 않음)"""
+    return _ready_event.is_set()
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """워밍업이 끝날 때까지 대기"""
+    return _ready_event.wait(timeout)
+
+
+def get_warmup_status() -> Dict[str, Any]:
+    """워밍업 진행 상태"""
+    with _status_lock:
+        status = asdict(_status)
+    status["ready"] = _ready_event.is_set()
+    return status